@@ -4,27 +4,39 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from ..db.database import get_db
 from ..models.user import User
-from ..models.session import Session as UserSession, SESSION_TEMPLATES
+from ..models.session import Session as UserSession
+from ..services.template_registry import template_registry
 from ..schemas.user import UserCreate, User as UserSchema, Token, TokenData
+from ..services.password_hasher import password_hasher, PasswordHasherBusy
+from ..services.principal_cache import principal_cache
 from ..config import settings
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def _run_hasher(coroutine):
+    # 해시 작업이 몰려 대기열이 가득 차면 잠시 후 재시도 요청
+    try:
+        return await coroutine
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+async def verify_password(plain_password, hashed_password):
+    return await _run_hasher(password_hasher.verify(plain_password, hashed_password))
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await _run_hasher(password_hasher.hash(password))
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -49,18 +61,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # 캐시에 있으면 JWT 디코딩과 DB 조회 모두 생략
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
+    
+    # uid 클레임이 있으면 기본 키로 조회 (이전 토큰은 username으로 조회)
+    if token_data.user_id is not None:
+        user = db.get(User, token_data.user_id)
+    else:
+        user = db.query(User).filter(User.username == token_data.username).first()
+    if user is None or user.username != token_data.username:
         raise credentials_exception
-    return user
+    return principal_cache.set(token, user, expires_at=payload.get("exp"))
 
 @router.post("/register", response_model=UserSchema)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
@@ -79,7 +101,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # 사용자 생성
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -92,12 +114,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     
     # 12개 세션 자동 생성
-    for template in SESSION_TEMPLATES:
+    for template in template_registry:
         session = UserSession(
             user_id=db_user.id,
-            session_number=template["session_number"],
-            title=template["title"],
-            description=template["description"],
+            session_number=template.session_number,
+            title=template.title,
+            description=template.description,
             is_completed=False
         )
         db.add(session)
@@ -107,7 +129,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/token", response_model=Token)
 async def login_oauth(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,7 +138,7 @@ async def login_oauth(form_data: OAuth2PasswordRequestForm = Depends(), db: Sess
         )
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -125,7 +147,7 @@ async def login_oauth(form_data: OAuth2PasswordRequestForm = Depends(), db: Sess
 async def login_web(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     print(f"Login attempt for username: {form_data.username}")
     
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         print(f"Authentication failed for username: {form_data.username}")
         raise HTTPException(
@@ -137,7 +159,7 @@ async def login_web(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessio
     print(f"User authenticated successfully: {user.username}")
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     print(f"Token created successfully for user: {user.username}")
     return {"access_token": access_token, "token_type": "bearer"}
@@ -151,7 +173,7 @@ async def create_test_user(db: Session = Depends(get_db)):
         return {"message": "Test user already exists", "username": "testuser"}
     
     # 테스트 사용자 생성
-    hashed_password = get_password_hash("test123")
+    hashed_password = await get_password_hash("test123")
     db_user = User(
         email="test@example.com",
         username="testuser",
@@ -165,12 +187,12 @@ async def create_test_user(db: Session = Depends(get_db)):
     db.refresh(db_user)
     
     # 12개 세션 자동 생성
-    for template in SESSION_TEMPLATES:
+    for template in template_registry:
         session = UserSession(
             user_id=db_user.id,
-            session_number=template["session_number"],
-            title=template["title"],
-            description=template["description"],
+            session_number=template.session_number,
+            title=template.title,
+            description=template.description,
             is_completed=False
         )
         db.add(session)
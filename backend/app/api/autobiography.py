@@ -5,11 +5,12 @@ from sqlalchemy import func
 import io
 from typing import Optional, List
 from datetime import datetime
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..models.user import User
 from ..models.session import Session as UserSession
 from ..models.conversation import Conversation
 from ..services.autobiography_service import autobiography_service
+from ..services.archive_service import archive_service
 from .auth import get_current_user
 
 router = APIRouter()
@@ -55,6 +56,7 @@ async def generate_autobiography(
         conversations = db.query(Conversation).filter(
             Conversation.session_id == session.id
         ).order_by(Conversation.created_at).all()
+        archive_service.hydrate(db, conversations)
         
         for conv in conversations:
             all_conversations.append({
@@ -105,7 +107,7 @@ async def generate_autobiography(
 async def preview_autobiography(
     session_numbers: Optional[List[int]] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """특정 세션들의 자서전 미리보기"""
     query = db.query(UserSession).filter(
@@ -122,6 +124,7 @@ async def preview_autobiography(
         conversations = db.query(Conversation).filter(
             Conversation.session_id == session.id
         ).order_by(Conversation.created_at).limit(3).all()
+        archive_service.hydrate(db, conversations)
         
         preview_data.append({
             "session_title": session.title,
@@ -144,7 +147,7 @@ async def preview_autobiography(
 @router.get("/status")
 async def get_autobiography_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """자서전 생성 가능 상태 확인"""
     sessions = db.query(UserSession).filter(
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import asyncio
 import json
 import logging
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..models.user import User
 from ..models.session import Session as UserSession
 from ..models.conversation import Conversation, ConversationType
@@ -15,6 +15,22 @@ from ..schemas.conversation import (
     InterviewRequest,
     InterviewResponse
 )
+from ..services.search_service import search_service
+from ..services.archive_service import archive_service
+from ..services.conversation_manager import conversation_manager
+from ..services.flow_state_store import FlowStateConflict
+from ..services.template_registry import template_registry
+from ..services.history_buffer import history_buffer
+from ..services.live_stream import AUDIO
+from ..services.recording_service import recording_owner, recording_service, recording_url
+from ..services.transcript_sink import transcript_sink
+from ..services.live_protocol import (
+    BINARY_PROTOCOL, FRAME_AUDIO_IN, FRAME_OPUS_OUT, FrameCodec, FrameError, negotiate_protocol, pack_packets
+)
+from ..services.audio_pipeline import (
+    CODEC_OPUS, PCM16, SAMPLE_FORMATS, DownstreamEncoder, UpstreamConverter, audio_pipeline, negotiate_codec
+)
+from ..config import settings
 import os
 if os.environ.get('RAILWAY_DEPLOYMENT'):
     from ..services.gemini_service_railway import gemini_service
@@ -34,6 +50,7 @@ else:
         LIVE_AUDIO_AVAILABLE = False
         gemini_live_service = None
 from .auth import get_current_user
+from .responses import RangeFileResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,7 +61,7 @@ async def get_session_conversations(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """특정 세션의 모든 대화 조회"""
     # 세션 소유권 확인
@@ -62,6 +79,7 @@ async def get_session_conversations(
     conversations = db.query(Conversation).filter(
         Conversation.session_id == session_id
     ).order_by(Conversation.created_at).offset(skip).limit(limit).all()
+    archive_service.hydrate(db, conversations)
     
     total = db.query(Conversation).filter(
         Conversation.session_id == session_id
@@ -78,51 +96,80 @@ async def create_interview(
     """텍스트 기반 인터뷰 진행"""
     logger.info(f"Interview request from user {current_user.username}: session {request.session_number}")
     
+    # 웹앱은 회차 번호(session_number)로 요청하므로 사용자의 해당 회차 세션을 찾음
+    session = db.query(UserSession).filter(
+        UserSession.user_id == current_user.id,
+        UserSession.session_number == request.session_number
+    ).first()
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    # 템플릿 파일에서 빠진 회차 (핫 리로드로 세션 수가 줄었을 때)
+    if template_registry.find(session.session_number) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session template not found"
+        )
+    
     try:
-        # 세션 번호를 기반으로 대화 진행 (실제 session_id가 아닌 session_number 사용)
-        # 이전 대화 내역 조회
-        prev_conversations = db.query(Conversation).filter(
-            Conversation.user_id == current_user.id,
-            Conversation.session_number == request.session_number
-        ).order_by(Conversation.created_at.desc()).limit(5).all()
-        
-        conversation_history = [
-            {
-                "user_message": conv.user_message,
-                "ai_response": conv.ai_response
-            }
-            for conv in reversed(prev_conversations)
-        ]
-        
-        # 세션 시작인지 확인 (첫 번째 대화인지)
-        is_session_start = len(prev_conversations) == 0 or request.is_session_start
-        
-        # AI 응답 생성 (fallback 포함)
-        try:
-            ai_response = await gemini_service.generate_interview_response(
-                session_id=request.session_number,
-                session_number=request.session_number,
+        # 같은 인터뷰의 동시 요청은 순서대로 처리 (이전 대화 조회부터 저장까지)
+        async with conversation_manager.lock(current_user.id, session.session_number):
+            # 이전 대화 내역 조회 (메모리 버퍼에 없을 때만 DB 조회)
+            conversation_history = history_buffer.get(session.id)
+            if conversation_history is None:
+                prev_conversations = db.query(Conversation).filter(
+                    Conversation.session_id == session.id
+                ).order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(
+                    history_buffer.turns
+                ).all()
+                archive_service.hydrate(db, prev_conversations)
+                
+                conversation_history = [
+                    {
+                        "user_message": conv.user_message,
+                        "ai_response": conv.ai_response
+                    }
+                    for conv in reversed(prev_conversations)
+                ]
+                history_buffer.fill(session.id, conversation_history)
+            
+            # 세션 시작인지 확인 (첫 번째 대화인지)
+            is_session_start = len(conversation_history) == 0 or request.is_session_start
+            
+            # AI 응답 생성 (fallback 포함)
+            try:
+                ai_response = await gemini_service.generate_interview_response(
+                    user_id=current_user.id,
+                    session_number=session.session_number,
+                    user_message=request.user_message,
+                    conversation_history=conversation_history,
+                    is_session_start=is_session_start
+                )
+            except FlowStateConflict:
+                # 다른 워커가 계속 같은 인터뷰 상태를 바꾸는 중 (대체 응답을 주면 이번 턴의 진행이 사라짐)
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Interview state changed concurrently, please retry"
+                )
+            except Exception as ai_error:
+                logger.error(f"AI response generation failed: {ai_error}")
+                ai_response = "감사합니다. 소중한 이야기를 들려주셔서 고맙습니다. 더 자세히 이야기해주실 수 있을까요?"
+            
+            # 대화 저장
+            new_conversation = Conversation(
+                session_id=session.id,
+                conversation_type=ConversationType.TEXT,
                 user_message=request.user_message,
-                conversation_history=conversation_history,
-                is_session_start=is_session_start
+                ai_response=ai_response
             )
-        except Exception as ai_error:
-            logger.error(f"AI response generation failed: {ai_error}")
-            ai_response = "감사합니다. 소중한 이야기를 들려주셔서 고맙습니다. 더 자세히 이야기해주실 수 있을까요?"
-        
-        # 대화 저장
-        new_conversation = Conversation(
-            user_id=current_user.id,
-            session_number=request.session_number,
-            conversation_type=ConversationType.TEXT,
-            user_message=request.user_message,
-            ai_response=ai_response,
-            created_at=datetime.utcnow()
-        )
-        
-        db.add(new_conversation)
-        db.commit()
-        db.refresh(new_conversation)
+            
+            db.add(new_conversation)
+            db.commit()
+            db.refresh(new_conversation)
         
         logger.info(f"Conversation saved with ID: {new_conversation.id}")
         
@@ -131,6 +178,8 @@ async def create_interview(
             ai_response=ai_response
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Interview error: {e}")
         raise HTTPException(
@@ -146,6 +195,7 @@ async def websocket_live_interview(
 ):
     """실제 Gemini Live API를 사용한 실시간 음성 인터뷰"""
     await websocket.accept()
+    session_key = None
     
     # Google API 키 확인
     if not settings.google_api_key or settings.google_api_key.startswith("AIzaSyDummy"):
@@ -165,31 +215,57 @@ async def websocket_live_interview(
             await websocket.close(code=4001, reason="Authentication required")
             return
         
-        # 토큰으로 사용자 확인 (실제 구현 시 get_current_user 로직 재사용)
-        # 여기서는 간단히 처리
-        from .auth import get_current_user, oauth2_scheme
-        from fastapi import Request
+        # 오디오 전송 형식 협상 (protocol: 2 또는 [2, 1] 요청 시 바이너리 프레임, 없으면 기존 bytes)
+        protocol = negotiate_protocol(auth_message.get("protocol"))
+        codec = FrameCodec(protocol)
+        
+        # 클라이언트 마이크 형식 (다르면 Live API 입력 형식으로 변환)
+        input_rate = int(auth_message.get("sample_rate") or settings.send_sample_rate)
+        input_format = auth_message.get("sample_format") if auth_message.get("sample_format") in SAMPLE_FORMATS else PCM16
+        converter = UpstreamConverter(input_rate, settings.send_sample_rate, input_format)
         
-        # 세션 확인
+        # 바이너리 프레임이면 응답 오디오를 리샘플링/Opus 인코딩 (기존 형식은 Live API PCM 그대로)
+        encoder = None
+        if protocol == BINARY_PROTOCOL:
+            encoder = DownstreamEncoder(
+                audio_pipeline,
+                codec=negotiate_codec(auth_message.get("codecs"), settings.live_output_codec),
+                input_rate=settings.receive_sample_rate,
+                output_rate=settings.live_output_sample_rate,
+                bitrate=settings.live_opus_bitrate
+            )
+        
+        # 토큰으로 사용자 확인 (HTTP 엔드포인트와 같은 검증)
+        try:
+            current_user = await get_current_user(token, db)
+        except HTTPException:
+            await websocket.close(code=4001, reason="Invalid token")
+            return
+        
+        # 세션 확인 (본인의 해당 회차 세션만)
         session = db.query(UserSession).filter(
-            UserSession.id == session_id
+            UserSession.user_id == current_user.id,
+            UserSession.session_number == session_number
         ).first()
         
-        if not session:
+        if not session or template_registry.find(session_number) is None:
             await websocket.close(code=4004, reason="Session not found")
             return
         
         # Live 인터뷰 시작
         session_key = await live_interview_service.start_live_interview(
-            user_id=session.user_id,
-            session_id=session_id,
-            session_number=session.session_number
+            user_id=current_user.id,
+            session_id=session.id,
+            session_number=session_number
         )
         
         # 클라이언트에 준비 완료 메시지 전송
         await websocket.send_json({
             "type": "ready",
-            "session_key": session_key
+            "session_key": session_key,
+            "protocol": protocol,
+            "codec": encoder.codec if encoder else "pcm",
+            "sample_rate": encoder.output_rate if encoder else settings.receive_sample_rate
         })
         
         # 메시지 처리 루프
@@ -197,7 +273,15 @@ async def websocket_live_interview(
             while True:
                 try:
                     data = await websocket.receive_bytes()
+                    if protocol == BINARY_PROTOCOL:
+                        frame = codec.decode(data)
+                        if frame.frame_type != FRAME_AUDIO_IN:
+                            continue
+                        data = frame.payload.tobytes()
+                    data = converter.convert(data)
                     await live_interview_service.send_audio_chunk(session_key, data)
+                except FrameError as e:
+                    logger.warning(f"Invalid audio frame: {e}")
                 except WebSocketDisconnect:
                     break
                 except Exception as e:
@@ -205,29 +289,44 @@ async def websocket_live_interview(
                     break
         
         async def send_audio():
-            while True:
+            # 응답 오디오/트랜스크립트가 발행될 때만 깨어남 (폴링 없음)
+            stream = live_interview_service.get_stream(session_key)
+            if stream is None:
+                return
+            # 지터 버퍼를 거치면 오디오는 고른 프레임 묶음, 타임스탬프는 재생 시각
+            jitter = live_interview_service.get_jitter_buffer(session_key)
+            async for event in (jitter.events(stream) if jitter else stream):
                 try:
-                    audio_data = await live_interview_service.get_audio_response(session_key)
-                    if audio_data:
-                        await websocket.send_bytes(audio_data)
-                    
-                    # 트랜스크립트도 전송
-                    transcript = await live_interview_service.get_transcript(session_key)
-                    if transcript:
+                    if event.kind == AUDIO:
+                        if encoder is None:
+                            await websocket.send_bytes(event.data)
+                            continue
+                        # 이미 도착해 있는 응답 오디오까지 묶어서 워커 스레드에서 인코딩 (지터 버퍼는 이미 묶어서 줌)
+                        chunks = [event.data] if jitter else [event.data] + [pending.data for pending in stream.audio_run()]
+                        encoded = await encoder.encode(chunks)
+                        if encoder.codec == CODEC_OPUS:
+                            if encoded:
+                                await websocket.send_bytes(codec.encode_audio(pack_packets(encoded), event.timestamp, FRAME_OPUS_OUT))
+                        else:
+                            await websocket.send_bytes(codec.encode_audio(encoded[0], event.timestamp))
+                    else:
                         await websocket.send_json({
                             "type": "transcript",
-                            "data": transcript
+                            "data": event.data
                         })
-                    
-                    await asyncio.sleep(0.01)
                 except WebSocketDisconnect:
                     break
                 except Exception as e:
                     logger.error(f"Error sending audio: {e}")
                     break
         
-        # 동시에 오디오 수신 및 전송
-        await asyncio.gather(receive_audio(), send_audio())
+        # 동시에 오디오 수신 및 전송 (한쪽이 끝나면 다른 쪽도 정리)
+        tasks = [asyncio.create_task(receive_audio()), asyncio.create_task(send_audio())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
         
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
@@ -235,66 +334,102 @@ async def websocket_live_interview(
         logger.error(f"WebSocket error: {e}")
         await websocket.close(code=4000, reason=str(e))
     finally:
-        # 인터뷰 종료 및 대화 저장
-        try:
-            result = await live_interview_service.end_live_interview(session_key)
-            
-            # 대화 내용을 데이터베이스에 저장
-            for transcript in result["transcripts"]:
-                if transcript["role"] == "user":
-                    user_message = transcript["content"]
-                    # 다음 assistant 메시지 찾기
-                    ai_response = None
-                    for next_transcript in result["transcripts"]:
-                        if next_transcript["role"] == "assistant":
-                            ai_response = next_transcript["content"]
-                            break
-                    
-                    if user_message and ai_response:
-                        conversation = Conversation(
-                            session_id=session_id,
-                            conversation_type=ConversationType.LIVE_AUDIO,
-                            user_message=user_message,
-                            ai_response=ai_response
-                        )
-                        db.add(conversation)
-            
-            db.commit()
-        except Exception as e:
-            logger.error(f"Error saving conversation: {e}")
+        # 인터뷰 종료 및 대화 저장 (인터뷰를 시작한 경우만)
+        if session_key is not None:
+            try:
+                result = await live_interview_service.end_live_interview(session_key)
+                recording = result["recording"]
+                
+                # 세션 중에 기록된 트랜스크립트를 대화로 저장 (이벤트 루프를 막지 않도록 워커 스레드에서)
+                def save_transcript():
+                    transcript_sink.materialize(
+                        db,
+                        session_key,
+                        session.id,
+                        audio_url=recording_url(recording.recording_id) if recording else None,
+                        duration=recording.duration_seconds if recording else None
+                    )
+                    db.commit()
+                
+                await asyncio.get_running_loop().run_in_executor(None, save_transcript)
+            except Exception as e:
+                logger.error(f"Error saving conversation: {e}")
 
 @router.get("/my-conversations")
 async def get_my_conversations(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """현재 사용자의 모든 대화 조회"""
-    conversations = db.query(Conversation).filter(
-        Conversation.user_id == current_user.id
+    rows = db.query(Conversation, UserSession.session_number).join(
+        UserSession, Conversation.session_id == UserSession.id
+    ).filter(
+        UserSession.user_id == current_user.id
     ).order_by(Conversation.created_at.desc()).offset(skip).limit(limit).all()
+    archive_service.hydrate(db, [conv for conv, _ in rows])
     
-    total = db.query(Conversation).filter(
-        Conversation.user_id == current_user.id
+    total = db.query(Conversation).join(
+        UserSession, Conversation.session_id == UserSession.id
+    ).filter(
+        UserSession.user_id == current_user.id
     ).count()
     
     # 웹앱에서 사용할 수 있도록 session_title 추가
-    from ..models.session_templates import SESSION_TEMPLATES
     conversation_list = []
-    for conv in conversations:
+    for conv, session_number in rows:
         conv_dict = {
             "id": conv.id,
-            "session_number": conv.session_number,
+            "session_number": session_number,
             "user_message": conv.user_message,
             "ai_response": conv.ai_response,
             "created_at": conv.created_at.isoformat(),
-            "session_title": SESSION_TEMPLATES[conv.session_number]["title"] if conv.session_number < len(SESSION_TEMPLATES) else f"세션 {conv.session_number}"
+            "session_title": template_registry.title(session_number, f"세션 {session_number}")
         }
         conversation_list.append(conv_dict)
     
     return {"conversations": conversation_list, "total": total}
 
+@router.get("/search")
+async def search_conversations(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """현재 사용자의 대화 기억 검색 (관련도 순)"""
+    results, total = search_service.search(
+        db, user_id=current_user.id, query=q, skip=skip, limit=limit
+    )
+    archive_service.hydrate_rows(db, results)
+    
+    return {"query": q, "results": results, "total": total}
+
+@router.get("/recordings/{recording_id}")
+async def get_recording(
+    recording_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """실시간 인터뷰 녹음 재생 (Range 요청으로 구간 이동 가능)"""
+    recording = recording_service.find(recording_id)
+    if recording is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not found")
+    
+    # 녹음 ID의 세션이 본인 세션인 경우만 재생
+    user_id, session_id = recording_owner(recording_id)
+    owned = user_id == current_user.id and db.query(UserSession.id).filter(
+        UserSession.id == session_id,
+        UserSession.user_id == current_user.id
+    ).first()
+    if not owned:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not found")
+    
+    return RangeFileResponse(recording.path, request.headers.get("range"), recording.media_type)
+
 @router.post("/generate-autobiography")
 async def generate_autobiography(
     current_user: User = Depends(get_current_user),
@@ -312,6 +447,7 @@ async def generate_autobiography(
         conversations = db.query(Conversation).filter(
             Conversation.session_id == session.id
         ).order_by(Conversation.created_at).all()
+        archive_service.hydrate(db, conversations)
         
         for conv in conversations:
             all_conversations.append({
@@ -0,0 +1,101 @@
+import os
+import re
+from email.utils import formatdate
+from typing import Optional, Tuple
+import aiofiles
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """단일 Range 헤더 -> (시작, 끝) 포함 구간 (없거나 여러 구간이면 None = 전체, 만족할 수 없으면 ValueError)"""
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # 마지막 N바이트
+        length = int(end)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+class RangeFileResponse(Response):
+    """Range 요청을 지원하는 파일 응답 (녹음 재생 구간 이동)
+
+    서버가 zerocopysend 확장을 지원하면 sendfile로 커널에서 바로 보내고,
+    아니면 aiofiles로 chunk_size씩 읽어서 보낸다. 어느 쪽이든 메모리는 파일 크기와 관계없다.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, range_header: Optional[str] = None, media_type: str = "application/octet-stream"):
+        self.path = path
+        stat = os.stat(path)
+        size = stat.st_size
+        self.background = None
+        self.media_type = media_type
+        self.offset, self.length = 0, size
+        status_code = 200
+        headers = {
+            "accept-ranges": "bytes",
+            "last-modified": formatdate(stat.st_mtime, usegmt=True),
+            "etag": f'"{int(stat.st_mtime)}-{size}"'
+        }
+        try:
+            requested = parse_range(range_header, size)
+        except ValueError:
+            requested = None
+            status_code = 416
+            self.length = 0
+            headers["content-range"] = f"bytes */{size}"
+        if requested is not None:
+            start, end = requested
+            status_code = 206
+            self.offset, self.length = start, end - start + 1
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(self.length)
+        self.status_code = status_code
+        self.init_headers(headers)
+        if status_code != 416:
+            self.raw_headers.append((b"content-type", media_type.encode("latin-1")))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        remaining = self.length
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.offset)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..models.user import User
 from ..models.session import Session as UserSession
 from ..models.conversation import Conversation
 from ..schemas.session import Session as SessionSchema, SessionList, SessionUpdate
 from ..services.conversation_manager import conversation_manager
+from ..services.template_registry import template_registry
 from .auth import get_current_user
 
 router = APIRouter()
@@ -15,7 +16,7 @@ router = APIRouter()
 @router.get("/", response_model=SessionList)
 async def get_user_sessions(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """사용자의 모든 세션 조회"""
     sessions = db.query(UserSession).filter(
@@ -48,7 +49,7 @@ async def get_user_sessions(
 async def get_session(
     session_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """특정 세션 조회"""
     session = db.query(UserSession).filter(
@@ -127,7 +128,7 @@ async def update_session(
 async def get_session_progress(
     session_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """세션 진행률 조회"""
     session = db.query(UserSession).filter(
@@ -169,7 +170,7 @@ async def get_session_progress(
 async def get_session_flow_status(
     session_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """세션의 대화 흐름 상태 조회"""
     session = db.query(UserSession).filter(
@@ -184,29 +185,34 @@ async def get_session_flow_status(
         )
     
     # 대화 관리자에서 진행 상황 가져오기
-    flow_progress = conversation_manager.get_session_progress(session_id)
+    flow_progress = conversation_manager.get_session_progress(session.user_id, session.session_number)
     
     # 세션 템플릿 정보 추가
-    from ..models.session_templates import SESSION_TEMPLATES
-    session_template = SESSION_TEMPLATES[session.session_number]
+    session_template = template_registry.find(session.session_number)
+    if session_template is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session template not found"
+        )
+    questions = session_template.questions
     
     return {
         "session_id": session_id,
         "session_number": session.session_number,
-        "session_title": session_template["title"],
-        "session_objective": session_template["objective"],
-        "total_questions": len(session_template["questions"]),
+        "session_title": session_template.title,
+        "session_objective": session_template.objective,
+        "total_questions": len(questions),
         "current_question_index": flow_progress.get("current_question", 0),
         "next_question": (
-            session_template["questions"][flow_progress.get("current_question", 0)]
-            if flow_progress.get("current_question", 0) < len(session_template["questions"])
+            questions[flow_progress.get("current_question", 0)]
+            if flow_progress.get("current_question", 0) < len(questions)
             else None
         ),
-        "remaining_questions": len(session_template["questions"]) - flow_progress.get("current_question", 0),
+        "remaining_questions": len(questions) - flow_progress.get("current_question", 0),
         "flow_progress_percent": flow_progress.get("progress_percent", 0),
         "conversation_count": flow_progress.get("conversation_count", 0),
         "is_flow_completed": flow_progress.get("is_completed", False),
-        "all_questions": session_template["questions"]
+        "all_questions": list(questions)
     }
 
 @router.post("/{session_id}/initialize-flow")
@@ -228,10 +234,10 @@ async def initialize_session_flow(
         )
     
     # 대화 관리자에서 세션 초기화
-    conversation_manager.initialize_session(session_id, session.session_number)
+    conversation_manager.initialize_session(session.user_id, session.session_number)
     
     return {
         "message": "Session flow initialized successfully",
         "session_id": session_id,
-        "opening_message": conversation_manager.get_session_opening(session_id)
+        "opening_message": conversation_manager.get_session_opening(session.user_id, session.session_number)
     }
\ No newline at end of file
@@ -10,11 +10,39 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///app/hestory.db"  # SQLite 기본값 (Railway에서 PostgreSQL 설정 시 덮어씀)
+    read_database_url: Optional[str] = None  # 읽기 전용 복제본 (미설정 시 database_url 사용)
+    read_your_writes_window_seconds: int = 5  # 쓰기 직후 기본 DB로 읽는 시간
+    
+    # Archive (콜드 스토리지)
+    archive_idle_days: int = 180  # 마지막 대화 후 이 기간이 지나면 본문을 압축 보관
+    archive_codec: str = "zlib"  # zlib 또는 zstd (zstandard 설치 시)
+    archive_compression_level: int = 9
     
     # Security
     secret_key: str = "hestory-railway-jwt-secret-key-2025"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440  # 24시간 (더 긴 세션)
+    bcrypt_rounds: int = 12  # bcrypt work factor
+    password_hash_workers: int = 2  # 해시 전용 스레드 수
+    password_hash_max_pending: int = 200  # 대기 가능한 최대 해시 작업 수 (초과 시 503)
+    principal_cache_size: int = 10000  # 인증된 사용자 캐시 최대 항목 수
+    principal_cache_ttl_seconds: int = 300  # 캐시 항목 유지 시간
+    
+    # Interview flow state
+    flow_state_backend: str = "memory"  # memory (단일 워커) 또는 database (여러 워커가 flow_states 테이블 공유)
+    flow_state_cache_size: int = 10000  # memory 저장소가 보관하는 최대 세션 수
+    flow_state_ttl_seconds: int = 7200  # 마지막 사용 후 보관 시간
+    flow_state_miss_ttl_seconds: int = 60  # 대화가 없어 재구성할 수 없었던 세션을 다시 조회하지 않는 시간
+    flow_state_lock_stripes: int = 1024  # 동시 턴 직렬화용 락 개수 (사용자+회차 해시로 선택)
+    session_templates_path: Optional[str] = None  # 세션 템플릿 JSON 파일 (없으면 내장 템플릿, 바뀌면 자동 반영)
+    session_templates_check_seconds: int = 5  # 템플릿 파일 변경 확인 주기
+    history_buffer_turns: int = 5  # 인터뷰 맥락용으로 메모리에 보관하는 최근 턴 수
+    history_buffer_sessions: int = 10000  # 최근 턴을 보관하는 최대 (사용자, 회차) 수
+    history_buffer_ttl_seconds: int = 7200  # 마지막 사용 후 보관 시간
+    snapshot_path: Optional[str] = "./flow_state_snapshot.json.gz"  # 종료 시 흐름 상태 스냅샷 (재배포 간 유지되는 경로, 비우면 사용 안 함)
+    snapshot_max_age_seconds: int = 3600  # 이보다 오래된 스냅샷은 복원하지 않음
+    turn_classifier_confidence: float = 0.55  # 로컬 턴 판단 확신도가 이보다 낮으면 기존 규칙(길이/꼬리 질문 수) 사용
+    turn_classifier_llm_confidence: float = 0.9  # Gemini 맥락 응답은 확신도가 이 이상일 때만 (낮추면 Gemini 호출 증가)
     
     # Google API
     google_api_key: str  # Railway 환경변수에서 가져옴
@@ -27,6 +55,52 @@ class Settings(BaseSettings):
     send_sample_rate: int = 16000
     receive_sample_rate: int = 24000
     chunk_size: int = 1024
+    live_audio_queue_size: int = 256  # 클라이언트로 보내지 못한 응답 오디오 청크 최대 수 (0이면 제한 없음)
+    live_audio_queue_policy: str = "drop_oldest"  # 가득 찼을 때: drop_oldest(잠시 기다린 뒤 오래된 청크 버림) 또는 block
+    live_transcript_queue_size: int = 1024  # 보내지 못한 트랜스크립트 최대 수
+    live_transcript_queue_policy: str = "block"  # 트랜스크립트는 버리지 않고 Live API 수신을 멈춤
+    live_backpressure_timeout_seconds: float = 0.5  # drop_oldest 큐가 가득 찼을 때 버리기 전 기다리는 시간
+    live_output_codec: str = "opus"  # 클라이언트로 보내는 응답 오디오: opus (opuslib 필요, 없으면 pcm) 또는 pcm
+    live_output_sample_rate: int = 16000  # 클라이언트로 보내는 응답 오디오 샘플레이트 (음성은 16kHz면 충분)
+    live_opus_bitrate: int = 24000  # Opus 인코딩 비트레이트 (bps)
+    audio_workers: int = 2  # 오디오 리샘플링/인코딩 전용 스레드 수
+    vad_enabled: bool = True  # 무음 구간은 Live API로 보내지 않음 (음성 구간 검출)
+    vad_energy_threshold_db: float = -45.0  # 이보다 조용한 프레임은 무음 (배경 소음이 크면 자동으로 높아짐)
+    vad_zcr_threshold: float = 0.3  # 임계값 근처 에너지에서 영교차율이 이보다 높으면 소음으로 판단
+    vad_hangover_ms: int = 300  # 말소리 뒤에 함께 보내는 구간 (말끝 잘림 방지)
+    vad_preroll_ms: int = 100  # 말소리 앞에 함께 보내는 구간 (첫 음절 잘림 방지)
+    vad_end_of_utterance_ms: int = 800  # 말소리 뒤 무음이 이만큼 이어지면 발화 종료 알림
+    vad_noise_window_ms: int = 10000  # 이 구간의 최소 프레임 에너지를 배경 소음 수준으로 사용
+    live_audio_tokens_per_second: int = 32  # Live API 오디오 입력 토큰 (비용 추정용)
+    live_audio_usd_per_million_tokens: float = 3.0  # Live API 오디오 입력 단가 (비용 추정용)
+    live_upstream_aggregation_enabled: bool = True  # 작은 마이크 청크를 묶어서 Live API로 전송
+    live_upstream_target_ms: int = 100  # 이만큼 모이면 바로 전송
+    live_upstream_latency_ms: int = 60  # 청크가 묶이려고 기다리는 최대 시간 (지연 예산)
+    live_upstream_max_ms: int = 500  # Live API 전송이 밀릴 때 한 번에 묶는 최대 길이
+    live_jitter_enabled: bool = True  # 응답 오디오를 지터 버퍼로 고르게 내보냄
+    live_jitter_frame_ms: int = 40  # 응답 오디오를 다시 자르는 프레임 길이
+    live_jitter_prefill_ms: int = 120  # 응답 시작 시 모았다가 내보내는 길이 (재생 끊김 방지)
+    live_jitter_gap_ms: int = 500  # 응답 오디오가 이보다 오래 끊기면 새 응답으로 봄
+    live_pool_size: int = 2  # 워커마다 미리 열어 두는 Live API 연결 수 (0이면 인터뷰 시작 때마다 연결)
+    live_pool_idle_timeout_seconds: float = 60.0  # 이보다 오래 쉰 연결은 닫고 새로 엶 (서버가 쉬는 연결을 끊기 전에 교체)
+    live_pool_sweep_seconds: float = 10.0  # 오래 쉰 연결을 찾는 간격
+    tts_voice: str = "Pico"  # 음성 합성 목소리 (한국어 지원 음성)
+    tts_cache_dir: Optional[str] = "./tts_cache"  # 고정 문장 음성 캐시 디렉터리 (워커끼리 공유, 비우면 사용 안 함)
+    tts_cache_max_mb: int = 256  # 캐시 최대 크기 (넘으면 오래 안 쓴 음성부터 삭제)
+    tts_cache_warm_on_startup: bool = True  # 시작 시 실시간 인터뷰 회차 인사 음성을 미리 합성
+    tts_cache_warm_concurrency: int = 2  # 미리 합성할 때 동시 요청 수
+    recording_enabled: bool = False  # 실시간 인터뷰의 어르신 목소리 녹음 (동의를 받은 배포에서만 켬)
+    recording_dir: Optional[str] = "./recordings"  # 녹음 파일 디렉터리
+    recording_codec: str = "opus"  # 재생 파일 형식: opus (Ogg, opuslib 필요, 없으면 wav) 또는 wav
+    recording_opus_bitrate: int = 24000  # 녹음 Opus 비트레이트 (bps)
+    recording_buffer_kb: int = 64  # 이만큼 모이면 파일에 기록 (녹음 하나가 쓰는 메모리)
+    recording_segment_mb: int = 16  # 녹음 조각 파일 크기 (세션 종료 시 하나로 합침)
+    recording_retention_days: int = 90  # 이보다 오래된 녹음 파일은 삭제 (0이면 계속 보관)
+    transcript_flush_seconds: float = 1.0  # 실시간 인터뷰 트랜스크립트를 DB에 기록하는 간격 (워커가 죽으면 이만큼만 잃음)
+    transcript_flush_batch_size: int = 20  # 이만큼 모이면 간격을 기다리지 않고 바로 기록
+    transcript_max_pending: int = 1000  # 기록하지 못하고 기다리는 최대 턴 수 (DB 장애 시 넘으면 Live API 수신을 멈춤)
+    transcript_orphan_seconds: float = 900.0  # 이 시간 동안 새 턴이 없는 세션의 남은 턴은 끝난 세션으로 보고 대화로 옮김
+    transcript_sweep_seconds: float = 300.0  # 남은 턴 정리 간격 (시작할 때 한 번, 0이면 사용 안 함)
     
     # CORS
     backend_cors_origins: list = ["http://localhost:3000", "http://localhost:8000"]
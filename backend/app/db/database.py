@@ -1,32 +1,104 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi.requests import HTTPConnection
+from starlette.responses import Response
 from ..config import settings
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
+
+def _create_engine(database_url: str):
+    # SQLite URL에 대한 특별 처리 (Railway 환경)
+    if database_url.startswith("sqlite:///"):
+        # SQLite 파일이 저장될 디렉토리 생성
+        db_dir = os.path.dirname(database_url.replace("sqlite:///", ""))
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # SQLite 엔진에 특별 옵션 추가
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False}  # SQLite threading 이슈 해결
+        )
+    return create_engine(database_url)
 
-# SQLite URL에 대한 특별 처리 (Railway 환경)
 database_url = settings.database_url
-if database_url.startswith("sqlite:///"):
-    # SQLite 파일이 저장될 디렉토리 생성
-    db_dir = os.path.dirname(database_url.replace("sqlite:///", ""))
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir, exist_ok=True)
-    
-    # SQLite 엔진에 특별 옵션 추가
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False}  # SQLite threading 이슈 해결
-    )
-else:
-    engine = create_engine(database_url)
+engine = _create_engine(database_url)
+
+def _create_read_engine():
+    """읽기 전용 복제본 엔진 (설정되지 않았거나 복제할 수 없는 SQLite면 기본 엔진을 그대로 사용)"""
+    if not settings.read_database_url:
+        return engine
+    if settings.read_database_url.startswith("sqlite"):
+        # SQLite 파일은 복제되지 않으므로 따로 지정하면 모든 읽기가 빈 결과가 됨
+        logger.warning("READ_DATABASE_URL must point to a replica of DATABASE_URL; SQLite replicas are ignored")
+        return engine
+    return _create_engine(settings.read_database_url)
+
+read_engine = _create_read_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
-def get_db():
+# read-your-writes: 마지막 쓰기 시각을 쿠키(또는 같은 이름의 헤더)로 클라이언트가 들고 다님
+# (프로세스 메모리가 아니므로 다른 워커로 간 다음 요청도 기본 DB에서 읽음)
+LAST_WRITE_COOKIE = "hestory_last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+def has_recent_write(connection: HTTPConnection) -> bool:
+    """stickiness 윈도우 안에 이 클라이언트의 쓰기가 있었는지 확인"""
+    value = connection.cookies.get(LAST_WRITE_COOKIE) or connection.headers.get(LAST_WRITE_HEADER)
+    try:
+        last_write = float(value)
+    except (TypeError, ValueError):
+        return False
+    return time.time() - last_write <= settings.read_your_writes_window_seconds
+
+def remember_write(connection: HTTPConnection, response: Response):
+    """요청 중에 커밋된 쓰기가 있으면 응답에 마지막 쓰기 시각을 실어 보냄 (미들웨어에서 호출)"""
+    last_write = getattr(connection.state, "last_write", None)
+    if last_write is None:
+        return
+    value = f"{last_write:.3f}"
+    response.set_cookie(
+        LAST_WRITE_COOKIE, value,
+        max_age=settings.read_your_writes_window_seconds,
+        httponly=True,
+        samesite="lax"
+    )
+    response.headers[LAST_WRITE_HEADER] = value
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_session_dirty(session, flush_context):
+    session.info["has_writes"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_writer(session):
+    connection = session.info.get("connection")
+    if session.info.pop("has_writes", False) and connection is not None:
+        connection.state.last_write = time.time()
+
+def get_db(connection: HTTPConnection):
     db = SessionLocal()
+    db.info["connection"] = connection
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(connection: HTTPConnection):
+    """GET 핸들러용 세션 - 복제본으로 라우팅하되 최근 쓰기가 있었던 사용자는 기본 DB 사용"""
+    if read_engine is engine or has_recent_write(connection):
+        db = SessionLocal()
+        db.info["connection"] = connection
+    else:
+        db = ReadSessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Depends
+import asyncio
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -7,8 +8,20 @@ from contextlib import asynccontextmanager
 import logging
 from .config import settings
 from .api import auth, sessions, conversations, autobiography
-from .db.database import engine
-from .models import user, session, conversation
+from .db.database import engine, remember_write, LAST_WRITE_HEADER
+from .models import user, session, conversation, conversation_archive, flow_state, live_transcript
+from .services.search_service import search_service
+from .services.password_hasher import password_hasher
+from .services.principal_cache import principal_cache
+from .services.conversation_manager import conversation_manager
+from .services.template_registry import template_registry
+from .services.history_buffer import history_buffer
+from .services.snapshot_service import snapshot_service
+from .services.turn_classifier import turn_classifier
+from .services.audio_pipeline import audio_pipeline
+from .services.tts_cache import tts_cache
+from .services.recording_service import recording_service
+from .services.transcript_sink import transcript_sink
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -20,18 +33,68 @@ try:
     user.Base.metadata.create_all(bind=engine)
     session.Base.metadata.create_all(bind=engine)
     conversation.Base.metadata.create_all(bind=engine)
+    conversation_archive.Base.metadata.create_all(bind=engine)
+    flow_state.Base.metadata.create_all(bind=engine)
+    live_transcript.Base.metadata.create_all(bind=engine)
+    # 기존 테이블에도 새로 추가된 인덱스 생성
+    for index in conversation.Conversation.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     logger.info("Database tables created successfully")
 except Exception as e:
     logger.error(f"Failed to create database tables: {e}")
     # Railway 환경에서는 계속 진행 (나중에 테이블 생성 재시도 가능)
 
+# 대화 검색 인덱스 생성
+try:
+    search_service.create_index(engine)
+except Exception as e:
+    logger.error(f"Failed to create search index: {e}")
+
+def _live_interview_service():
+    """실시간 인터뷰 서비스 (Railway 환경이나 의존성이 없으면 None)"""
+    if os.environ.get('RAILWAY_DEPLOYMENT'):
+        return None
+    try:
+        from .services.interview_service import live_interview_service
+        return live_interview_service
+    except Exception as e:
+        logger.warning(f"Live interview service unavailable: {e}")
+        return None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작 시
     logger.info("Starting He'story application...")
+    live_service = _live_interview_service()
+    try:
+        snapshot_service.restore(conversation_manager, live_service)
+    except Exception as e:
+        logger.error(f"Failed to restore snapshot: {e}")
+    if live_service:
+        # 워커마다 Live API 연결을 미리 열어 둠
+        live_service.pool.start()
+        # 실시간 인터뷰 트랜스크립트를 주기적으로 DB에 기록
+        transcript_sink.start()
+    # 보관 기간이 지난 녹음 정리
+    recording_service.start()
+    warmup = None
+    if conversations.gemini_live_service and tts_cache.enabled and settings.tts_cache_warm_on_startup:
+        # 회차 인사 음성을 백그라운드에서 미리 합성 (시작을 막지 않음)
+        warmup = asyncio.create_task(conversations.gemini_live_service.warm_speech_cache())
     yield
     # 종료 시
     logger.info("Shutting down He'story application...")
+    if warmup and not warmup.done():
+        warmup.cancel()
+    await recording_service.close()
+    if live_service:
+        await live_service.pool.close()
+        # 아직 기록하지 못한 트랜스크립트 기록
+        await transcript_sink.close()
+    try:
+        snapshot_service.save(conversation_manager, live_service)
+    except Exception as e:
+        logger.error(f"Failed to save snapshot: {e}")
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -47,8 +110,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
+# read-your-writes: 쓰기 직후 읽기가 다른 워커로 가도 복제본 지연을 보지 않도록 마지막 쓰기 시각 전달
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    remember_write(request, response)
+    return response
+
 # 정적 파일 서빙 (프론트엔드)
 static_dir = "/app/static"
 if os.path.exists(static_dir):
@@ -70,7 +141,8 @@ async def api_debug():
             "/api/auth/register", 
             "/api/sessions",
             "/api/conversations",
-            "/api/autobiography"
+            "/api/autobiography",
+            "/api/metrics"
         ],
         "google_api_status": {
             "key_configured": bool(settings.google_api_key and not settings.google_api_key.startswith("AIzaSyDummy")),
@@ -79,6 +151,24 @@ async def api_debug():
         }
     }
 
+# 성능 지표 조회 엔드포인트
+@app.get("/api/metrics")
+async def api_metrics():
+    live_service = _live_interview_service()
+    return {
+        "password_hasher": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "flow_state": conversation_manager.stats(),
+        "session_templates": template_registry.stats(),
+        "history_buffer": history_buffer.stats(),
+        "turn_classifier": turn_classifier.stats(),
+        "live_sessions": live_service.stats() if live_service else None,
+        "audio_pipeline": audio_pipeline.stats(),
+        "tts_cache": tts_cache.stats(),
+        "recordings": recording_service.stats(),
+        "transcript_sink": transcript_sink.stats()
+    }
+
 @app.get("/")
 async def root():
     # 프론트엔드 index.html 서빙
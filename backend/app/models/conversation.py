@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .user import Base
@@ -22,4 +22,9 @@ class Conversation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    session = relationship("Session", back_populates="conversations")
\ No newline at end of file
+    session = relationship("Session", back_populates="conversations")
+    
+    __table_args__ = (
+        # 세션별 대화를 시간순으로 읽는 조회 (흐름 상태 재구성, 대화 목록)
+        Index("ix_conversations_session_id_created_at", "session_id", "created_at"),
+    )
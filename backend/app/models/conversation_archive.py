@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from .user import Base
+
+class ConversationArchive(Base):
+    """오래된 세션의 대화 본문을 압축해 보관하는 콜드 스토리지"""
+    __tablename__ = "conversation_archives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), unique=True, index=True, nullable=False)
+    codec = Column(String, nullable=False)  # zlib / zstd
+    payload = Column(LargeBinary, nullable=False)  # {conversation_id: [user_message, ai_response]} JSON 압축본
+    turn_count = Column(Integer, nullable=False)
+    original_bytes = Column(Integer, nullable=False)  # 압축 전 크기
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from .user import Base
+
+class FlowStateRecord(Base):
+    """여러 워커가 공유하는 인터뷰 흐름 상태"""
+    __tablename__ = "flow_states"
+    
+    key = Column(String, primary_key=True)
+    state = Column(Text, nullable=False)  # JSON 직렬화된 흐름 상태
+    version = Column(Integer, nullable=False)  # 낙관적 동시성 제어용 버전
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from .user import Base
+
+class LiveTranscriptTurn(Base):
+    """실시간 인터뷰 중에 바로 기록하는 트랜스크립트 (세션 종료 시 대화로 옮기고 삭제)"""
+    __tablename__ = "live_transcript_turns"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_key = Column(String, nullable=False)  # 실시간 세션 키 (사용자_회차, 재연결해도 같음)
+    seq = Column(Integer, nullable=False)  # 세션 안에서 발행 순서 (같은 턴을 두 번 쓰지 않도록)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    role = Column(String, nullable=False)  # user / assistant
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("session_key", "seq", name="uq_live_transcript_turns_session_key_seq"),
+    )
@@ -35,4 +35,5 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+    user_id: Optional[int] = None
\ No newline at end of file
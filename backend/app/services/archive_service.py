@@ -0,0 +1,160 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+# zstd는 선택 의존성 (없으면 zlib 사용)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+from ..config import settings
+from ..models.conversation import Conversation
+from ..models.conversation_archive import ConversationArchive
+from .search_service import search_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _is_stub(conversation) -> bool:
+    return conversation.user_message is None and conversation.ai_response is None
+
+class ArchiveService:
+    """오래된 대화 본문을 세션 단위 압축 블롭으로 옮기고 필요할 때 복원"""
+
+    def _codec(self) -> str:
+        if settings.archive_codec == "zstd" and ZSTD_AVAILABLE:
+            return "zstd"
+        return "zlib"
+
+    def _compress(self, data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            return zstandard.ZstdCompressor(level=settings.archive_compression_level).compress(data)
+        return zlib.compress(data, min(settings.archive_compression_level, 9))
+
+    def _decompress(self, payload: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().decompress(payload)
+        return zlib.decompress(payload)
+
+    def _load(self, archive: ConversationArchive) -> Dict[int, List[Optional[str]]]:
+        turns = json.loads(self._decompress(archive.payload, archive.codec))
+        return {int(conversation_id): texts for conversation_id, texts in turns.items()}
+
+    def archive_session(self, db: Session, session_id: int) -> int:
+        """세션의 대화 본문을 압축 보관하고 원본 행은 스텁으로 교체
+
+        검색 색인 행은 그대로 두어 보관된 대화도 검색되고, 검색 결과 본문은 보관소에서 복원한다.
+        """
+        rows = db.query(Conversation).filter(
+            Conversation.session_id == session_id,
+            (Conversation.user_message.isnot(None)) | (Conversation.ai_response.isnot(None))
+        ).all()
+        if not rows:
+            return 0
+
+        archive = db.query(ConversationArchive).filter(
+            ConversationArchive.session_id == session_id
+        ).first()
+        turns = self._load(archive) if archive else {}
+
+        for row in rows:
+            turns[row.id] = [row.user_message, row.ai_response]
+            row.user_message = None
+            row.ai_response = None
+
+        data = json.dumps(turns, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        codec = self._codec()
+        payload = self._compress(data, codec)
+
+        if archive is None:
+            archive = ConversationArchive(session_id=session_id)
+            db.add(archive)
+        archive.codec = codec
+        archive.payload = payload
+        archive.turn_count = len(turns)
+        archive.original_bytes = len(data)
+
+        db.commit()
+        logger.info(f"Archived {len(rows)} turns of session {session_id} ({len(data)} -> {len(payload)} bytes)")
+        return len(rows)
+
+    def archive_idle_sessions(self, db: Session, idle_days: Optional[int] = None) -> Dict[str, int]:
+        """마지막 대화 후 idle_days 이상 지난 세션을 모두 보관"""
+        idle_days = idle_days if idle_days is not None else settings.archive_idle_days
+        cutoff = datetime.utcnow() - timedelta(days=idle_days)
+
+        session_ids = [
+            session_id for (session_id,) in db.query(Conversation.session_id).group_by(
+                Conversation.session_id
+            ).having(
+                func.max(Conversation.created_at) < cutoff
+            ).having(
+                func.count(Conversation.user_message) + func.count(Conversation.ai_response) > 0
+            ).all()
+        ]
+
+        archived_turns = 0
+        for session_id in session_ids:
+            archived_turns += self.archive_session(db, session_id)
+
+        return {"sessions": len(session_ids), "turns": archived_turns}
+
+    def get_texts(self, db: Session, session_ids: Iterable[int]) -> Dict[int, List[Optional[str]]]:
+        """보관된 세션들의 대화 본문 조회 {conversation_id: [user_message, ai_response]}"""
+        session_ids = set(session_ids)
+        if not session_ids:
+            return {}
+
+        texts = {}
+        archives = db.query(ConversationArchive).filter(
+            ConversationArchive.session_id.in_(session_ids)
+        ).all()
+        for archive in archives:
+            texts.update(self._load(archive))
+        return texts
+
+    def hydrate(self, db: Session, conversations: List[Conversation]) -> List[Conversation]:
+        """스텁 행의 본문을 보관소에서 복원 (변경 이력 없이 채워 다시 저장되지 않음)"""
+        stubs = [conv for conv in conversations if _is_stub(conv)]
+        if not stubs:
+            return conversations
+
+        texts = self.get_texts(db, (conv.session_id for conv in stubs))
+        for conv in stubs:
+            if conv.id in texts:
+                user_message, ai_response = texts[conv.id]
+                set_committed_value(conv, "user_message", user_message)
+                set_committed_value(conv, "ai_response", ai_response)
+        return conversations
+
+    def hydrate_rows(self, db: Session, rows: List[dict]) -> List[dict]:
+        """dict 형태의 대화 목록 복원 (id, session_id, user_message, ai_response 키 사용)"""
+        stubs = [row for row in rows if row["user_message"] is None and row["ai_response"] is None]
+        if stubs:
+            texts = self.get_texts(db, (row["session_id"] for row in stubs))
+            for row in stubs:
+                if row["id"] in texts:
+                    row["user_message"], row["ai_response"] = texts[row["id"]]
+        return rows
+
+archive_service = ArchiveService()
+
+if __name__ == "__main__":
+    # 사용법: python -m app.services.archive_service [idle_days]
+    import sys
+    from ..db.database import SessionLocal, engine
+
+    # 서버를 한 번도 띄우지 않은 DB에서도 색인 테이블이 있도록
+    search_service.create_index(engine)
+
+    db = SessionLocal()
+    try:
+        idle_days = int(sys.argv[1]) if len(sys.argv) > 1 else None
+        result = archive_service.archive_idle_sessions(db, idle_days)
+        print(f"보관 완료: 세션 {result['sessions']}개, 대화 {result['turns']}건")
+    finally:
+        db.close()
@@ -0,0 +1,254 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from ..config import settings
+from .live_stream import AUDIO, LiveEvent, LiveStream
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChunkAggregator:
+    """마이크 오디오 청크를 묶어서 Live API로 보내는 단계 (세션 하나)
+
+    브라우저가 보내는 작은 프레임마다 send를 호출하지 않고, target_bytes가 모이거나
+    가장 오래된 청크가 latency_budget만큼 기다렸을 때 한 번에 보낸다.
+    send는 한 번에 하나만 진행하므로 업스트림이 느려지면 그 사이 들어온 오디오가
+    max_bytes까지 자연스럽게 더 크게 묶인다.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[Any]],
+        target_bytes: int,
+        max_bytes: int,
+        latency_budget: float
+    ):
+        self._send = send
+        self.target_bytes = target_bytes
+        self.max_bytes = max(max_bytes, target_bytes)
+        self.latency_budget = latency_budget
+        self._pending: Deque[Tuple[float, bytes]] = deque()  # (도착 시각, PCM)
+        self._pending_bytes = 0
+        self._force = False
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self.chunks_in = 0
+        self.sends = 0
+        self.bytes_sent = 0
+        self.send_errors = 0
+        self.total_delay = 0.0
+
+    def push(self, data: bytes):
+        """청크 추가 (보내기는 세션별 송신 태스크가 담당하므로 바로 반환)"""
+        if not data:
+            return
+        self._pending.append((time.monotonic(), data))
+        self._pending_bytes += len(data)
+        self.chunks_in += 1
+        self._idle.clear()
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def drain(self):
+        """남은 오디오를 기다리지 않고 모두 보낼 때까지 대기 (발화 종료 신호 전에 호출)"""
+        if self._pending:
+            self._force = True
+            self._wake.set()
+        await self._idle.wait()
+
+    def close(self):
+        """송신 태스크 정리 (보내지 않은 오디오는 버림)"""
+        if self._task is not None:
+            self._task.cancel()
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._idle.set()
+
+    def _take(self) -> bytes:
+        """보낼 묶음 (max_bytes를 넘지 않는 범위에서 앞에서부터, 청크는 자르지 않음)"""
+        now = time.monotonic()
+        arrived, chunk = self._pending.popleft()
+        taken = [chunk]
+        size = len(chunk)
+        self.total_delay += now - arrived
+        while self._pending and size + len(self._pending[0][1]) <= self.max_bytes:
+            arrived, chunk = self._pending.popleft()
+            taken.append(chunk)
+            size += len(chunk)
+            self.total_delay += now - arrived
+        self._pending_bytes -= size
+        return b"".join(taken)
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._force = False
+                self._idle.set()
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            remaining = self._pending[0][0] + self.latency_budget - time.monotonic()
+            if self._pending_bytes < self.target_bytes and remaining > 0 and not self._force:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            data = self._take()
+            try:
+                await self._send(data)
+                self.sends += 1
+                self.bytes_sent += len(data)
+            except Exception as e:
+                self.send_errors += 1
+                logger.error(f"Error sending aggregated audio: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks_in": self.chunks_in,
+            "sends": self.sends,
+            "chunks_per_send": round(self.chunks_in / self.sends, 2) if self.sends else 0.0,
+            "avg_bytes_per_send": self.bytes_sent // self.sends if self.sends else 0,
+            "avg_delay_ms": round(self.total_delay / self.chunks_in * 1000, 1) if self.chunks_in else 0.0,
+            "pending_bytes": self._pending_bytes,
+            "send_errors": self.send_errors
+        }
+
+class JitterBuffer:
+    """응답 오디오를 고르게 내보내는 지터 버퍼 (세션 하나, 16비트 PCM)
+
+    Live API 응답은 불규칙한 크기와 간격으로 도착한다. 응답이 시작되면 prefill만큼 모은 뒤
+    (또는 prefill 시간이 지나면) 내보내고, 오디오는 frame_ms 단위로 다시 잘라
+    끊김 없는 재생 시각(playout)을 붙인다. 재생 시각이 지난 뒤에 도착한 오디오는
+    gap 이내면 언더런(재생 끊김), 그보다 늦으면 새 응답으로 보고 prefill부터 다시 한다.
+    """
+
+    def __init__(self, sample_rate: int, frame_ms: int = 40, prefill_ms: int = 120, gap_ms: int = 500):
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.frame_seconds = frame_ms / 1000
+        self.prefill_bytes = sample_rate * prefill_ms // 1000 * 2
+        self.prefill_seconds = prefill_ms / 1000
+        self.gap_seconds = gap_ms / 1000
+        self._buffer = bytearray()
+        self._first_arrival: Optional[float] = None  # prefill 중인 오디오의 첫 도착 시각
+        self._last_arrival = 0.0
+        self._playout: Optional[float] = None  # 다음 프레임 재생 시각 (time.monotonic 기준)
+        self._seq = 0
+        self.responses = 0
+        self.frames_out = 0
+        self.underruns = 0
+        self.total_lead = 0.0
+
+    def _push(self, pcm: bytes, arrival: float):
+        if self._first_arrival is None and (self._playout is None or arrival > self._playout):
+            if self._playout is not None and arrival - self._playout < self.gap_seconds:
+                self.underruns += 1
+            else:
+                self.responses += 1
+            self._first_arrival = arrival
+            self._playout = None
+        self._last_arrival = arrival
+        self._buffer += pcm
+
+    def wait_time(self, now: float) -> Optional[float]:
+        """다음 오디오가 없어도 내보내야 할 때까지 남은 시간 (None이면 다음 이벤트까지 대기)"""
+        if not self._buffer:
+            return None
+        if self._first_arrival is not None:
+            deadline = self._first_arrival + self.prefill_seconds
+        else:
+            # 프레임에 못 미치는 응답 끝부분은 한 프레임 시간 안에 더 오지 않으면 내보냄
+            deadline = self._last_arrival + self.frame_seconds
+        return max(deadline - now, 0.0)
+
+    def _release(self, now: float, flush: bool = False) -> Optional[LiveEvent]:
+        """내보낼 수 있는 프레임들을 하나의 오디오 이벤트로 (타임스탬프 = 첫 프레임 재생 시각)"""
+        if not self._buffer:
+            return None
+        if self._first_arrival is not None:
+            if len(self._buffer) < self.prefill_bytes and not flush and now < self._first_arrival + self.prefill_seconds:
+                return None
+            self._first_arrival = None
+            self._playout = now
+
+        if flush or now >= self._last_arrival + self.frame_seconds:
+            size = len(self._buffer)
+        else:
+            size = len(self._buffer) - len(self._buffer) % self.frame_bytes
+        if size == 0:
+            return None
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+
+        playout = self._playout
+        frames = -(-size // self.frame_bytes)
+        self._playout += size / self.frame_bytes * self.frame_seconds
+        self.frames_out += frames
+        self.total_lead += (playout - now) * frames
+        self._seq += 1
+        return LiveEvent(AUDIO, self._seq, playout, data)
+
+    async def events(self, stream: LiveStream) -> AsyncIterator[LiveEvent]:
+        """스트림 이벤트를 지터 버퍼를 거쳐 내보냄 (트랜스크립트는 바로 통과)"""
+        while True:
+            timeout = self.wait_time(time.monotonic())
+            try:
+                if timeout is None:
+                    event = await stream.next()
+                else:
+                    event = await asyncio.wait_for(stream.next(), timeout=timeout)
+            except asyncio.TimeoutError:
+                event = False
+
+            if event is None:
+                # 스트림 종료: 남은 오디오 모두 내보냄
+                released = self._release(time.monotonic(), flush=True)
+                if released:
+                    yield released
+                return
+            if event and event.kind != AUDIO:
+                yield event
+                continue
+            if event:
+                self._push(event.data, event.timestamp)
+                for pending in stream.audio_run():
+                    self._push(pending.data, pending.timestamp)
+
+            released = self._release(time.monotonic())
+            if released:
+                yield released
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "frames_out": self.frames_out,
+            "underruns": self.underruns,
+            "avg_lead_ms": round(self.total_lead / self.frames_out * 1000, 1) if self.frames_out else 0.0,
+            "buffered_bytes": len(self._buffer)
+        }
+
+def create_aggregator(send: Callable[[bytes], Awaitable[Any]]) -> ChunkAggregator:
+    """설정값으로 세션용 업스트림 청크 묶음 생성 (Live API 입력 PCM 기준)"""
+    bytes_per_ms = settings.send_sample_rate * settings.audio_channels * 2 / 1000
+    return ChunkAggregator(
+        send,
+        target_bytes=int(settings.live_upstream_target_ms * bytes_per_ms),
+        max_bytes=int(settings.live_upstream_max_ms * bytes_per_ms),
+        latency_budget=settings.live_upstream_latency_ms / 1000
+    )
+
+def create_jitter_buffer() -> JitterBuffer:
+    """설정값으로 세션용 응답 지터 버퍼 생성 (Live API 출력 PCM 기준)"""
+    return JitterBuffer(
+        sample_rate=settings.receive_sample_rate,
+        frame_ms=settings.live_jitter_frame_ms,
+        prefill_ms=settings.live_jitter_prefill_ms,
+        gap_ms=settings.live_jitter_gap_ms
+    )
@@ -0,0 +1,241 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import numpy as np
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Opus 인코딩은 선택 사항 (opuslib와 시스템 libopus가 있어야 함, 없으면 PCM으로 전송)
+try:
+    import opuslib
+    OPUS_AVAILABLE = True
+except Exception:
+    OPUS_AVAILABLE = False
+
+# 샘플 형식
+PCM16 = "s16"  # 16비트 정수 리틀 엔디언
+FLOAT32 = "f32"  # 32비트 실수 (브라우저 AudioWorklet 기본 형식)
+SAMPLE_FORMATS = (PCM16, FLOAT32)
+
+# 클라이언트로 보내는 코덱
+CODEC_PCM = "pcm"
+CODEC_OPUS = "opus"
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+def decode_samples(data: bytes, sample_format: str = PCM16) -> np.ndarray:
+    """PCM bytes -> float32 샘플 (-1.0 ~ 1.0)"""
+    if sample_format == FLOAT32:
+        return np.frombuffer(data, dtype="<f4").astype(np.float32)
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+def encode_pcm16(samples: np.ndarray) -> bytes:
+    """float32 샘플 -> 16비트 PCM bytes"""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """업/다운 비율의 저역 통과 FIR을 위상별로 나눈 필터 뱅크 (up x 탭 수), 필터 반폭
+
+    scipy.signal.resample_poly와 같은 설계 (반폭 10 * max(up, down), 카이저 창 beta 5.0).
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    cutoff = 1.0 / max_rate
+    n = np.arange(-half_len, half_len + 1)
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), 5.0)
+    h *= up / h.sum()
+    taps = -(-len(h) // up)
+    bank = np.zeros(taps * up)
+    bank[:len(h)] = h
+    # bank[p, m] = h[p + m * up]
+    return bank.reshape(taps, up).T.copy(), half_len
+
+class Resampler:
+    """스트림 하나의 polyphase FIR 리샘플러
+
+    청크 경계에서 입력 기록(필터 상태)과 다음 출력의 위치를 이어 가므로 청크 크기와 관계없이
+    출력 길이가 정확히 입력 * target / source로 맞고 (누적 어긋남 없음), 다운샘플링 시
+    새 나이퀴스트 위 성분을 걸러 에일리어싱을 막는다. 필터 반폭만큼 입력을 기다렸다 출력한다.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int):
+        g = math.gcd(source_rate, target_rate)
+        self.up = target_rate // g
+        self.down = source_rate // g
+        self.passthrough = self.up == self.down
+        self._bank, self._half_len = _polyphase_filter(self.up, self.down)
+        taps = self._bank.shape[1]
+        self._offsets = np.arange(taps)
+        self._history = np.zeros(taps - 1)
+        # 다음 출력의 업샘플 위치 (_history 시작 기준, 필터 중심에 맞춰 지연 보정)
+        self._position = (taps - 1) * self.up + self._half_len
+        self._samples_in = 0
+        self._samples_out = 0
+
+    def _run(self, samples: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate((self._history, samples))
+        positions = np.arange(self._position, len(buffer) * self.up, self.down)
+        output = np.zeros(0)
+        if len(positions):
+            newest = positions // self.up
+            phases = positions % self.up
+            output = np.einsum(
+                "ij,ij->i", buffer[newest[:, None] - self._offsets], self._bank[phases]
+            )
+        consumed = len(buffer) - len(self._history)
+        self._position += len(positions) * self.down - consumed * self.up
+        self._history = buffer[consumed:]
+        return output
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """float32 샘플 청크 -> 리샘플링된 샘플 (이전 청크에서 이어짐)"""
+        if self.passthrough:
+            return samples
+        output = self._run(samples.astype(np.float64))
+        self._samples_in += len(samples)
+        self._samples_out += len(output)
+        return output.astype(np.float32)
+
+    def flush(self) -> np.ndarray:
+        """스트림 끝에서 필터에 남은 출력 (총 출력 길이를 입력 길이에 맞춤)"""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self._samples_in * self.up // self.down)
+        output = self._run(np.zeros(self._half_len // self.up + 1))[:max(0, expected - self._samples_out)]
+        self._samples_out += len(output)
+        return output.astype(np.float32)
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """한 번에 주어진 전체 신호 리샘플링 (스트림은 Resampler 사용)"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    resampler = Resampler(source_rate, target_rate)
+    return np.concatenate((resampler.process(samples), resampler.flush()))
+
+def convert_pcm(data: bytes, source_rate: int, target_rate: int, sample_format: str = PCM16) -> bytes:
+    """오디오 전체를 Live API 입력 형식(16비트 PCM, target_rate)으로 변환"""
+    if sample_format == PCM16 and source_rate == target_rate:
+        return data
+    return encode_pcm16(resample(decode_samples(data, sample_format), source_rate, target_rate))
+
+class UpstreamConverter:
+    """실시간 세션 하나의 클라이언트 마이크 오디오 변환기 (청크 사이 리샘플러 상태 유지)"""
+
+    def __init__(self, source_rate: int, target_rate: int, sample_format: str = PCM16):
+        self.sample_format = sample_format
+        self._resampler = Resampler(source_rate, target_rate)
+
+    def convert(self, data: bytes) -> bytes:
+        """클라이언트 오디오 청크를 Live API 입력 형식(16비트 PCM, target_rate)으로 변환"""
+        if self.sample_format == PCM16 and self._resampler.passthrough:
+            return data
+        return encode_pcm16(self._resampler.process(decode_samples(data, self.sample_format)))
+
+def negotiate_codec(requested: Iterable[str], preferred: str) -> str:
+    """클라이언트가 받을 수 있는 코덱 중 서버 설정에 맞는 코덱 (Opus를 쓸 수 없으면 PCM)"""
+    requested = list(requested or [])
+    if preferred == CODEC_OPUS and OPUS_AVAILABLE and CODEC_OPUS in requested:
+        return CODEC_OPUS
+    return CODEC_PCM
+
+class AudioPipeline:
+    """오디오 변환/인코딩 작업을 전용 스레드 풀에서 실행해 이벤트 루프를 막지 않도록 하는 클래스"""
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio")
+        self._workers = workers
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.chunks = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def _timed(self, func: Callable, chunks: List[bytes]) -> List[bytes]:
+        started = time.perf_counter()
+        output = func(chunks)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.chunks += len(chunks)
+            self.bytes_in += sum(len(chunk) for chunk in chunks)
+            self.bytes_out += sum(len(packet) for packet in output)
+            self.seconds += elapsed
+        return output
+
+    async def run(self, func: Callable[[List[bytes]], List[bytes]], chunks: List[bytes]) -> List[bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._timed, func, chunks)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "opus_available": OPUS_AVAILABLE,
+                "batches": self.batches,
+                "chunks": self.chunks,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "compression_ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else 0.0,
+                "cpu_seconds": round(self.seconds, 3)
+            }
+
+class DownstreamEncoder:
+    """실시간 세션 하나의 응답 오디오 인코더 (Live API PCM -> 리샘플링 -> Opus 또는 PCM)
+
+    리샘플러, Opus 인코더와 남은 샘플은 세션 상태이므로 한 세션은 한 번에 한 배치만 인코딩한다.
+    """
+
+    def __init__(
+        self,
+        pipeline: AudioPipeline,
+        codec: str,
+        input_rate: int,
+        output_rate: int,
+        bitrate: int,
+        frame_ms: int = 20
+    ):
+        self.pipeline = pipeline
+        self.input_rate = input_rate
+        if codec == CODEC_OPUS and not OPUS_AVAILABLE:
+            logger.warning("Opus encoding unavailable (opuslib/libopus not installed), sending PCM")
+            codec = CODEC_PCM
+        if codec == CODEC_OPUS:
+            # Opus가 지원하는 샘플레이트 중 요청값 이상인 가장 낮은 값
+            output_rate = min((rate for rate in OPUS_SAMPLE_RATES if rate >= output_rate), default=48000)
+            self._opus = opuslib.Encoder(output_rate, 1, opuslib.APPLICATION_VOIP)
+            self._opus.bitrate = bitrate
+        self.codec = codec
+        self.output_rate = output_rate
+        self._resampler = Resampler(input_rate, output_rate)
+        self._frame_samples = output_rate * frame_ms // 1000
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def _encode_batch(self, chunks: List[bytes]) -> List[bytes]:
+        samples = self._resampler.process(decode_samples(b"".join(chunks)))
+        if self.codec == CODEC_PCM:
+            return [encode_pcm16(samples)]
+
+        # Opus는 고정 길이 프레임 단위 (남는 샘플은 다음 배치와 합침)
+        samples = np.concatenate((self._pending, samples))
+        usable = len(samples) - len(samples) % self._frame_samples
+        self._pending = samples[usable:]
+        pcm = encode_pcm16(samples[:usable])
+        frame_bytes = self._frame_samples * 2
+        return [
+            self._opus.encode(pcm[offset:offset + frame_bytes], self._frame_samples)
+            for offset in range(0, len(pcm), frame_bytes)
+        ]
+
+    async def encode(self, chunks: Iterable[bytes]) -> List[bytes]:
+        """응답 오디오 청크 묶음을 인코딩 (PCM은 bytes 하나, Opus는 패킷 목록)"""
+        return await self.pipeline.run(self._encode_batch, list(chunks))
+
+# 글로벌 인스턴스
+audio_pipeline = AudioPipeline(workers=settings.audio_workers)
@@ -6,7 +6,7 @@ if os.environ.get('RAILWAY_DEPLOYMENT'):
     from .gemini_service_railway import gemini_service
 else:
     from .gemini_service import gemini_service
-from ..models.session_templates import SESSION_TEMPLATES
+from .template_registry import template_registry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -88,10 +88,12 @@ class AutobiographyService:
         
         for session_num in sorted(organized_conversations.keys()):
             session_data = organized_conversations[session_num]
-            session_template = SESSION_TEMPLATES[session_num]
+            session_template = template_registry.find(session_num)
             
-            prompt += f"\n## {session_template['title']}\n"
-            prompt += f"세션 설명: {session_template['description']}\n\n"
+            # 템플릿에서 빠진 회차의 대화도 자서전에는 포함
+            prompt += f"\n## {session_template.title if session_template else f'{session_num}회차'}\n"
+            if session_template:
+                prompt += f"세션 설명: {session_template.description}\n\n"
             
             prompt += "대화 내용:\n"
             for conv in session_data['conversations']:
@@ -118,8 +120,8 @@ class AutobiographyService:
         
         # 목차 생성
         toc = "## 목차\n\n"
-        for template in SESSION_TEMPLATES:
-            toc += f"- {template['title']}\n"
+        for template in template_registry:
+            toc += f"- {template.title}\n"
         toc += "\n---\n\n"
         
         # 최종 자서전 구성
@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+_MISSING = object()
+
+class LRUTTLCache:
+    """크기 제한(LRU)과 만료 시간(TTL)이 있는 프로세스 로컬 캐시"""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key: Hashable, value: Any):
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            self._drop(key, value)
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.monotonic()
+        self._data[key] = (now + ttl, value)
+        self._data.move_to_end(key)
+
+        # 가장 오래 사용되지 않은 쪽부터 만료된 항목 정리
+        while self._data:
+            oldest_key, (expires_at, oldest_value) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[oldest_key]
+            self.expirations += 1
+            self._drop(oldest_key, oldest_value)
+
+        while len(self._data) > self.max_size:
+            evicted_key, (_, evicted_value) = self._data.popitem(last=False)
+            self.evictions += 1
+            self._drop(evicted_key, evicted_value)
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """LRU 순서와 통계를 바꾸지 않고 조회"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        return entry[1]
+
+    def touch(self, key: Hashable):
+        """만료 시간 연장 (LRU 위치도 갱신)"""
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING:
+            self.set(key, entry[1])
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """만료되지 않은 항목 순회 (LRU 순서와 통계는 변경하지 않음)"""
+        now = time.monotonic()
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at > now:
+                yield key, value
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -1,169 +1,392 @@
-from typing import Dict, List, Optional, Any
-from ..models.session_templates import SESSION_TEMPLATES, MEMORY_GUIDE_SYSTEM_PROMPT
+import asyncio
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from ..config import settings
+from .flow_state import FlowState, OPENING_PREFIX
+from .flow_state_store import FlowStateStore, FlowStateEntry, FlowStateConflict, create_flow_state_store
+from .cache import LRUTTLCache
+from .turn_classifier import TurnClassifier, TurnDecision, TurnAction, turn_classifier
 import logging
 
 logger = logging.getLogger(__name__)
 
+_MAX_WRITE_RETRIES = 3
+
+# 꼬리 질문 템플릿들
+FOLLOW_UP_TEMPLATES = [
+    "그때 어떤 감정이 드셨나요?",
+    "그 경험이 어르신에게 어떤 영향을 미쳤나요?",
+    "그 순간을 더 자세히 들려주실 수 있나요?",
+    "그때 주변 사람들의 반응은 어떠했나요?",
+    "그 일이 있은 후 어떤 변화가 있었나요?",
+    "지금 생각해보시면 그때 어떤 마음이셨을까요?",
+    "그런 경험을 통해 무엇을 배우셨나요?"
+]
+
+def flow_state_key(user_id: int, session_number: int) -> str:
+    """흐름 상태 키 - 같은 회차라도 사용자마다 별도 상태"""
+    return f"user_{user_id}_session_{session_number}"
+
+def replay_flow_state(session_number: int, turns: List[Tuple[Optional[str], Optional[str]]]) -> FlowState:
+    """저장된 (사용자 메시지, AI 응답) 턴들을 순서대로 다시 적용해 흐름 상태 재구성"""
+    state = FlowState.new(session_number)
+    questions = state.questions
+    
+    for user_message, ai_response in turns:
+        ai_response = ai_response or ""
+        if ai_response.startswith(OPENING_PREFIX):
+            state.is_session_started = True
+            continue
+        
+        state.conversation_count += 1
+        asked = [index for index, question in enumerate(questions) if question in ai_response]
+        if asked:
+            state.current_question_index = max(state.current_question_index, asked[-1] + 1)
+            state.follow_up_count = 0
+        elif any(template in ai_response for template in FOLLOW_UP_TEMPLATES):
+            state.follow_up_count += 1
+            state.last_user_response = user_message
+    
+    return state
+
 class ConversationManager:
     """대화 흐름을 관리하는 클래스"""
     
-    def __init__(self):
-        self.session_states: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        store: Optional[FlowStateStore] = None,
+        state_loader: Optional[Callable[[int, int], Optional[FlowState]]] = None,
+        lock_stripes: Optional[int] = None,
+        classifier: Optional[TurnClassifier] = None
+    ):
+        self.store = store or create_flow_state_store()
+        # 저장소에 없는 (밀려났거나 재시작으로 사라진) 상태를 저장된 대화로부터 다시 만드는 함수
+        self.state_loader = state_loader
+        self.rebuilds = 0
+        self.classifier = classifier or turn_classifier
+        # 재구성할 대화가 없던 세션 (같은 세션을 매번 다시 조회하지 않도록 잠시 기억)
+        self._misses = LRUTTLCache(settings.flow_state_cache_size, settings.flow_state_miss_ttl_seconds)
+        # turn() 동안 읽어 둔 상태: session_key -> [상태, 버전, 변경 여부]
+        self._turns: Dict[str, List[Any]] = {}
+        # 같은 인터뷰의 턴을 직렬화하는 줄무늬 락 (키 해시로 선택, 서로 다른 인터뷰는 거의 겹치지 않음)
+        self._locks = [asyncio.Lock() for _ in range(lock_stripes or settings.flow_state_lock_stripes)]
+        self.lock_waits = 0
+    
+    def lock(self, user_id: int, session_number: int) -> asyncio.Lock:
+        """(사용자, 회차) 인터뷰 전용 락 - 한 턴의 조회부터 저장까지 감싸서 사용"""
+        lock = self._locks[hash((user_id, session_number)) % len(self._locks)]
+        if lock.locked():
+            self.lock_waits += 1
+        return lock
+    
+    def _fetch(self, session_key: str, rehydrate: bool = True) -> Optional[FlowStateEntry]:
+        entry = self.store.get(session_key)
+        if entry is not None or self.state_loader is None or not rehydrate:
+            return entry
+        if self._misses.get(session_key):
+            return None
+        
+        try:
+            _, user_id, _, session_number = session_key.split("_")
+            state = self.state_loader(int(user_id), int(session_number))
+        except Exception as e:
+            logger.error(f"Failed to rebuild flow state for {session_key}: {e}")
+            return None
+        if state is None:
+            self._misses.set(session_key, True)
+            return None
+        
+        self.rebuilds += 1
+        try:
+            return state, self.store.put(session_key, state, None)
+        except FlowStateConflict:
+            # 다른 워커가 먼저 재구성함
+            return self.store.get(session_key)
+    
+    def _read(self, session_key: str) -> Optional[FlowStateEntry]:
+        turn = self._turns.get(session_key)
+        if turn is not None:
+            return (turn[0], turn[1]) if turn[0] is not None else None
+        return self._fetch(session_key)
     
-    def initialize_session(self, session_id: int, session_number: int) -> Dict[str, Any]:
+    def _get_state(self, session_key: str) -> Optional[FlowState]:
+        entry = self._read(session_key)
+        return entry[0] if entry else None
+    
+    def current_state(self, user_id: int, session_number: int) -> Optional[FlowState]:
+        """현재 흐름 상태 (turn() 안에서는 턴에서 읽어 둔 상태)"""
+        return self._get_state(flow_state_key(user_id, session_number))
+    
+    def _write(self, session_key: str, state: FlowState, version: Optional[int]):
+        turn = self._turns.get(session_key)
+        if turn is not None:
+            turn[0], turn[2] = state, True
+            return
+        self.store.put(session_key, state, version)
+        self._misses.pop(session_key)
+    
+    def _update(self, session_key: str, mutate: Callable[[FlowState], Any], default: Any = None) -> Any:
+        """상태 변경 후 저장 (다른 워커와 충돌하면 최신 상태로 다시 시도)"""
+        for _ in range(_MAX_WRITE_RETRIES):
+            entry = self._read(session_key)
+            if entry is None:
+                return default
+            state, version = entry
+            result = mutate(state)
+            try:
+                self._write(session_key, state, version)
+                return result
+            except FlowStateConflict:
+                logger.info(f"Flow state conflict on {session_key}, retrying")
+        raise FlowStateConflict(session_key)
+    
+    @contextmanager
+    def turn(self, user_id: int, session_number: int, rehydrate: bool = True):
+        """인터뷰 한 턴 동안 상태를 한 번만 읽고 변경 사항은 끝에서 한 번에 저장 (낙관적 쓰기)
+        
+        세션을 새로 시작하는 턴은 상태를 덮어쓰므로 rehydrate=False로 재구성 조회를 생략한다.
+        """
+        session_key = flow_state_key(user_id, session_number)
+        entry = self._fetch(session_key, rehydrate)
+        state, version = entry if entry else (None, None)
+        self._turns[session_key] = [state, version, False]
+        try:
+            yield
+            state, _, dirty = self._turns[session_key]
+            if dirty:
+                self.store.put(session_key, state, version)
+                self._misses.pop(session_key)
+        finally:
+            self._turns.pop(session_key, None)
+    
+    def run_turn(
+        self,
+        user_id: int,
+        session_number: int,
+        body: Callable[[], Any],
+        rehydrate: bool = True
+    ) -> Tuple[Any, Optional[FlowState]]:
+        """turn() 안에서 body 실행, 끝에서 저장할 때 다른 워커와 충돌하면 최신 상태로 body 전체를 다시 실행
+        
+        (body 결과, 저장된 상태) 반환. 재시도해도 충돌하면 FlowStateConflict.
+        """
+        for _ in range(_MAX_WRITE_RETRIES):
+            try:
+                with self.turn(user_id, session_number, rehydrate):
+                    result = body()
+                    state = self.current_state(user_id, session_number)
+                return result, state
+            except FlowStateConflict:
+                logger.info(f"Flow state conflict on turn {flow_state_key(user_id, session_number)}, retrying")
+        raise FlowStateConflict(flow_state_key(user_id, session_number))
+    
+    def initialize_session(self, user_id: int, session_number: int) -> FlowState:
         """세션 초기화"""
-        session_key = f"session_{session_id}"
-        session_template = SESSION_TEMPLATES[session_number]
-        
-        self.session_states[session_key] = {
-            "session_number": session_number,
-            "session_title": session_template["title"],
-            "questions": session_template["questions"].copy(),
-            "current_question_index": 0,
-            "conversation_count": 0,
-            "is_session_started": False,
-            "last_user_response": None,
-            "follow_up_count": 0
-        }
+        session_key = flow_state_key(user_id, session_number)
+        state = FlowState.new(session_number)
         
-        return self.session_states[session_key]
+        # 기존 상태가 있으면 덮어쓰기
+        for _ in range(_MAX_WRITE_RETRIES):
+            entry = self._turns.get(session_key) or self.store.get(session_key)
+            try:
+                self._write(session_key, state, entry[1] if entry else None)
+                return state
+            except FlowStateConflict:
+                continue
+        raise FlowStateConflict(session_key)
     
-    def get_session_opening(self, session_id: int) -> str:
+    def get_session_opening(self, user_id: int, session_number: int) -> str:
         """세션 시작 인사말 생성"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
-            return "세션이 초기화되지 않았습니다."
+        session_key = flow_state_key(user_id, session_number)
         
-        session_state = self.session_states[session_key]
-        session_title = session_state["session_title"]
+        def mutate(session_state):
+            session_state.is_session_started = True
+            return session_state.template
         
-        opening = f"""안녕하세요, 어르신의 소중한 인생 이야기를 귀담아듣고 아름다운 자서전으로 기록해 드릴 '기억의 안내자'입니다. 제가 곁에서 길잡이가 되어드릴 테니, 그저 오랜 친구에게 이야기하듯 편안한 마음으로 함께해 주시면 됩니다. 
-
-오늘은 '{session_title}'에 대해 이야기를 나눠보고자 합니다. 준비되셨을 때 편하게 말씀해주세요."""
+        template = self._update(session_key, mutate)
+        if template is None:
+            return "세션이 초기화되지 않았습니다."
         
-        session_state["is_session_started"] = True
-        return opening
+        # 템플릿 컴파일 시 미리 만들어 둔 인사말
+        return template.opening
     
-    def get_next_question(self, session_id: int) -> Optional[str]:
+    def get_next_question(self, user_id: int, session_number: int) -> Optional[str]:
         """다음 주요 질문 가져오기"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
-            return None
+        session_key = flow_state_key(user_id, session_number)
         
-        session_state = self.session_states[session_key]
-        questions = session_state["questions"]
-        current_index = session_state["current_question_index"]
+        def mutate(session_state):
+            questions = session_state.questions
+            current_index = session_state.current_question_index
+            
+            if current_index < len(questions):
+                question = questions[current_index]
+                session_state.current_question_index += 1
+                session_state.follow_up_count = 0
+                return question
+            
+            return None
         
-        if current_index < len(questions):
-            question = questions[current_index]
-            session_state["current_question_index"] += 1
-            session_state["follow_up_count"] = 0
-            return question
+        return self._update(session_key, mutate)
+    
+    def decide_next_turn(self, user_id: int, session_number: int, user_response: str) -> Optional[TurnDecision]:
+        """답변에 대한 다음 턴 결정 (꼬리 질문 / 다음 질문 / Gemini 맥락 응답), 상태가 없으면 None"""
+        session_key = flow_state_key(user_id, session_number)
+        session_state = self._get_state(session_key)
+        if session_state is None:
+            return None
         
-        return None
+        return self.classifier.classify(user_response, session_state.follow_up_count)
     
-    def should_ask_follow_up(self, session_id: int, user_response: str) -> bool:
+    def should_ask_follow_up(self, user_id: int, session_number: int, user_response: str) -> bool:
         """꼬리 질문이 필요한지 판단"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
-            return False
-        
-        session_state = self.session_states[session_key]
-        
-        # 간단한 답변이거나 꼬리 질문이 아직 2개 미만인 경우
-        if (len(user_response.strip()) < 50 or 
-            session_state["follow_up_count"] < 2):
-            return True
-        
-        return False
+        decision = self.decide_next_turn(user_id, session_number, user_response)
+        return decision is not None and decision.action == TurnAction.FOLLOW_UP
     
-    def generate_follow_up_question(self, session_id: int, user_response: str) -> Optional[str]:
+    def generate_follow_up_question(self, user_id: int, session_number: int, user_response: str) -> Optional[str]:
         """사용자 답변에 기반한 꼬리 질문 생성"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
-            return None
+        session_key = flow_state_key(user_id, session_number)
         
-        session_state = self.session_states[session_key]
-        session_state["follow_up_count"] += 1
-        session_state["last_user_response"] = user_response
-        
-        # 꼬리 질문 템플릿들
-        follow_up_templates = [
-            "그때 어떤 감정이 드셨나요?",
-            "그 경험이 어르신에게 어떤 영향을 미쳤나요?",
-            "그 순간을 더 자세히 들려주실 수 있나요?",
-            "그때 주변 사람들의 반응은 어떠했나요?",
-            "그 일이 있은 후 어떤 변화가 있었나요?",
-            "지금 생각해보시면 그때 어떤 마음이셨을까요?",
-            "그런 경험을 통해 무엇을 배우셨나요?"
-        ]
+        def mutate(session_state):
+            session_state.follow_up_count += 1
+            session_state.last_user_response = user_response
+            return session_state.follow_up_count
+        
+        follow_up_count = self._update(session_key, mutate)
+        if follow_up_count is None:
+            return None
         
         # 단순하게 순환하며 선택 (추후 AI로 개선 가능)
-        template_index = session_state["follow_up_count"] % len(follow_up_templates)
-        return follow_up_templates[template_index]
+        template_index = follow_up_count % len(FOLLOW_UP_TEMPLATES)
+        return FOLLOW_UP_TEMPLATES[template_index]
     
-    def can_move_to_next_question(self, session_id: int) -> bool:
+    def can_move_to_next_question(self, user_id: int, session_number: int) -> bool:
         """다음 질문으로 넘어갈 수 있는지 판단"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
+        session_key = flow_state_key(user_id, session_number)
+        session_state = self._get_state(session_key)
+        if session_state is None:
             return False
         
-        session_state = self.session_states[session_key]
-        
         # 최소 1번의 답변과 1번의 꼬리 질문이 있었다면 다음으로 넘어가기 가능
-        return session_state["follow_up_count"] >= 1
+        return session_state.follow_up_count >= 1
     
-    def get_session_closure(self, session_id: int, next_session_title: Optional[str] = None) -> str:
+    def get_session_closure(self, user_id: int, session_number: int, next_session_title: Optional[str] = None) -> str:
         """세션 마무리 멘트"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
+        session_key = flow_state_key(user_id, session_number)
+        session_state = self._get_state(session_key)
+        if session_state is None:
             return "감사합니다."
         
-        session_state = self.session_states[session_key]
-        session_title = session_state["session_title"]
-        
-        closure = f"오늘 '{session_title}'에 대한 어르신의 소중한 경험 덕분에 더 깊이 이해하게 되었습니다."
-        
-        if next_session_title:
-            closure += f" 다음에는 '{next_session_title}'에 대한 이야기를 나눠보면 좋겠습니다."
-        
-        closure += " 오늘도 소중한 이야기 들려주셔서 정말 감사합니다."
-        
-        return closure
+        template = session_state.template
+        # 다음 세션 예고가 템플릿 순서와 같으면 미리 만들어 둔 멘트 사용
+        if next_session_title == template.next_title:
+            return template.closure
+        return template.render_closure(next_session_title)
     
-    def get_session_progress(self, session_id: int) -> Dict[str, Any]:
+    def get_session_progress(self, user_id: int, session_number: int) -> Dict[str, Any]:
         """세션 진행 상황 반환"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
+        session_key = flow_state_key(user_id, session_number)
+        session_state = self._get_state(session_key)
+        if session_state is None:
             return {}
         
-        session_state = self.session_states[session_key]
-        total_questions = len(session_state["questions"])
-        current_index = session_state["current_question_index"]
+        total_questions = len(session_state.questions)
+        current_index = session_state.current_question_index
         
         return {
-            "session_title": session_state["session_title"],
+            "session_title": session_state.session_title,
             "total_questions": total_questions,
             "current_question": current_index,
             "progress_percent": (current_index / total_questions) * 100,
-            "conversation_count": session_state["conversation_count"],
+            "conversation_count": session_state.conversation_count,
             "is_completed": current_index >= total_questions
         }
     
-    def update_conversation_count(self, session_id: int):
+    def update_conversation_count(self, user_id: int, session_number: int):
         """대화 수 증가"""
-        session_key = f"session_{session_id}"
-        if session_key in self.session_states:
-            self.session_states[session_key]["conversation_count"] += 1
+        session_key = flow_state_key(user_id, session_number)
+        
+        def mutate(session_state):
+            session_state.conversation_count += 1
+        
+        self._update(session_key, mutate)
     
-    def is_session_completed(self, session_id: int) -> bool:
+    def is_session_completed(self, user_id: int, session_number: int) -> bool:
         """세션이 완료되었는지 확인"""
-        session_key = f"session_{session_id}"
-        if session_key not in self.session_states:
+        session_key = flow_state_key(user_id, session_number)
+        session_state = self._get_state(session_key)
+        if session_state is None:
             return False
         
-        session_state = self.session_states[session_key]
-        return session_state["current_question_index"] >= len(session_state["questions"])
+        return session_state.current_question_index >= len(session_state.questions)
+    
+    
+    def snapshot_states(self) -> List[List[Any]]:
+        """메모리에 있는 흐름 상태 전체를 [키, 압축 상태] 목록으로 (종료 시 스냅샷용)"""
+        return [[key, state.to_row()] for key, (state, _) in self.store.items()]
+    
+    def restore_states(self, rows: List[List[Any]]) -> int:
+        """스냅샷의 흐름 상태 복원 (이미 있는 상태는 유지), 복원한 수 반환"""
+        restored = 0
+        for key, row in rows:
+            try:
+                self.store.put(key, FlowState.from_row(row), None)
+            except (FlowStateConflict, LookupError, TypeError) as e:
+                logger.warning(f"Skipping snapshot flow state {key}: {e}")
+                continue
+            self._misses.pop(key)
+            restored += 1
+        return restored
+    
+    def stats(self) -> Dict[str, Any]:
+        """흐름 상태 저장소 지표 (크기, 적중률, 밀려난 수, 재구성 수)"""
+        return {
+            **self.store.stats(),
+            "rebuilds": self.rebuilds,
+            "rebuild_misses": self._misses.stats(),
+            "lock_stripes": len(self._locks),
+            "lock_waits": self.lock_waits
+        }
+
+def load_persisted_flow_state(user_id: int, session_number: int) -> Optional[FlowState]:
+    """DB에 저장된 사용자의 회차 대화로부터 흐름 상태 재구성 (대화가 없으면 None)
+    
+    sessions와 conversations를 한 번에 조인해 필요한 컬럼만 읽는다
+    (conversations(session_id, created_at) 인덱스 사용).
+    """
+    from ..db.database import SessionLocal
+    from ..models.session import Session as UserSession
+    from ..models.conversation import Conversation
+    from .archive_service import archive_service
+    
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            UserSession.id.label("session_id"),
+            Conversation.id,
+            Conversation.user_message,
+            Conversation.ai_response
+        ).join(
+            Conversation, Conversation.session_id == UserSession.id
+        ).filter(
+            UserSession.user_id == user_id,
+            UserSession.session_number == session_number
+        ).order_by(Conversation.created_at, Conversation.id).all()
+        
+        if not rows:
+            return None
+        
+        # 보관된 세션은 본문이 비어 있으므로 보관소에서 읽음
+        archived = {}
+        if any(row.user_message is None and row.ai_response is None for row in rows):
+            archived = archive_service.get_texts(db, {row.session_id for row in rows})
+    finally:
+        db.close()
+    
+    turns = [
+        archived.get(row.id, (row.user_message, row.ai_response))
+        for row in rows
+    ]
+    return replay_flow_state(session_number, turns)
 
 # 글로벌 인스턴스
-conversation_manager = ConversationManager()
\ No newline at end of file
+conversation_manager = ConversationManager(state_loader=load_persisted_flow_state)
\ No newline at end of file
@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional, Tuple
+from .template_registry import CompiledSessionTemplate, OPENING_PREFIX, template_registry
+
+class FlowState:
+    """세션 하나의 인터뷰 흐름 상태 (변하는 값만 보관하고 템플릿은 참조)"""
+
+    __slots__ = (
+        "template",
+        "current_question_index",
+        "conversation_count",
+        "is_session_started",
+        "last_user_response",
+        "follow_up_count"
+    )
+
+    def __init__(self, template: CompiledSessionTemplate):
+        self.template = template
+        self.current_question_index = 0
+        self.conversation_count = 0
+        self.is_session_started = False
+        self.last_user_response: Optional[str] = None
+        self.follow_up_count = 0
+
+    @classmethod
+    def new(cls, session_number: int) -> "FlowState":
+        return cls(template_registry.get(session_number))
+
+    @property
+    def session_number(self) -> int:
+        return self.template.session_number
+
+    @property
+    def session_title(self) -> str:
+        return self.template.title
+
+    @property
+    def questions(self) -> Tuple[str, ...]:
+        return self.template.questions
+
+    def to_dict(self) -> Dict[str, Any]:
+        """저장용 dict (템플릿 내용은 session_number로만 기록)"""
+        return {
+            "session_number": self.template.session_number,
+            "current_question_index": self.current_question_index,
+            "conversation_count": self.conversation_count,
+            "is_session_started": self.is_session_started,
+            "last_user_response": self.last_user_response,
+            "follow_up_count": self.follow_up_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FlowState":
+        """to_dict 결과 (또는 이전 형식의 상태 dict)로부터 복원"""
+        state = cls.new(data["session_number"])
+        state.current_question_index = data.get("current_question_index", 0)
+        state.conversation_count = data.get("conversation_count", 0)
+        state.is_session_started = data.get("is_session_started", False)
+        state.last_user_response = data.get("last_user_response")
+        state.follow_up_count = data.get("follow_up_count", 0)
+        return state
+
+    def to_row(self) -> List[Any]:
+        """스냅샷용 압축 표현 (키 이름 없이 값만)"""
+        return [
+            self.template.session_number,
+            self.current_question_index,
+            self.conversation_count,
+            int(self.is_session_started),
+            self.follow_up_count,
+            self.last_user_response
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "FlowState":
+        state = cls.new(row[0])
+        state.current_question_index = row[1]
+        state.conversation_count = row[2]
+        state.is_session_started = bool(row[3])
+        state.follow_up_count = row[4]
+        state.last_user_response = row[5]
+        return state
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FlowState):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"FlowState({self.to_dict()})"
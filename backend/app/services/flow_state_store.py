@@ -0,0 +1,138 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from ..config import settings
+from ..models.flow_state import FlowStateRecord
+from .flow_state import FlowState
+from .cache import LRUTTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (상태, 버전)
+FlowStateEntry = Tuple[FlowState, int]
+
+class FlowStateConflict(Exception):
+    """다른 워커가 먼저 상태를 변경했을 때 (낙관적 쓰기 실패)"""
+    pass
+
+class FlowStateStore:
+    """인터뷰 흐름 상태 저장소 인터페이스"""
+
+    def get(self, key: str) -> Optional[FlowStateEntry]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, FlowStateEntry]:
+        raise NotImplementedError
+
+    def put(self, key: str, state: FlowState, expected_version: Optional[int]) -> int:
+        """expected_version이 현재 버전과 같을 때만 저장 (None이면 새로 생성), 새 버전 반환"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def items(self) -> Iterable[Tuple[str, FlowStateEntry]]:
+        """보관 중인 상태 전체 (스냅샷용, 프로세스 로컬 저장소만 지원)"""
+        return iter(())
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class InMemoryFlowStateStore(FlowStateStore):
+    """프로세스 로컬 저장소 (단일 워커용, 상태 객체를 직렬화 없이 그대로 보관)
+
+    크기와 TTL이 제한된 LRU 캐시라 오래 쓰지 않은 세션은 밀려나며,
+    밀려난 상태는 ConversationManager가 저장된 대화로부터 다시 만든다.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries = LRUTTLCache(max_size, ttl_seconds)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, FlowStateEntry]:
+        entries = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    def put(self, key: str, state: FlowState, expected_version: Optional[int]) -> int:
+        current = self._entries.peek(key)
+        # 턴 도중 밀려난 항목은 그대로 다시 넣음 (단일 프로세스라 다른 writer 없음)
+        if current is not None and current[1] != expected_version:
+            raise FlowStateConflict(key)
+
+        version = (expected_version or 0) + 1
+        self._entries.set(key, (state, version))
+        return version
+
+    def delete(self, key: str):
+        self._entries.pop(key)
+
+    def items(self) -> Iterable[Tuple[str, FlowStateEntry]]:
+        # 오래 사용하지 않은 순서 (복원 시 같은 LRU 순서가 됨)
+        return self._entries.items()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+class DatabaseFlowStateStore(FlowStateStore):
+    """flow_states 테이블을 사용하는 공유 저장소 (SQLite/PostgreSQL)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.table = FlowStateRecord.__table__
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, FlowStateEntry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.table.c.key, self.table.c.state, self.table.c.version)
+                .where(self.table.c.key.in_(keys))
+            )
+            return {
+                row.key: (FlowState.from_dict(json.loads(row.state)), row.version)
+                for row in rows
+            }
+
+    def put(self, key: str, state: FlowState, expected_version: Optional[int]) -> int:
+        payload = json.dumps(state.to_dict(), ensure_ascii=False)
+
+        with self.engine.begin() as connection:
+            if expected_version is None:
+                try:
+                    connection.execute(
+                        insert(self.table).values(key=key, state=payload, version=1)
+                    )
+                except IntegrityError:
+                    raise FlowStateConflict(key)
+                return 1
+
+            result = connection.execute(
+                update(self.table)
+                .where(self.table.c.key == key, self.table.c.version == expected_version)
+                .values(state=payload, version=expected_version + 1)
+            )
+            if result.rowcount == 0:
+                raise FlowStateConflict(key)
+            return expected_version + 1
+
+    def delete(self, key: str):
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.key == key))
+
+def create_flow_state_store() -> FlowStateStore:
+    """설정에 따라 흐름 상태 저장소 생성"""
+    if settings.flow_state_backend == "database":
+        from ..db.database import engine
+        logger.info("Using shared database flow state store")
+        return DatabaseFlowStateStore(engine)
+    return InMemoryFlowStateStore(
+        max_size=settings.flow_state_cache_size,
+        ttl_seconds=settings.flow_state_ttl_seconds
+    )
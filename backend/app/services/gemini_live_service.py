@@ -2,10 +2,15 @@ import asyncio
 import json
 import base64
 import logging
-from typing import Optional, AsyncGenerator
+from typing import Any, Optional, AsyncGenerator
 import google.generativeai as genai
 from ..config import settings
-from ..models.session_templates import SESSION_TEMPLATES, MEMORY_GUIDE_SYSTEM_PROMPT
+from ..models.session_templates import MEMORY_GUIDE_SYSTEM_PROMPT
+from .template_registry import live_opening_message, template_registry
+from .tts_cache import played_utterances, tts_cache
+from .live_protocol import (
+    BINARY_PROTOCOL, FRAME_AUDIO_IN, FrameCodec, FrameError, negotiate_protocol
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +27,7 @@ class GeminiLiveService:
             raise Exception("Real Google API key required for live audio")
         
         try:
-            session_template = SESSION_TEMPLATES[session_number]
+            session_template = template_registry.get(session_number)
             
             # Gemini Live API 설정
             config = {
@@ -31,7 +36,7 @@ class GeminiLiveService:
                     "speech_config": {
                         "voice_config": {
                             "prebuilt_voice_config": {
-                                "voice_name": "Pico"  # 한국어 지원 음성
+                                "voice_name": settings.tts_voice
                             }
                         }
                     }
@@ -40,8 +45,8 @@ class GeminiLiveService:
                     "parts": [{
                         "text": f"""{MEMORY_GUIDE_SYSTEM_PROMPT}
 
-현재 세션: {session_template['title']}
-세션 목표: {session_template.get('description', '')}
+현재 세션: {session_template.title}
+세션 목표: {session_template.description}
 
 당신은 지금 실시간 음성 대화를 통해 이 분의 소중한 인생 이야기를 듣고 있습니다. 
 자연스럽고 따뜻한 목소리로 대화해주세요. 
@@ -69,8 +74,28 @@ class GeminiLiveService:
             logger.error(f"Failed to start live session: {e}")
             raise
     
-    async def handle_websocket_connection(self, websocket, session_key: str):
-        """WebSocket 연결 처리 및 실시간 오디오 스트리밍"""
+    async def _send_audio_response(self, websocket, codec: FrameCodec, audio: Optional[bytes], text: str):
+        """AI 응답 전송 (바이너리 프로토콜은 PCM 프레임 + 텍스트 제어 메시지, 기존 형식은 base64 JSON)"""
+        if codec.protocol == BINARY_PROTOCOL:
+            if audio:
+                await websocket.send(codec.encode_audio(audio))
+            await websocket.send(json.dumps({
+                "type": "audio_response",
+                "text": text,
+                "audio_seq": codec.frames_out if audio else None
+            }))
+        else:
+            await websocket.send(json.dumps({
+                "type": "audio_response",
+                "audio_data": base64.b64encode(audio).decode() if audio else None,
+                "text": text
+            }))
+    
+    async def handle_websocket_connection(self, websocket, session_key: str, protocol=None):
+        """WebSocket 연결 처리 및 실시간 오디오 스트리밍
+        
+        protocol은 연결 시 요청된 버전(하나 또는 목록)이며, 연결 후 hello 메시지로도 협상할 수 있다.
+        """
         if session_key not in self.active_sessions:
             await websocket.close(code=4004, reason="Session not found")
             return
@@ -78,29 +103,40 @@ class GeminiLiveService:
         session_info = self.active_sessions[session_key]
         session_info["websocket"] = websocket
         live_session = session_info["session"]
+        codec = FrameCodec(negotiate_protocol(protocol))
         
         try:
             # 세션 시작 인사
-            session_template = SESSION_TEMPLATES[session_info["session_number"]]
-            opening_message = f"""안녕하세요! 오늘은 "{session_template['title']}"에 대한 이야기를 들려주세요. 
-편안하게 시작해보겠습니다. 어떤 기억부터 시작하고 싶으신가요?"""
+            session_title = template_registry.title(session_info["session_number"])
+            opening_message = live_opening_message(session_title)
             
             # AI 음성으로 인사 생성
             opening_audio = await self._generate_speech(opening_message)
             if opening_audio:
-                await websocket.send(json.dumps({
-                    "type": "audio_response",
-                    "audio_data": opening_audio,
-                    "text": opening_message
-                }))
+                await self._send_audio_response(websocket, codec, opening_audio, opening_message)
             
             # 실시간 오디오 처리 루프
             async def process_incoming_audio():
                 async for message in websocket:
                     try:
+                        if isinstance(message, bytes):
+                            # 바이너리 프레임: 헤더 뒤의 PCM을 그대로 전달
+                            frame = codec.decode(message)
+                            if frame.frame_type == FRAME_AUDIO_IN:
+                                await live_session.send(frame.payload.tobytes())
+                            continue
+                        
                         data = json.loads(message)
                         
-                        if data["type"] == "audio_chunk":
+                        if data["type"] == "hello":
+                            # 프로토콜 버전 협상 (지원하는 가장 높은 버전으로 응답)
+                            codec.protocol = negotiate_protocol(data.get("protocols", data.get("protocol")))
+                            await websocket.send(json.dumps({
+                                "type": "hello",
+                                "protocol": codec.protocol
+                            }))
+                        
+                        elif data["type"] == "audio_chunk":
                             # 실시간 오디오 청크를 Gemini Live API로 전송
                             audio_data = base64.b64decode(data["audio_data"])
                             await live_session.send(audio_data)
@@ -111,24 +147,18 @@ class GeminiLiveService:
                             
                             if response.audio:
                                 # AI 음성 응답을 클라이언트로 전송
-                                audio_b64 = base64.b64encode(response.audio).decode()
-                                await websocket.send(json.dumps({
-                                    "type": "audio_response", 
-                                    "audio_data": audio_b64,
-                                    "text": response.text or ""
-                                }))
+                                await self._send_audio_response(websocket, codec, response.audio, response.text or "")
                         
                         elif data["type"] == "text_message":
                             # 텍스트 메시지 처리
                             text_response = await live_session.send_text(data["message"])
-                            speech_audio = await self._generate_speech(text_response.text)
+                            # 매번 다른 응답이므로 캐시하지 않음
+                            speech_audio = await self._generate_speech(text_response.text, cache=False)
                             
-                            await websocket.send(json.dumps({
-                                "type": "audio_response",
-                                "audio_data": speech_audio,
-                                "text": text_response.text
-                            }))
+                            await self._send_audio_response(websocket, codec, speech_audio, text_response.text)
                             
+                    except FrameError as e:
+                        logger.warning(f"Invalid audio frame: {e}")
                     except Exception as e:
                         logger.error(f"Error processing message: {e}")
                         await websocket.send(json.dumps({
@@ -147,8 +177,26 @@ class GeminiLiveService:
             # 세션 정리
             await self.end_live_session(session_key)
     
-    async def _generate_speech(self, text: str) -> Optional[str]:
-        """텍스트를 음성으로 변환"""
+    async def _generate_speech(self, text: str, cache: bool = True) -> Optional[Any]:
+        """텍스트를 음성으로 변환 (PCM, 고정 문장은 디스크 캐시에서 바로)"""
+        if not cache:
+            return await self._synthesize_speech(text)
+        return await tts_cache.get_or_synthesize(text, settings.tts_voice, settings.receive_sample_rate, self._synthesize_speech)
+    
+    async def warm_speech_cache(self) -> int:
+        """회차 인사 음성을 미리 합성 (실제 API 키가 없으면 건너뜀)"""
+        if settings.google_api_key.startswith("AIzaSyDummy"):
+            return 0
+        return await tts_cache.warm(
+            played_utterances(),
+            settings.tts_voice,
+            settings.receive_sample_rate,
+            self._synthesize_speech,
+            concurrency=settings.tts_cache_warm_concurrency
+        )
+    
+    async def _synthesize_speech(self, text: str) -> Optional[bytes]:
+        """Gemini 음성 생성 (PCM bytes)"""
         try:
             # Google TTS 또는 Gemini의 음성 생성 기능 사용
             speech_response = await self.client.agenerate_content(
@@ -159,7 +207,7 @@ class GeminiLiveService:
                     "speech_config": {
                         "voice_config": {
                             "prebuilt_voice_config": {
-                                "voice_name": "Pico"
+                                "voice_name": settings.tts_voice
                             }
                         }
                     }
@@ -167,7 +215,7 @@ class GeminiLiveService:
             )
             
             if speech_response.audio:
-                return base64.b64encode(speech_response.audio).decode()
+                return speech_response.audio
             return None
             
         except Exception as e:
@@ -6,8 +6,9 @@ from typing import Optional, AsyncGenerator
 import pyaudio
 from google import genai
 from ..config import settings
-from ..models.session_templates import SESSION_TEMPLATES, MEMORY_GUIDE_SYSTEM_PROMPT
+from .template_registry import template_registry
 from .conversation_manager import conversation_manager
+from .turn_classifier import TurnAction
 
 class GeminiService:
     def __init__(self):
@@ -29,30 +30,33 @@ class GeminiService:
         response = await model.generate_content_async(messages)
         return response.text
     
-    async def generate_interview_response(
-        self, 
-        session_id: int,
-        session_number: int, 
+    def _plan_template_response(
+        self,
+        user_id: int,
+        session_number: int,
         user_message: str,
-        conversation_history: list = [],
-        is_session_start: bool = False
-    ) -> str:
-        """인터뷰 응답 생성 (개선된 버전)"""
-        session_template = SESSION_TEMPLATES[session_number]
+        is_session_start: bool
+    ) -> Optional[str]:
+        """템플릿 기반 응답 결정 (흐름 상태만 사용, 해당 없으면 None)"""
+        session_template = template_registry.get(session_number)
         
         # 세션이 시작된 적이 없다면 초기화
         if is_session_start:
-            conversation_manager.initialize_session(session_id, session_number)
-            return conversation_manager.get_session_opening(session_id)
+            conversation_manager.initialize_session(user_id, session_number)
+            return conversation_manager.get_session_opening(user_id, session_number)
         
         # 대화 수 업데이트
-        conversation_manager.update_conversation_count(session_id)
+        conversation_manager.update_conversation_count(user_id, session_number)
         
         # 사용자 응답이 있는 경우 (첫 인사가 아닌 경우)
         if user_message and user_message.strip():
-            # 꼬리 질문이 필요한지 판단
-            if conversation_manager.should_ask_follow_up(session_id, user_message):
-                follow_up = conversation_manager.generate_follow_up_question(session_id, user_message)
+            # 로컬 판단 단계: 꼬리 질문 / 다음 질문 / Gemini 맥락 응답
+            decision = conversation_manager.decide_next_turn(user_id, session_number, user_message)
+            if decision is None or decision.action == TurnAction.LLM:
+                return None
+            
+            if decision.action == TurnAction.FOLLOW_UP:
+                follow_up = conversation_manager.generate_follow_up_question(user_id, session_number, user_message)
                 if follow_up:
                     # 공감 표현과 함께 꼬리 질문
                     empathy_responses = [
@@ -67,24 +71,39 @@ class GeminiService:
                     return f"{empathy} {follow_up}"
             
             # 다음 주요 질문으로 넘어갈 시점인지 확인
-            elif conversation_manager.can_move_to_next_question(session_id):
-                next_question = conversation_manager.get_next_question(session_id)
+            elif conversation_manager.can_move_to_next_question(user_id, session_number):
+                next_question = conversation_manager.get_next_question(user_id, session_number)
                 if next_question:
                     return f"이제 다음 이야기로 넘어가 봐도 괜찮을까요? {next_question}"
                 else:
-                    # 세션 완료
-                    next_session_number = session_number + 1
-                    next_session_title = None
-                    if next_session_number < len(SESSION_TEMPLATES):
-                        next_session_title = SESSION_TEMPLATES[next_session_number]["title"]
-                    
-                    return conversation_manager.get_session_closure(session_id, next_session_title)
+                    # 세션 완료 (다음 세션 예고가 들어간 마무리 멘트는 템플릿에 미리 만들어 둠)
+                    return conversation_manager.get_session_closure(user_id, session_number, session_template.next_title)
         
         # 첫 질문 제시 (사용자가 "시작하겠습니다" 등으로 응답한 경우)
-        first_question = conversation_manager.get_next_question(session_id)
+        first_question = conversation_manager.get_next_question(user_id, session_number)
         if first_question:
             return first_question
         
+        return None
+    
+    async def generate_interview_response(
+        self, 
+        user_id: int,
+        session_number: int, 
+        user_message: str,
+        conversation_history: list = [],
+        is_session_start: bool = False
+    ) -> str:
+        """인터뷰 응답 생성 (개선된 버전)"""
+        # 흐름 상태는 턴마다 한 번 읽고 한 번 저장 (다른 워커와 충돌하면 턴 전체를 최신 상태로 다시 계산)
+        template_response, _ = conversation_manager.run_turn(
+            user_id, session_number,
+            lambda: self._plan_template_response(user_id, session_number, user_message, is_session_start),
+            rehydrate=not is_session_start
+        )
+        if template_response:
+            return template_response
+        
         # AI 백업 응답 (복잡한 상황 처리)
         return await self.generate_contextual_response(
             session_number, user_message, conversation_history
@@ -97,14 +116,8 @@ class GeminiService:
         conversation_history: list = []
     ) -> str:
         """맥락적 응답 생성 (백업 메서드)"""
-        session_template = SESSION_TEMPLATES[session_number]
-        
-        system_prompt = f"""{MEMORY_GUIDE_SYSTEM_PROMPT}
-
-현재 세션: {session_template['title']}
-세션 목표: {session_template['objective']}
-
-현재 사용자가 말씀하신 내용에 대해 '기억의 안내자'로서 적절한 응답을 해주세요."""
+        # 세션별 시스템 프롬프트는 템플릿 레지스트리에 미리 만들어 둠
+        system_prompt = template_registry.get(session_number).system_instruction
         
         messages = [{"role": "system", "content": system_prompt}]
         
@@ -160,8 +173,7 @@ class GeminiService:
         
         result = ""
         for session_num in sorted(organized.keys()):
-            session_template = SESSION_TEMPLATES[session_num]
-            result += f"\n\n## {session_template['title']}\n"
+            result += f"\n\n## {template_registry.title(session_num)}\n"
             for conv in organized[session_num]:
                 result += f"\n사용자: {conv['user']}\n"
                 result += f"AI: {conv['ai']}\n"
@@ -0,0 +1,92 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from ..config import settings
+from ..models.conversation import Conversation
+from .cache import LRUTTLCache
+
+# 커밋 전까지 모아 두는 대화 변경 (DB 세션의 info에 보관, 롤백되면 버림)
+_PENDING_CHANGES = "history_buffer_changes"
+
+class HistoryBuffer:
+    """세션(sessions.id)별 최근 대화 턴 링 버퍼 (인터뷰 맥락용 최근 대화 조회를 생략)
+
+    버퍼에 없으면 (재시작, 밀려남) 호출하는 쪽이 DB에서 읽어 fill로 채운다.
+    대화가 어느 경로로 저장되든 (텍스트 인터뷰, 실시간 트랜스크립트, 보관) 커밋될 때
+    새 턴은 덧붙이고 수정/삭제된 세션의 버퍼는 버린다.
+    빈 버퍼도 "대화 없음"이라는 정보이므로 그대로 보관한다.
+    """
+
+    def __init__(self, turns: int, max_sessions: int, ttl_seconds: float, enabled: bool = True):
+        self.turns = turns
+        self.enabled = enabled and turns > 0 and max_sessions > 0
+        self._buffers = LRUTTLCache(max(max_sessions, 1), ttl_seconds)
+
+    def get(self, session_id: int) -> Optional[List[Dict[str, Any]]]:
+        """최근 턴 목록 (오래된 순), 버퍼에 없으면 None"""
+        if not self.enabled:
+            return None
+        buffer = self._buffers.get(session_id)
+        return list(buffer) if buffer is not None else None
+
+    def fill(self, session_id: int, history: Iterable[Dict[str, Any]]):
+        """DB에서 읽은 최근 턴들(오래된 순)로 버퍼 채우기"""
+        if self.enabled:
+            self._buffers.set(session_id, deque(history, maxlen=self.turns))
+
+    def append(self, session_id: int, user_message: Optional[str], ai_response: Optional[str]):
+        """새로 저장한 턴 추가 (버퍼가 없으면 DB가 기준이므로 무시)"""
+        if not self.enabled:
+            return
+        buffer: Optional[Deque[Dict[str, Any]]] = self._buffers.peek(session_id)
+        if buffer is not None:
+            buffer.append({"user_message": user_message, "ai_response": ai_response})
+            self._buffers.touch(session_id)
+
+    def invalidate(self, session_id: int):
+        self._buffers.pop(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._buffers.stats(), "enabled": self.enabled, "turns": self.turns}
+
+# 글로벌 인스턴스
+# database 흐름 상태 저장소(여러 워커)에서는 다른 워커가 쓴 턴을 알 수 없으므로 사용하지 않음
+history_buffer = HistoryBuffer(
+    turns=settings.history_buffer_turns,
+    max_sessions=settings.history_buffer_sessions,
+    ttl_seconds=settings.history_buffer_ttl_seconds,
+    enabled=settings.flow_state_backend == "memory"
+)
+
+def _pending_changes(target) -> Optional[List[Any]]:
+    session = object_session(target)
+    return session.info.setdefault(_PENDING_CHANGES, []) if session is not None else None
+
+@event.listens_for(Conversation, "after_insert")
+def _record_inserted_turn(mapper, connection, target):
+    changes = _pending_changes(target)
+    if changes is not None:
+        changes.append((target.session_id, target.user_message, target.ai_response))
+
+@event.listens_for(Conversation, "after_update")
+@event.listens_for(Conversation, "after_delete")
+def _record_changed_turn(mapper, connection, target):
+    changes = _pending_changes(target)
+    if changes is not None:
+        changes.append((target.session_id, None, None))
+    else:
+        history_buffer.invalidate(target.session_id)
+
+@event.listens_for(Session, "after_commit")
+def _apply_turn_changes(session):
+    for session_id, user_message, ai_response in session.info.pop(_PENDING_CHANGES, ()):
+        if user_message is None and ai_response is None:
+            # 수정/삭제 (보관된 스텁 포함) - 다음 조회 때 DB에서 다시 채움
+            history_buffer.invalidate(session_id)
+        else:
+            history_buffer.append(session_id, user_message, ai_response)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_turn_changes(session):
+    session.info.pop(_PENDING_CHANGES, None)
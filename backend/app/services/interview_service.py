@@ -1,7 +1,9 @@
 import asyncio
 import base64
+import functools
 import io
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, List
 # Railway에서는 pyaudio 사용 안함
 try:
     import pyaudio
@@ -9,21 +11,56 @@ try:
 except ImportError:
     AUDIO_AVAILABLE = False
 from google import genai
+from google.genai import types as genai_types
 from ..config import settings
-from ..models.session_templates import SESSION_TEMPLATES, MEMORY_GUIDE_SYSTEM_PROMPT
+from .template_registry import LIVE_BASE_SYSTEM_INSTRUCTION, template_registry
+from .live_stream import LiveStream
+from .vad import create_vad
+from .audio_buffers import JitterBuffer, create_aggregator, create_jitter_buffer
+from .live_pool import LiveConnectionPool
+from .recording_service import recording_service
+from .transcript_sink import transcript_sink
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 어르신 말 받아쓰기 요청 (설정 필드가 있는 SDK 버전에서만, 없으면 AI 응답만 기록됨)
+INPUT_TRANSCRIPTION_CONFIG = (
+    {"input_audio_transcription": {}}
+    if "input_audio_transcription" in getattr(getattr(genai_types, "LiveConnectConfig", None), "model_fields", {})
+    else {}
+)
+
 class LiveInterviewService:
     def __init__(self):
         self.client = genai.Client(
             api_key=settings.google_api_key,
             http_options={"api_version": "v1beta"}
         )
-        self.pya = pyaudio.PyAudio()
+        # PyAudio는 사용 가능한 경우에만 초기화
+        self.pya = pyaudio.PyAudio() if AUDIO_AVAILABLE else None
         self.active_sessions: Dict[str, Any] = {}
-        
+        # 재배포 전 진행 중이던 세션 메타데이터 (스냅샷에서 복원, 재연결 시 사용)
+        self.resumable_sessions: Dict[str, Dict[str, Any]] = {}
+        # 인터뷰 시작 시 핸드셰이크를 기다리지 않도록 미리 열어 둔 연결 (공통 시스템 프롬프트)
+        self.pool = LiveConnectionPool(
+            connect=self._connect_pooled,
+            size=settings.live_pool_size,
+            idle_timeout=settings.live_pool_idle_timeout_seconds,
+            sweep_interval=settings.live_pool_sweep_seconds
+        )
+    
+    async def _connect_pooled(self):
+        """풀에 넣을 Live API 연결 (세션 맥락 없이 공통 시스템 프롬프트만)"""
+        return await self.client.aio.live.connect(
+            model=settings.gemini_live_model,
+            config={
+                "response_modalities": ["AUDIO"],
+                "system_instruction": LIVE_BASE_SYSTEM_INSTRUCTION,
+                **INPUT_TRANSCRIPTION_CONFIG
+            }
+        )
+    
     async def start_live_interview(
         self, 
         user_id: int,
@@ -36,48 +73,71 @@ class LiveInterviewService:
         if session_key in self.active_sessions:
             return session_key
         
-        session_template = SESSION_TEMPLATES[session_number]
+        resumed = self.resumable_sessions.pop(session_key, None)
+        
+        session_template = template_registry.get(session_number)
         
-        # Gemini Live API 설정
+        # Gemini Live API 설정 (시스템 프롬프트는 템플릿 레지스트리에 미리 만들어 둠)
         config = {
             "response_modalities": ["AUDIO"],
-            "system_instruction": f"""{MEMORY_GUIDE_SYSTEM_PROMPT}
-
-현재 세션: {session_template['title']}
-세션 목표: {session_template['objective']}
-세션 질문들: {', '.join(session_template['questions'][:3])}...
-
-실시간 음성 대화이므로 다음 사항을 추가로 준수하세요:
-- 음성으로 대화하므로 자연스럽고 말하기 쉬운 표현을 사용하세요
-- 너무 긴 문장보다는 적당한 길이로 나누어 말하세요
-- 상대방의 말이 끝나길 기다리고 적절한 타이밍에 응답하세요
-- 감정을 목소리로 표현할 수 있으므로 따뜻하고 공감적인 톤을 유지하세요"""
+            "system_instruction": session_template.live_system_instruction,
+            **INPUT_TRANSCRIPTION_CONFIG
         }
         
         try:
-            # Live API 연결
-            session = await self.client.aio.live.connect(
-                model=settings.gemini_live_model,
-                config=config
-            )
+            # 미리 열어 둔 연결이 있으면 가져와 이 세션의 맥락을 먼저 알려줌 (없으면 바로 연결)
+            session = await self.pool.acquire()
+            if session is not None:
+                try:
+                    await session.send(text=session_template.live_session_context, end_of_turn=False)
+                except Exception as e:
+                    # 쉬는 동안 끊긴 연결이면 닫고 새로 연결
+                    logger.info(f"Pooled live connection unusable, connecting directly: {e}")
+                    await self.pool.discard(session)
+                    session = None
+            if session is None:
+                session = await self.client.aio.live.connect(
+                    model=settings.gemini_live_model,
+                    config=config
+                )
             
             self.active_sessions[session_key] = {
                 "session": session,
                 "user_id": user_id,
                 "session_id": session_id,
-                "audio_queue": asyncio.Queue(),
-                "transcript_queue": asyncio.Queue(),
+                "session_number": session_number,
+                "started_at": resumed["started_at"] if resumed else time.time(),
+                # Live API 응답(오디오/트랜스크립트)을 WebSocket 송신 루프로 전달
+                "stream": LiveStream(
+                    audio_limit=settings.live_audio_queue_size,
+                    transcript_limit=settings.live_transcript_queue_size,
+                    audio_policy=settings.live_audio_queue_policy,
+                    transcript_policy=settings.live_transcript_queue_policy,
+                    backpressure_timeout=settings.live_backpressure_timeout_seconds
+                ),
+                # 무음 구간을 걸러내는 음성 구간 검출 (마이크 -> Live API)
+                "vad": create_vad(settings.send_sample_rate) if settings.vad_enabled else None,
+                # 작은 마이크 청크를 지연 예산 안에서 묶어서 전송
+                "aggregator": create_aggregator(functools.partial(self._send_pcm, session)) if settings.live_upstream_aggregation_enabled else None,
+                # 응답 오디오를 고른 프레임과 재생 시각으로 내보냄
+                "jitter": create_jitter_buffer() if settings.live_jitter_enabled else None,
+                # 어르신 목소리 녹음 (조각 파일로 바로 기록, 종료 시 재생 파일로 마무리)
+                "recorder": recording_service.create(user_id, session_id, settings.send_sample_rate),
                 "is_active": True
             }
             
+            # 트랜스크립트는 세션 중에 바로 DB에 기록 (재연결이면 이전 순번에 이어서)
+            await transcript_sink.open(session_key, session_id)
+            
             # 백그라운드 태스크 시작
             asyncio.create_task(self._handle_live_session(session_key))
             
-            # 초기 인사 메시지 전송
-            await session.send(
-                text=f"안녕하세요! 오늘은 '{session_template['title']}'에 대해 이야기를 나눠보려고 합니다. 편안하게 이야기해주세요.",
-                end_of_turn=True
-            )
+            # 초기 인사 메시지 전송 (재배포로 끊겼다 다시 연결된 세션은 인사를 반복하지 않음)
+            if resumed is None:
+                await session.send(
+                    text=f"안녕하세요! 오늘은 '{session_template.title}'에 대해 이야기를 나눠보려고 합니다. 편안하게 이야기해주세요.",
+                    end_of_turn=True
+                )
             
             return session_key
             
@@ -93,6 +153,29 @@ class LiveInterviewService:
         session_info = self.active_sessions[session_key]
         session = session_info["session"]
         
+        if session_info["recorder"] is not None:
+            # 무음 구간도 포함한 원래 오디오를 녹음
+            await session_info["recorder"].write(audio_data)
+        
+        end_of_utterance = False
+        if session_info["vad"] is not None:
+            # 말소리 구간만 전송 (어르신이 생각하는 동안의 무음은 보내지 않음)
+            audio_data, end_of_utterance = session_info["vad"].process(audio_data)
+        
+        aggregator = session_info["aggregator"]
+        if audio_data:
+            if aggregator is not None:
+                aggregator.push(audio_data)
+            else:
+                await self._send_pcm(session, audio_data)
+        
+        if end_of_utterance:
+            # 발화 종료를 알려 응답을 바로 시작하게 함 (묶여 있던 오디오를 먼저 보냄)
+            if aggregator is not None:
+                await aggregator.drain()
+            await session.send(end_of_turn=True)
+    
+    async def _send_pcm(self, session, audio_data: bytes):
         # PCM 오디오 데이터를 Live API로 전송
         await session.send(
             audio={
@@ -103,33 +186,15 @@ class LiveInterviewService:
             }
         )
     
-    async def get_audio_response(self, session_key: str) -> Optional[bytes]:
-        """AI 응답 오디오 가져오기"""
-        if session_key not in self.active_sessions:
-            return None
-        
-        session_info = self.active_sessions[session_key]
-        audio_queue = session_info["audio_queue"]
-        
-        try:
-            audio_data = await asyncio.wait_for(audio_queue.get(), timeout=0.1)
-            return audio_data
-        except asyncio.TimeoutError:
-            return None
+    def get_stream(self, session_key: str) -> Optional[LiveStream]:
+        """세션의 응답 이벤트 스트림 (오디오와 트랜스크립트가 들어올 때만 깨어남)"""
+        session_info = self.active_sessions.get(session_key)
+        return session_info["stream"] if session_info else None
     
-    async def get_transcript(self, session_key: str) -> Optional[Dict[str, str]]:
-        """대화 텍스트 가져오기"""
-        if session_key not in self.active_sessions:
-            return None
-        
-        session_info = self.active_sessions[session_key]
-        transcript_queue = session_info["transcript_queue"]
-        
-        try:
-            transcript = await asyncio.wait_for(transcript_queue.get(), timeout=0.1)
-            return transcript
-        except asyncio.TimeoutError:
-            return None
+    def get_jitter_buffer(self, session_key: str) -> Optional[JitterBuffer]:
+        """세션의 응답 지터 버퍼 (꺼져 있으면 None)"""
+        session_info = self.active_sessions.get(session_key)
+        return session_info["jitter"] if session_info else None
     
     async def end_live_interview(self, session_key: str) -> Dict[str, Any]:
         """실시간 인터뷰 종료"""
@@ -140,19 +205,85 @@ class LiveInterviewService:
         session_info["is_active"] = False
         
         # 세션 종료
+        if session_info["aggregator"] is not None:
+            session_info["aggregator"].close()
         session = session_info["session"]
         await session.close()
         
-        # 전체 대화 내용 반환
-        transcripts = []
-        while not session_info["transcript_queue"].empty():
-            transcripts.append(await session_info["transcript_queue"].get())
-        
+        session_info["stream"].close()
         del self.active_sessions[session_key]
         
+        # 남은 트랜스크립트 기록 (대화로 옮기는 건 호출한 쪽에서 transcript_sink.materialize)
+        transcripts_saved = await transcript_sink.finish(session_key)
+        
+        # 녹음 마무리 (조각 파일 -> 재생 파일, 워커 스레드에서)
+        recording = await recording_service.finish(session_info["recorder"])
+        
         return {
             "session_id": session_info["session_id"],
-            "transcripts": transcripts
+            "transcripts_saved": transcripts_saved,
+            "recording": recording
+        }
+    
+    def _prune_resumable(self):
+        """재연결을 기다린 지 snapshot_max_age_seconds가 지난 세션은 버림 (스냅샷마다 계속 넘어가지 않도록)"""
+        cutoff = time.time() - settings.snapshot_max_age_seconds
+        for session_key, info in list(self.resumable_sessions.items()):
+            if info.get("suspended_at", info["started_at"]) < cutoff:
+                del self.resumable_sessions[session_key]
+    
+    def snapshot_sessions(self) -> List[Dict[str, Any]]:
+        """진행 중인 세션 메타데이터 (연결 객체와 큐는 제외, 종료 시 스냅샷용)"""
+        now = time.time()
+        sessions = [
+            {
+                "session_key": session_key,
+                "user_id": info["user_id"],
+                "session_id": info["session_id"],
+                "session_number": info["session_number"],
+                "started_at": info["started_at"],
+                "suspended_at": now
+            }
+            for session_key, info in self.active_sessions.items()
+            if info.get("is_active")
+        ]
+        # 복원됐지만 아직 재연결되지 않은 세션도 다음 인스턴스로 넘김 (오래된 것은 제외)
+        self._prune_resumable()
+        sessions.extend(self.resumable_sessions.values())
+        return sessions
+    
+    def restore_sessions(self, sessions: List[Dict[str, Any]]) -> int:
+        """스냅샷의 세션 메타데이터 복원, 복원한 수 반환"""
+        for info in sessions:
+            self.resumable_sessions[info["session_key"]] = info
+        self._prune_resumable()
+        return len(self.resumable_sessions)
+    
+    def stats(self) -> Dict[str, Any]:
+        """세션별 응답 큐 깊이, 버린 수, 대기 지표"""
+        return {
+            "active_sessions": len(self.active_sessions),
+            "resumable_sessions": len(self.resumable_sessions),
+            "pool": self.pool.stats(),
+            "streams": {
+                session_key: info["stream"].stats()
+                for session_key, info in self.active_sessions.items()
+            },
+            "vad": {
+                session_key: info["vad"].stats()
+                for session_key, info in self.active_sessions.items()
+                if info["vad"] is not None
+            },
+            "aggregators": {
+                session_key: info["aggregator"].stats()
+                for session_key, info in self.active_sessions.items()
+                if info["aggregator"] is not None
+            },
+            "jitter": {
+                session_key: info["jitter"].stats()
+                for session_key, info in self.active_sessions.items()
+                if info["jitter"] is not None
+            }
         }
     
     async def _handle_live_session(self, session_key: str):
@@ -163,14 +294,25 @@ class LiveInterviewService:
         try:
             while session_info["is_active"]:
                 # AI 응답 수신
+                # 클라이언트가 밀려 스트림이 가득 차면 발행에서 대기하므로 Live API 수신도 멈춤
                 async for response in session.receive():
                     if response.audio:
-                        # 오디오 데이터를 큐에 추가
-                        await session_info["audio_queue"].put(response.audio.data)
+                        # 오디오 데이터를 스트림에 발행
+                        await session_info["stream"].publish_audio(response.audio.data)
+                    
+                    # 어르신 말 받아쓰기 (지원하는 SDK/모델에서만 옴)
+                    transcription = getattr(getattr(response, "server_content", None), "input_transcription", None)
+                    if transcription is not None and transcription.text:
+                        await transcript_sink.append(session_key, "user", transcription.text)
+                        await session_info["stream"].publish_transcript({
+                            "role": "user",
+                            "content": transcription.text
+                        })
                     
                     if response.text:
-                        # 텍스트 응답을 트랜스크립트 큐에 추가
-                        await session_info["transcript_queue"].put({
+                        # 텍스트 응답을 DB에 기록하고 트랜스크립트로 발행
+                        await transcript_sink.append(session_key, "assistant", response.text)
+                        await session_info["stream"].publish_transcript({
                             "role": "assistant",
                             "content": response.text
                         })
@@ -183,5 +325,6 @@ class LiveInterviewService:
             logger.error(f"Error in live session handler: {e}")
         finally:
             session_info["is_active"] = False
+            session_info["stream"].close()
 
 live_interview_service = LiveInterviewService()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PooledConnection(NamedTuple):
+    session: Any
+    opened_at: float  # time.monotonic
+
+class LiveConnectionPool:
+    """미리 열어 둔 Live API 연결 풀 (워커 프로세스 하나)
+
+    인터뷰가 시작될 때 연결 핸드셰이크를 기다리지 않도록 공통 설정으로 연 연결을 몇 개 유지한다.
+    유지 태스크가 풀을 size까지 채우고, sweep_interval마다 idle_timeout보다 오래 쉰 연결을 닫고
+    새로 연다 (서버가 쉬는 연결을 끊기 전에 교체). 쉬는 연결의 상태는 따로 확인하지 않으므로
+    그래도 끊긴 연결은 꺼내 쓰는 쪽이 첫 전송 실패로 알아채고 discard한다. 풀이 비어 있으면
+    acquire는 None을 돌려주고 호출한 쪽이 직접 연결한다.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Any]],
+        size: int,
+        idle_timeout: float,
+        sweep_interval: float
+    ):
+        self._connect = connect
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._idle: Deque[PooledConnection] = deque()
+        self._opening = 0
+        self._refill = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.opened = 0
+        self.connect_errors = 0
+        self.expired = 0
+        self.connect_seconds = 0.0
+
+    def start(self):
+        """유지 태스크 시작 (이벤트 루프 안에서 호출)"""
+        if self.size > 0 and self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        """유지 태스크를 멈추고 남은 연결을 모두 닫음 (닫은 뒤 연결이 끝난 것도 닫음)"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._idle:
+            await self._discard(self._idle.popleft())
+
+    async def acquire(self) -> Optional[Any]:
+        """쉬고 있는 연결 하나 꺼내기 (없으면 None)"""
+        if self._closed:
+            return None
+        now = time.monotonic()
+        while self._idle:
+            pooled = self._idle.popleft()
+            if now - pooled.opened_at >= self.idle_timeout:
+                self.expired += 1
+                asyncio.create_task(self._discard(pooled))
+                continue
+            self.hits += 1
+            self._refill.set()
+            return pooled.session
+        self.misses += 1
+        self._refill.set()
+        return None
+
+    async def _discard(self, pooled: PooledConnection):
+        await self.discard(pooled.session)
+
+    async def discard(self, session: Any):
+        """쓸 수 없는 연결 닫기 (꺼내 간 연결이 끊겨 있을 때도 사용)"""
+        try:
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled live connection: {e}")
+
+    async def _open_one(self):
+        started = time.monotonic()
+        try:
+            session = await self._connect()
+        except Exception as e:
+            self.connect_errors += 1
+            logger.warning(f"Failed to open pooled live connection: {e}")
+            return
+        finally:
+            self._opening -= 1
+        self.opened += 1
+        self.connect_seconds += time.monotonic() - started
+        if self._closed:
+            # 연결하는 동안 풀이 닫혔으면 넣지 않고 닫음
+            await self.discard(session)
+            return
+        self._idle.append(PooledConnection(session, time.monotonic()))
+
+    async def _expire_idle(self):
+        # 먼저 연 연결이 앞에 있으므로 오래된 것부터 닫음
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].opened_at >= self.idle_timeout:
+            self.expired += 1
+            await self._discard(self._idle.popleft())
+
+    async def _maintain(self):
+        next_sweep = time.monotonic() + self.sweep_interval
+        while True:
+            missing = self.size - len(self._idle) - self._opening
+            if missing > 0:
+                errors = self.connect_errors
+                self._opening += missing
+                await asyncio.gather(*(self._open_one() for _ in range(missing)))
+                if self.connect_errors > errors:
+                    # 연결에 실패했으면 잠시 뒤 재시도
+                    await asyncio.sleep(min(self.sweep_interval, 5.0))
+                continue
+
+            timeout = next_sweep - time.monotonic()
+            if timeout <= 0:
+                await self._expire_idle()
+                next_sweep = time.monotonic() + self.sweep_interval
+                continue
+            self._refill.clear()
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        acquired = self.hits + self.misses
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "opening": self._opening,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / acquired, 3) if acquired else 0.0,
+            "opened": self.opened,
+            "connect_errors": self.connect_errors,
+            "expired": self.expired,
+            "avg_connect_ms": round(self.connect_seconds / self.opened * 1000, 1) if self.opened else 0.0
+        }
@@ -0,0 +1,105 @@
+import struct
+import time
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+# 1: 기존 형식 (오디오를 JSON 안의 base64 또는 헤더 없는 bytes로 전송)
+# 2: 바이너리 프레임 (헤더 + 원본 PCM), JSON은 제어 메시지에만 사용
+LEGACY_PROTOCOL = 1
+BINARY_PROTOCOL = 2
+SUPPORTED_PROTOCOLS = (LEGACY_PROTOCOL, BINARY_PROTOCOL)
+
+# 프레임 종류
+FRAME_AUDIO_IN = 1  # 클라이언트 -> 서버 마이크 PCM
+FRAME_AUDIO_OUT = 2  # 서버 -> 클라이언트 응답 PCM
+FRAME_OPUS_OUT = 3  # 서버 -> 클라이언트 응답 Opus 패킷들 (패킷마다 u16 길이 + 데이터)
+
+# 버전(u8), 종류(u8), 순번(u32), 타임스탬프 ms(u32, 연결 시작 기준), 네트워크 바이트 순서
+FRAME_HEADER = struct.Struct("!BBII")
+PACKET_LENGTH = struct.Struct("!H")
+
+class LiveFrame(NamedTuple):
+    frame_type: int
+    seq: int
+    timestamp_ms: int
+    payload: memoryview
+
+class FrameError(ValueError):
+    pass
+
+def negotiate_protocol(requested: Union[int, Iterable[int], None]) -> int:
+    """클라이언트가 요청한 버전(하나 또는 목록) 중 지원하는 가장 높은 버전 (없으면 기존 형식)"""
+    if requested is None:
+        return LEGACY_PROTOCOL
+    if isinstance(requested, int):
+        requested = [requested]
+    try:
+        common = [int(version) for version in requested if int(version) in SUPPORTED_PROTOCOLS]
+    except (TypeError, ValueError):
+        return LEGACY_PROTOCOL
+    return max(common, default=LEGACY_PROTOCOL)
+
+def encode_frame(frame_type: int, seq: int, timestamp_ms: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(BINARY_PROTOCOL, frame_type, seq & 0xFFFFFFFF, timestamp_ms & 0xFFFFFFFF) + payload
+
+def pack_packets(packets: Iterable[bytes]) -> bytes:
+    """Opus 패킷 여러 개를 프레임 하나의 본문으로 (길이 접두사)"""
+    return b"".join(PACKET_LENGTH.pack(len(packet)) + packet for packet in packets)
+
+def unpack_packets(payload: bytes) -> List[bytes]:
+    packets = []
+    offset = 0
+    while offset + PACKET_LENGTH.size <= len(payload):
+        (length,) = PACKET_LENGTH.unpack_from(payload, offset)
+        offset += PACKET_LENGTH.size
+        packets.append(bytes(payload[offset:offset + length]))
+        offset += length
+    return packets
+
+def decode_frame(data: bytes) -> LiveFrame:
+    """바이너리 프레임 해석 (PCM은 복사하지 않고 memoryview로 반환)"""
+    if len(data) < FRAME_HEADER.size:
+        raise FrameError(f"Frame too short: {len(data)} bytes")
+    version, frame_type, seq, timestamp_ms = FRAME_HEADER.unpack_from(data)
+    if version != BINARY_PROTOCOL:
+        raise FrameError(f"Unsupported frame version: {version}")
+    return LiveFrame(frame_type, seq, timestamp_ms, memoryview(data)[FRAME_HEADER.size:])
+
+class FrameCodec:
+    """WebSocket 연결 하나의 프레임 순번/타임스탬프 관리
+
+    보내는 프레임에 순번을 붙이고, 받은 프레임의 순번이 건너뛰면 gaps로 센다.
+    """
+
+    def __init__(self, protocol: int = BINARY_PROTOCOL):
+        self.protocol = protocol
+        self._started = time.monotonic()
+        self._out_seq = 0
+        self._in_seq: Optional[int] = None
+        self.frames_in = 0
+        self.frames_out = 0
+        self.gaps = 0
+
+    def now_ms(self, monotonic: Optional[float] = None) -> int:
+        """연결 시작 기준 경과 시간 (ms)"""
+        return int(((monotonic if monotonic is not None else time.monotonic()) - self._started) * 1000)
+
+    def encode_audio(self, payload: bytes, monotonic: Optional[float] = None, frame_type: int = FRAME_AUDIO_OUT) -> bytes:
+        self._out_seq += 1
+        self.frames_out += 1
+        return encode_frame(frame_type, self._out_seq, self.now_ms(monotonic), payload)
+
+    def decode(self, data: bytes) -> LiveFrame:
+        frame = decode_frame(data)
+        if self._in_seq is not None and frame.seq != (self._in_seq + 1) & 0xFFFFFFFF:
+            self.gaps += 1
+        self._in_seq = frame.seq
+        self.frames_in += 1
+        return frame
+
+    def stats(self) -> dict:
+        return {
+            "protocol": self.protocol,
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "gaps": self.gaps
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+AUDIO = "audio"
+TRANSCRIPT = "transcript"
+
+# 큐가 가득 찼을 때의 정책
+DROP_OLDEST = "drop_oldest"  # 잠시 기다렸다가 가장 오래된 항목을 버림
+BLOCK = "block"  # 버리지 않고 자리가 날 때까지 발행 쪽을 멈춤
+QUEUE_POLICIES = (DROP_OLDEST, BLOCK)
+
+class LiveEvent(NamedTuple):
+    kind: str  # AUDIO 또는 TRANSCRIPT
+    seq: int  # 세션 안에서 발행 순서
+    timestamp: float  # 발행 시각 (time.monotonic)
+    data: Any  # 오디오 bytes 또는 트랜스크립트 dict
+
+class LiveStream:
+    """실시간 세션 하나의 오디오/트랜스크립트 이벤트 스트림 (소비자 하나)
+
+    Live API 수신 태스크가 발행하고 WebSocket 송신 루프가 async for로 소비한다.
+    데이터가 들어올 때만 깨어나므로 유휴 연결은 CPU를 쓰지 않는다.
+    오디오와 트랜스크립트는 따로 보관하고 발행 순서(seq)대로 섞어서 내보낸다.
+
+    큐마다 크기 제한과 정책이 있다. 클라이언트가 밀려 큐가 가득 차면 발행(Live API 수신)이 멈추고,
+    drop_oldest 큐는 backpressure_timeout이 지나면 가장 오래된 항목을 버리고 진행한다.
+    크기 0은 제한 없음.
+    """
+
+    def __init__(
+        self,
+        audio_limit: int = 0,
+        transcript_limit: int = 0,
+        audio_policy: str = DROP_OLDEST,
+        transcript_policy: str = BLOCK,
+        backpressure_timeout: float = 0.5
+    ):
+        for policy in (audio_policy, transcript_policy):
+            if policy not in QUEUE_POLICIES:
+                raise ValueError(f"Unknown live queue policy: {policy}")
+        self._queues: Dict[str, Deque[LiveEvent]] = {AUDIO: deque(), TRANSCRIPT: deque()}
+        self.limits = {AUDIO: audio_limit, TRANSCRIPT: transcript_limit}
+        self.policies = {AUDIO: audio_policy, TRANSCRIPT: transcript_policy}
+        self.backpressure_timeout = backpressure_timeout
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._seq = 0
+        self.closed = False
+        self.published = {AUDIO: 0, TRANSCRIPT: 0}
+        self.delivered = {AUDIO: 0, TRANSCRIPT: 0}
+        self.dropped = {AUDIO: 0, TRANSCRIPT: 0}
+        self.peak_depth = {AUDIO: 0, TRANSCRIPT: 0}
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+
+    def _full(self, kind: str) -> bool:
+        limit = self.limits[kind]
+        return limit > 0 and len(self._queues[kind]) >= limit
+
+    async def _wait_for_space(self, kind: str):
+        """클라이언트가 따라잡을 때까지 발행 쪽 대기 (drop_oldest는 제한 시간까지만)"""
+        self.backpressure_waits += 1
+        started = time.monotonic()
+        deadline = started + self.backpressure_timeout if self.policies[kind] == DROP_OLDEST else None
+        try:
+            while self._full(kind) and not self.closed:
+                self._space.clear()
+                if deadline is None:
+                    await self._space.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(self._space.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+        finally:
+            self.backpressure_seconds += time.monotonic() - started
+
+    async def _publish(self, kind: str, data: Any):
+        if self._full(kind):
+            await self._wait_for_space(kind)
+        if self.closed:
+            return
+        queue = self._queues[kind]
+        if self._full(kind):
+            # drop_oldest 큐가 제한 시간 안에 비지 않음
+            queue.popleft()
+            self.dropped[kind] += 1
+        self._seq += 1
+        queue.append(LiveEvent(kind, self._seq, time.monotonic(), data))
+        self.published[kind] += 1
+        if len(queue) > self.peak_depth[kind]:
+            self.peak_depth[kind] = len(queue)
+        self._ready.set()
+
+    async def publish_audio(self, data: bytes):
+        await self._publish(AUDIO, data)
+
+    async def publish_transcript(self, transcript: Dict[str, str]):
+        await self._publish(TRANSCRIPT, transcript)
+
+    def close(self):
+        """더 이상 발행하지 않음 (남은 이벤트를 모두 내보낸 뒤 스트림 종료)"""
+        self.closed = True
+        self._ready.set()
+        self._space.set()
+
+    def next_nowait(self) -> Optional[LiveEvent]:
+        """발행 순서상 다음 이벤트 (없으면 None)"""
+        audio, transcripts = self._queues[AUDIO], self._queues[TRANSCRIPT]
+        if audio and (not transcripts or audio[0].seq < transcripts[0].seq):
+            event = audio.popleft()
+        elif transcripts:
+            event = transcripts.popleft()
+        else:
+            return None
+        self.delivered[event.kind] += 1
+        self._space.set()
+        return event
+
+    def audio_run(self, limit: int = 64) -> List[LiveEvent]:
+        """다음 트랜스크립트 전까지 이미 도착해 있는 오디오 이벤트들 (한 번에 묶어서 인코딩)"""
+        audio, transcripts = self._queues[AUDIO], self._queues[TRANSCRIPT]
+        events = []
+        while audio and len(events) < limit and (not transcripts or audio[0].seq < transcripts[0].seq):
+            events.append(audio.popleft())
+        if events:
+            self.delivered[AUDIO] += len(events)
+            self._space.set()
+        return events
+
+    async def next(self) -> Optional[LiveEvent]:
+        """다음 이벤트가 올 때까지 대기 (닫혔고 남은 이벤트가 없으면 None)"""
+        while True:
+            event = self.next_nowait()
+            if event is not None:
+                return event
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> LiveEvent:
+        event = await self.next()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def drain_transcripts(self) -> List[Dict[str, str]]:
+        """아직 내보내지 않은 트랜스크립트 전부 꺼내기 (세션 종료 시)"""
+        queue = self._queues[TRANSCRIPT]
+        transcripts = [event.data for event in queue]
+        self.delivered[TRANSCRIPT] += len(transcripts)
+        queue.clear()
+        self._space.set()
+        return transcripts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "closed": self.closed,
+            "depth": {kind: len(queue) for kind, queue in self._queues.items()},
+            "peak_depth": dict(self.peak_depth),
+            "limits": dict(self.limits),
+            "policies": dict(self.policies),
+            "published": dict(self.published),
+            "delivered": dict(self.delivered),
+            "dropped": dict(self.dropped),
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_seconds": round(self.backpressure_seconds, 3)
+        }
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from passlib.context import CryptContext
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasherBusy(Exception):
+    """대기 중인 해시 작업이 한도를 넘었을 때"""
+    pass
+
+class PasswordHasher:
+    """bcrypt 해시/검증을 전용 스레드 풀에서 실행해 이벤트 루프를 막지 않도록 하는 클래스"""
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._pending = 0  # 루프에서만 변경
+        self._running = 0  # 워커 스레드에서 변경 (_lock 사용)
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _timed(self, func: Callable, submitted_at: float, *args) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_wait += started_at - submitted_at
+                self._total_run += finished_at - started_at
+
+    async def _submit(self, func: Callable, *args) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._timed, func, time.perf_counter(), *args
+            )
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """비밀번호 해시 생성"""
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """비밀번호 검증"""
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 깊이 및 처리 시간 지표"""
+        with self._lock:
+            running = self._running
+            completed = self._completed
+            total_wait = self._total_wait
+            total_run = self._total_run
+
+        return {
+            "workers": self._workers,
+            "rounds": self.rounds,
+            "pending": self._pending,
+            "running": running,
+            "queue_depth": max(0, self._pending - running),
+            "peak_pending": self._peak_pending,
+            "max_pending": self.max_pending,
+            "completed": completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(total_wait / completed * 1000, 2) if completed else 0.0,
+            "avg_run_ms": round(total_run / completed * 1000, 2) if completed else 0.0
+        }
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    rounds=settings.bcrypt_rounds
+)
@@ -0,0 +1,63 @@
+import sys
+import time
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import event
+from ..config import settings
+from ..models.user import User
+from .cache import LRUTTLCache
+
+def _snapshot(user: User) -> User:
+    """DB 세션에 묶이지 않은 사용자 사본 (요청 간 공유해도 안전)"""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+class PrincipalCache:
+    """토큰 -> 인증된 사용자 캐시 (요청마다 users 테이블 조회를 생략)"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self._cache = LRUTTLCache(max_size, ttl_seconds, on_evict=self._forget)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    def _forget(self, token: str, user: User):
+        tokens = self._tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user.id]
+
+    def get(self, token: str) -> Optional[User]:
+        return self._cache.get(token)
+
+    def set(self, token: str, user: User, expires_at: Optional[float] = None) -> User:
+        """사용자 사본을 캐시 (토큰 만료 시각 이후로는 보관하지 않음)"""
+        ttl = self._cache.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, max(0, expires_at - time.time()))
+
+        principal = _snapshot(user)
+        self._cache.set(token, principal, ttl)
+        self._tokens_by_user.setdefault(principal.id, set()).add(token)
+        return principal
+
+    def invalidate_user(self, user_id: int):
+        """비밀번호/프로필 변경 시 해당 사용자의 모든 토큰 항목 제거"""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._cache.pop(token)
+
+    def stats(self) -> Dict[str, Any]:
+        approx_bytes = 0
+        for token, user in self._cache.items():
+            approx_bytes += sys.getsizeof(token) + sys.getsizeof(user)
+            approx_bytes += sum(
+                sys.getsizeof(getattr(user, column.key)) for column in User.__table__.columns
+            )
+        return {**self._cache.stats(), "users": len(self._tokens_by_user), "approx_bytes": approx_bytes}
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,358 @@
+import asyncio
+import os
+import re
+import shutil
+import struct
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import aiofiles
+from ..config import settings
+from .audio_pipeline import CODEC_OPUS, OPUS_AVAILABLE, OPUS_SAMPLE_RATES
+import logging
+
+logger = logging.getLogger(__name__)
+
+if OPUS_AVAILABLE:
+    import opuslib
+
+# 녹음 ID: {사용자 ID}-{대화 세션 ID}-{시작 시각 ms}
+RECORDING_ID_PATTERN = re.compile(r"^(\d+)-(\d+)-(\d+)$")
+RECORDING_MEDIA_TYPES = {".ogg": "audio/ogg", ".wav": "audio/wav"}
+COPY_CHUNK_BYTES = 64 * 1024
+CLEANUP_INTERVAL_SECONDS = 6 * 3600
+# 이보다 오래된 조각 파일은 마무리되지 못한 녹음 (워커가 녹음 중에 죽음)
+STALE_SEGMENT_SECONDS = 24 * 3600
+
+class RecordingInfo(NamedTuple):
+    recording_id: str
+    path: str
+    media_type: str
+    duration_seconds: int
+    size_bytes: int
+
+def recording_owner(recording_id: str) -> Optional[Tuple[int, int]]:
+    """녹음 ID의 (사용자 ID, 대화 세션 ID), 잘못된 ID면 None"""
+    match = RECORDING_ID_PATTERN.match(recording_id)
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+def recording_url(recording_id: str) -> str:
+    """Conversation.audio_url에 저장하는 재생 경로"""
+    return f"/api/conversations/recordings/{recording_id}"
+
+def _ogg_crc_table() -> List[int]:
+    table = []
+    for index in range(256):
+        crc = index << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+OGG_CRC_TABLE = _ogg_crc_table()
+
+def ogg_crc(data: bytes) -> int:
+    """Ogg 페이지 체크섬 (다항식 0x04C11DB7, 반사 없음 - zlib.crc32와 다름)"""
+    crc = 0
+    table = OGG_CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[((crc >> 24) ^ byte) & 0xFF]
+    return crc
+
+class OggOpusWriter:
+    """Opus 패킷을 Ogg 컨테이너로 기록 (RFC 7845, 모노, 페이지당 패킷 약 1초 분량)"""
+
+    PRE_SKIP = 312  # 디코더가 앞에서 버리는 48kHz 샘플 수 (인코더 지연)
+
+    def __init__(self, f, input_rate: int, serial: int = 1, packets_per_page: int = 50):
+        self._file = f
+        self._serial = serial
+        self._page_seq = 0
+        self._packets: List[bytes] = []
+        self._lacing_values = 0
+        self._packets_per_page = packets_per_page
+        self.granule = self.PRE_SKIP
+        head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, self.PRE_SKIP, input_rate, 0, 0)
+        vendor = b"hestory"
+        tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", 0)
+        self._write_page([head], granule=0, header_type=0x02)
+        self._write_page([tags], granule=0)
+
+    def _write_page(self, packets: List[bytes], granule: int, header_type: int = 0):
+        lacing = bytearray()
+        for packet in packets:
+            lacing += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+        header = struct.pack("<4sBBqIIIB", b"OggS", 0, header_type, granule, self._serial, self._page_seq, 0, len(lacing))
+        page = header + bytes(lacing) + b"".join(packets)
+        crc = ogg_crc(page)
+        self._file.write(page[:22] + struct.pack("<I", crc) + page[26:])
+        self._page_seq += 1
+
+    def _flush_page(self, header_type: int = 0, granule: Optional[int] = None):
+        self._write_page(self._packets, self.granule if granule is None else granule, header_type)
+        self._packets = []
+        self._lacing_values = 0
+
+    def add_packet(self, packet: bytes, samples_48k: int):
+        lacing_values = len(packet) // 255 + 1
+        if self._lacing_values + lacing_values > 255:
+            # 페이지 하나의 길이 표는 최대 255칸
+            self._flush_page()
+        self._packets.append(packet)
+        self._lacing_values += lacing_values
+        self.granule += samples_48k
+        if len(self._packets) >= self._packets_per_page:
+            self._flush_page()
+
+    def close(self, end_granule: Optional[int] = None):
+        """남은 패킷과 스트림 끝 표시 기록 (end_granule로 마지막 프레임의 채운 무음을 재생에서 뺌)"""
+        self._flush_page(header_type=0x04, granule=end_granule)
+
+def _write_wav(segments: List[str], out_path: str, sample_rate: int, total_bytes: int):
+    with open(out_path, "wb") as out:
+        out.write(struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + total_bytes, b"WAVE",
+            b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+            b"data", total_bytes
+        ))
+        for segment in segments:
+            with open(segment, "rb") as f:
+                shutil.copyfileobj(f, out, COPY_CHUNK_BYTES)
+
+def _write_ogg_opus(segments: List[str], out_path: str, sample_rate: int, bitrate: int):
+    encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+    encoder.bitrate = bitrate
+    frame_samples = sample_rate // 50  # 20ms
+    frame_bytes = frame_samples * 2
+    with open(out_path, "wb") as out:
+        writer = OggOpusWriter(out, sample_rate)
+        total_samples = 0
+        pending = b""
+        for segment in segments:
+            with open(segment, "rb") as f:
+                while True:
+                    data = f.read(COPY_CHUNK_BYTES)
+                    if not data:
+                        break
+                    total_samples += len(data) // 2
+                    data = pending + data
+                    usable = len(data) - len(data) % frame_bytes
+                    for offset in range(0, usable, frame_bytes):
+                        writer.add_packet(encoder.encode(data[offset:offset + frame_bytes], frame_samples), 960)
+                    pending = data[usable:]
+        if pending:
+            # 마지막 프레임은 무음으로 채움
+            writer.add_packet(encoder.encode(pending.ljust(frame_bytes, b"\0"), frame_samples), 960)
+        writer.close(end_granule=OggOpusWriter.PRE_SKIP + total_samples * 48000 // sample_rate)
+
+def finalize_recording(segments: List[str], out_base: str, sample_rate: int, codec: str, bitrate: int) -> str:
+    """조각 파일들을 하나의 재생 파일로 (Ogg/Opus, Opus를 쓸 수 없으면 WAV), 조각 단위로 읽어 메모리 일정"""
+    total_bytes = sum(os.path.getsize(segment) for segment in segments)
+    if codec == CODEC_OPUS and OPUS_AVAILABLE and sample_rate in OPUS_SAMPLE_RATES:
+        out_path = f"{out_base}.ogg"
+        _write_ogg_opus(segments, out_path + ".tmp", sample_rate, bitrate)
+    else:
+        out_path = f"{out_base}.wav"
+        _write_wav(segments, out_path + ".tmp", sample_rate, total_bytes)
+    os.replace(out_path + ".tmp", out_path)
+    for segment in segments:
+        os.remove(segment)
+    return out_path
+
+class SessionRecorder:
+    """실시간 세션 하나의 마이크 녹음
+
+    PCM을 buffer_bytes까지만 모았다가 aiofiles로 조각 파일에 바로 쓰므로
+    세션이 길어져도 메모리는 일정하다. 조각은 segment_bytes마다 새 파일로 나누고,
+    세션이 끝나면 워커 스레드에서 하나의 압축 파일로 만든다.
+    """
+
+    def __init__(self, directory: str, recording_id: str, sample_rate: int, buffer_bytes: int, segment_bytes: int):
+        self.directory = directory
+        self.recording_id = recording_id
+        self.sample_rate = sample_rate
+        self.buffer_bytes = buffer_bytes
+        self.segment_bytes = segment_bytes
+        self._buffer = bytearray()
+        self._file = None
+        self._segment_written = 0
+        self.segments: List[str] = []
+        self.bytes_written = 0
+        self.failed = False
+
+    async def write(self, pcm: bytes):
+        if self.failed:
+            return
+        self._buffer += pcm
+        if len(self._buffer) >= self.buffer_bytes:
+            await self._flush()
+
+    async def _flush(self):
+        try:
+            if self._file is None or self._segment_written >= self.segment_bytes:
+                await self._next_segment()
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._file.write(data)
+            self._segment_written += len(data)
+            self.bytes_written += len(data)
+        except Exception as e:
+            # 녹음 실패가 인터뷰를 멈추지 않도록 이후 녹음만 중단
+            self.failed = True
+            self._buffer.clear()
+            logger.error(f"Recording {self.recording_id} failed: {e}")
+
+    async def _next_segment(self):
+        if self._file is not None:
+            await self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.recording_id}.part{len(self.segments):04d}.pcm")
+        self._file = await aiofiles.open(path, "wb")
+        self.segments.append(path)
+        self._segment_written = 0
+
+    async def finish(self) -> Optional[RecordingInfo]:
+        """남은 PCM을 쓰고 재생 파일로 마무리 (녹음된 오디오가 없거나 실패하면 None)"""
+        if self._buffer:
+            await self._flush()
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
+        if self.failed or not self.bytes_written:
+            self.discard()
+            return None
+
+        loop = asyncio.get_running_loop()
+        out_base = os.path.join(self.directory, self.recording_id)
+        try:
+            path = await loop.run_in_executor(
+                None, finalize_recording, list(self.segments), out_base,
+                self.sample_rate, settings.recording_codec, settings.recording_opus_bitrate
+            )
+        except Exception as e:
+            logger.error(f"Failed to finalize recording {self.recording_id}: {e}")
+            return None
+        return RecordingInfo(
+            recording_id=self.recording_id,
+            path=path,
+            media_type=RECORDING_MEDIA_TYPES[os.path.splitext(path)[1]],
+            duration_seconds=int(self.bytes_written / 2 / self.sample_rate),
+            size_bytes=os.path.getsize(path)
+        )
+
+    def discard(self):
+        for segment in self.segments:
+            try:
+                os.remove(segment)
+            except OSError:
+                pass
+        self.segments = []
+
+class RecordingService:
+    """녹음 생성, 재생 파일 조회, 보관 기간이 지난 녹음 삭제"""
+
+    def __init__(self, directory: Optional[str], enabled: bool = True, retention_days: int = 0):
+        self.directory = directory
+        self.enabled = enabled and bool(directory)
+        self.retention_days = retention_days
+        self._task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.finished = 0
+        self.deleted = 0
+
+    def start(self):
+        """보관 기간 정리 태스크 시작 (이벤트 루프 안에서 호출)"""
+        if self.directory and self.retention_days > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_cleanup())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_cleanup(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.cleanup)
+            except Exception as e:
+                logger.error(f"Recording cleanup failed: {e}")
+            await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """보관 기간이 지난 녹음과 마무리되지 못한 조각 파일 삭제, 삭제한 파일 수 반환"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return 0
+        now = now or time.time()
+        deleted = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            name, extension = os.path.splitext(entry.name)
+            if extension in RECORDING_MEDIA_TYPES:
+                max_age = self.retention_days * 86400
+            elif extension == ".pcm":
+                max_age = STALE_SEGMENT_SECONDS
+            else:
+                continue
+            if max_age <= 0 or now - entry.stat().st_mtime < max_age:
+                continue
+            try:
+                os.unlink(entry.path)
+                deleted += 1
+            except OSError as e:
+                logger.warning(f"Failed to delete recording file {entry.name}: {e}")
+        if deleted:
+            self.deleted += deleted
+            logger.info(f"Deleted {deleted} expired recording files")
+        return deleted
+
+    def create(self, user_id: int, session_id: Any, sample_rate: int) -> Optional[SessionRecorder]:
+        if not self.enabled:
+            return None
+        self.started += 1
+        recording_id = f"{user_id}-{session_id}-{int(time.time() * 1000)}"
+        return SessionRecorder(
+            self.directory,
+            recording_id,
+            sample_rate,
+            buffer_bytes=settings.recording_buffer_kb * 1024,
+            segment_bytes=settings.recording_segment_mb * 1024 * 1024
+        )
+
+    async def finish(self, recorder: Optional[SessionRecorder]) -> Optional[RecordingInfo]:
+        if recorder is None:
+            return None
+        info = await recorder.finish()
+        if info is not None:
+            self.finished += 1
+        return info
+
+    def find(self, recording_id: str) -> Optional[RecordingInfo]:
+        """재생할 파일 (없거나 잘못된 ID면 None)"""
+        if not self.directory or recording_owner(recording_id) is None:
+            return None
+        for extension, media_type in RECORDING_MEDIA_TYPES.items():
+            path = os.path.join(self.directory, recording_id + extension)
+            if os.path.isfile(path):
+                return RecordingInfo(recording_id, path, media_type, 0, os.path.getsize(path))
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "codec": settings.recording_codec if OPUS_AVAILABLE else "wav",
+            "started": self.started,
+            "finished": self.finished,
+            "retention_days": self.retention_days,
+            "deleted": self.deleted
+        }
+
+# 글로벌 인스턴스
+recording_service = RecordingService(
+    settings.recording_dir,
+    settings.recording_enabled,
+    retention_days=settings.recording_retention_days
+)
@@ -0,0 +1,204 @@
+import re
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+from ..models.conversation import Conversation
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "conversation_search_v2"
+# 사용자 토큰이 없던 이전 색인 (새 색인을 만들 때 삭제)
+LEGACY_SEARCH_TABLES = ("conversation_search",)
+
+# 한글 음절 묶음과 영문/숫자 단어를 토큰으로 사용
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[0-9A-Za-z]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+def tokenize(content: str, n: int = 2) -> List[str]:
+    """한국어 검색용 토큰화 - 한글은 글자 n-gram, 그 외는 소문자 단어"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(content or ""):
+        word = match.group(0)
+        if _HANGUL_PATTERN.match(word) and len(word) > n:
+            tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+def _owner_prefix(user_id: int) -> str:
+    # 모든 토큰 앞에 붙여 사용자마다 다른 토큰이 되도록 (u<숫자>x 뒤에 오므로 다른 사용자와 겹치지 않음)
+    return f"u{user_id}x"
+
+def _document(user_id: int, user_message: str, ai_response: str) -> str:
+    prefix = _owner_prefix(user_id)
+    return " ".join(prefix + token for token in tokenize(f"{user_message or ''} {ai_response or ''}"))
+
+class SearchService:
+    """대화 기억 전문 검색 (SQLite FTS5 / PostgreSQL tsvector GIN)
+
+    색인 토큰에 사용자 접두어를 붙여 검색어 매칭과 관련도 계산이 그 사용자의 대화에서만 일어난다
+    (전체 대화 수가 아니라 한 사용자의 대화 수만큼 비용이 듦).
+    """
+
+    def create_index(self, engine):
+        """검색 인덱스 생성 및 최초 생성 시 기존 대화 색인"""
+        is_new = not inspect(engine).has_table(SEARCH_TABLE)
+
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                    "conversation_id INTEGER PRIMARY KEY REFERENCES conversations(id) ON DELETE CASCADE, "
+                    "document TSVECTOR NOT NULL)"
+                ))
+                connection.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document "
+                    f"ON {SEARCH_TABLE} USING GIN (document)"
+                ))
+            else:
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                    "USING fts5(document, tokenize='unicode61')"
+                ))
+
+            if is_new:
+                for table in LEGACY_SEARCH_TABLES:
+                    connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+                self._backfill(connection)
+
+    def _backfill(self, connection):
+        from .archive_service import archive_service
+
+        rows = connection.execute(text(
+            "SELECT c.id, c.session_id, c.user_message, c.ai_response, s.user_id "
+            "FROM conversations c JOIN sessions s ON s.id = c.session_id"
+        )).all()
+        # 보관된 대화는 보관소의 본문으로 색인
+        archived = {row.session_id for row in rows if row.user_message is None and row.ai_response is None}
+        texts = {}
+        if archived:
+            with Session(bind=connection) as db:
+                texts = archive_service.get_texts(db, archived)
+        for row in rows:
+            user_message, ai_response = texts.get(row.id, (row.user_message, row.ai_response))
+            self.index_conversation(connection, row.id, row.user_id, user_message, ai_response)
+        logger.info(f"Search index backfilled with {len(rows)} conversations")
+
+    def index_conversation(
+        self,
+        connection,
+        conversation_id: int,
+        user_id: Optional[int],
+        user_message: str,
+        ai_response: str
+    ):
+        """대화 한 건 색인 (user_id가 없으면 세션에서 조회)"""
+        if user_id is None:
+            user_id = connection.execute(text(
+                "SELECT s.user_id FROM conversations c JOIN sessions s ON s.id = c.session_id WHERE c.id = :id"
+            ), {"id": conversation_id}).scalar()
+        document = _document(user_id, user_message, ai_response)
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(
+                f"INSERT INTO {SEARCH_TABLE} (conversation_id, document) "
+                "VALUES (:id, to_tsvector('simple', :document)) ON CONFLICT DO NOTHING"
+            ), {"id": conversation_id, "document": document})
+        else:
+            connection.execute(text(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES (:id, :document)"
+            ), {"id": conversation_id, "document": document})
+
+    def remove_conversations(self, connection, conversation_ids: Iterable[int]):
+        """대화 색인 삭제 (대화를 삭제하는 트랜잭션 안에서 호출)"""
+        conversation_ids = list(conversation_ids)
+        if not conversation_ids:
+            return
+        column = "conversation_id" if connection.dialect.name == "postgresql" else "rowid"
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE {column} IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": conversation_ids}
+        )
+
+    def _build_query(self, query: str, dialect: str, user_id: int) -> str:
+        terms = []
+        prefix = _owner_prefix(user_id)
+        for token in dict.fromkeys(tokenize(query)):
+            # 한 글자 한글은 n-gram 앞부분과 매칭 (예: "집" -> "집에")
+            is_prefix = len(token) == 1 and _HANGUL_PATTERN.match(token)
+            token = prefix + token
+            if dialect == "postgresql":
+                terms.append(f"{token}:*" if is_prefix else token)
+            else:
+                terms.append(f'"{token}"*' if is_prefix else f'"{token}"')
+        return (" & " if dialect == "postgresql" else " ").join(terms)
+
+    def search(
+        self,
+        db: Session,
+        user_id: int,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """사용자의 대화에서 검색어를 찾아 관련도 순으로 반환"""
+        dialect = db.get_bind().dialect.name
+        match = self._build_query(query, dialect, user_id)
+        if not match:
+            return [], 0
+
+        if dialect == "postgresql":
+            source = (
+                f"FROM {SEARCH_TABLE} cs "
+                "JOIN conversations c ON c.id = cs.conversation_id "
+                "JOIN sessions s ON s.id = c.session_id "
+                "WHERE cs.document @@ to_tsquery('simple', :match) AND s.user_id = :user_id"
+            )
+            score = "ts_rank(cs.document, to_tsquery('simple', :match))"
+        else:
+            source = (
+                f"FROM {SEARCH_TABLE} "
+                f"JOIN conversations c ON c.id = {SEARCH_TABLE}.rowid "
+                "JOIN sessions s ON s.id = c.session_id "
+                f"WHERE {SEARCH_TABLE} MATCH :match AND s.user_id = :user_id"
+            )
+            # bm25는 값이 작을수록 관련도가 높음
+            score = f"-bm25({SEARCH_TABLE})"
+
+        params = {"match": match, "user_id": user_id}
+        total = db.execute(text(f"SELECT COUNT(*) {source}"), params).scalar()
+
+        rows = db.execute(text(
+            f"SELECT c.id, c.session_id, s.session_number, s.title, "
+            f"c.user_message, c.ai_response, c.created_at, {score} AS score "
+            f"{source} ORDER BY score DESC LIMIT :limit OFFSET :skip"
+        ), {**params, "limit": limit, "skip": skip}).all()
+
+        results = [
+            {
+                "id": row.id,
+                "session_id": row.session_id,
+                "session_number": row.session_number,
+                "session_title": row.title,
+                "user_message": row.user_message,
+                "ai_response": row.ai_response,
+                "created_at": row.created_at,
+                "score": float(row.score)
+            }
+            for row in rows
+        ]
+        return results, total
+
+search_service = SearchService()
+
+@event.listens_for(Conversation, "after_insert")
+def _index_new_conversation(mapper, connection, target):
+    """새 대화 저장 시 같은 트랜잭션 안에서 검색 인덱스 갱신"""
+    search_service.index_conversation(
+        connection, target.id, None, target.user_message, target.ai_response
+    )
+
+@event.listens_for(Conversation, "after_delete")
+def _unindex_deleted_conversation(mapper, connection, target):
+    """대화 삭제 시 같은 트랜잭션 안에서 색인도 삭제 (SQLite FTS 테이블은 외래 키가 없음)"""
+    search_service.remove_conversations(connection, [target.id])
@@ -0,0 +1,146 @@
+import glob
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+class SnapshotService:
+    """종료 시 인터뷰 흐름 상태와 진행 중인 실시간 세션 메타데이터를 파일로 남기고 시작 시 복원
+
+    재배포 직후에도 진행 중이던 인터뷰가 처음부터 다시 시작되지 않도록 한다.
+    (database 흐름 상태 저장소는 이미 공유/영속이므로 흐름 상태는 비어 있는 채로 기록된다.)
+
+    워커마다 path.<pid> 파일에 따로 쓰고, 시작할 때 각 워커가 남은 파일 하나를 이름 바꾸기로
+    차지해서 복원한다 (같은 파일을 두 워커가 복원하거나 서로 덮어쓰지 않음).
+    max_age_seconds보다 오래된 파일은 복원하지 않고 지운다.
+    """
+
+    def __init__(self, path: Optional[str], max_age_seconds: int):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+
+    def _worker_path(self) -> str:
+        return f"{self.path}.{os.getpid()}"
+
+    def _candidates(self) -> List[str]:
+        """복원할 수 있는 스냅샷 파일 (최근 것부터), 오래된 파일은 삭제"""
+        paths = [self.path] + [
+            path for path in glob.glob(glob.escape(self.path) + ".*")
+            if path[len(self.path) + 1:].isdigit() or ".restoring-" in path
+        ]
+        candidates = []
+        now = time.time()
+        for path in paths:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.max_age_seconds:
+                # 복원되지 않고 남은 파일 (워커 수가 줄었거나 복원 중 중단)
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            elif ".restoring-" not in path:
+                candidates.append((mtime, path))
+        return [path for _, path in sorted(candidates, reverse=True)]
+
+    def save(self, conversation_manager, live_service=None) -> Dict[str, Any]:
+        """이 워커의 스냅샷을 임시 파일에 쓴 뒤 원자적으로 교체"""
+        if not self.path:
+            return {}
+        path = self._worker_path()
+
+        started = time.perf_counter()
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "created_at": time.time(),
+            "flow_states": conversation_manager.snapshot_states(),
+            "live_sessions": live_service.snapshot_sessions() if live_service else []
+        }
+        data = gzip.compress(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            compresslevel=6
+        )
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        result = {
+            "flow_states": len(payload["flow_states"]),
+            "live_sessions": len(payload["live_sessions"]),
+            "bytes": len(data),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info(f"Saved snapshot to {path}: {result}")
+        return result
+
+    def _claim(self) -> Optional[str]:
+        """남은 스냅샷 하나를 이 워커 몫으로 이름 바꾸기 (다른 워커가 먼저 가져가면 다음 파일)"""
+        for path in self._candidates():
+            claimed = f"{path}.restoring-{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            return claimed
+        return None
+
+    def restore(self, conversation_manager, live_service=None) -> Dict[str, Any]:
+        """남은 스냅샷이 있으면 하나를 복원하고 파일 제거 (오래됐거나 형식이 다르면 무시)"""
+        if not self.path:
+            return {}
+        path = self._claim()
+        if path is None:
+            return {}
+
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(gzip.decompress(f.read()))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read snapshot {path}: {e}")
+            return {}
+        finally:
+            # 같은 스냅샷을 두 번 복원하지 않도록 소비
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+        age = time.time() - payload.get("created_at", 0)
+        if payload.get("format") != SNAPSHOT_FORMAT or age > self.max_age_seconds:
+            logger.warning(f"Ignoring snapshot {path} (format {payload.get('format')}, age {age:.0f}s)")
+            return {}
+
+        result = {
+            "flow_states": conversation_manager.restore_states(payload["flow_states"]),
+            "live_sessions": live_service.restore_sessions(payload["live_sessions"]) if live_service else 0,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info(f"Restored snapshot from {path}: {result}")
+        return result
+
+# 글로벌 인스턴스
+snapshot_service = SnapshotService(
+    path=settings.snapshot_path,
+    max_age_seconds=settings.snapshot_max_age_seconds
+)
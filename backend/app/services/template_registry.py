@@ -0,0 +1,239 @@
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..config import settings
+from ..models.session_templates import SESSION_TEMPLATES, MEMORY_GUIDE_SYSTEM_PROMPT
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPENING_PREFIX = "안녕하세요, 어르신의 소중한 인생 이야기를"
+
+BUILTIN_VERSION = "builtin"
+
+LIVE_VOICE_GUIDE = """실시간 음성 대화이므로 다음 사항을 추가로 준수하세요:
+- 음성으로 대화하므로 자연스럽고 말하기 쉬운 표현을 사용하세요
+- 너무 긴 문장보다는 적당한 길이로 나누어 말하세요
+- 상대방의 말이 끝나길 기다리고 적절한 타이밍에 응답하세요
+- 감정을 목소리로 표현할 수 있으므로 따뜻하고 공감적인 톤을 유지하세요"""
+
+def live_opening_message(session_title: Optional[str]) -> str:
+    """실시간 음성 세션 시작 인사"""
+    return f"""안녕하세요! 오늘은 "{session_title}"에 대한 이야기를 들려주세요. 
+편안하게 시작해보겠습니다. 어떤 기억부터 시작하고 싶으신가요?"""
+
+# 미리 열어 두는 Live API 연결의 공통 시스템 프롬프트 (세션 맥락은 연결을 가져간 뒤 보냄)
+LIVE_BASE_SYSTEM_INSTRUCTION = f"""{MEMORY_GUIDE_SYSTEM_PROMPT}
+
+{LIVE_VOICE_GUIDE}"""
+
+class SessionTemplateNotFound(LookupError):
+    """현재 템플릿에 없는 세션 번호 (핫 리로드로 세션이 줄었을 때 등)"""
+    pass
+
+class CompiledSessionTemplate:
+    """세션 템플릿의 불변 사본 (질문은 튜플, 프롬프트와 시작/마무리 멘트는 미리 만들어 둠)
+
+    모든 사용자의 흐름 상태가 같은 인스턴스를 참조하므로 세션마다 질문 목록을 복사하지 않는다.
+    """
+
+    __slots__ = (
+        "session_number",
+        "title",
+        "description",
+        "objective",
+        "questions",
+        "system_instruction",
+        "live_system_instruction",
+        "live_session_context",
+        "opening",
+        "live_opening",
+        "next_title",
+        "closure"
+    )
+
+    def __init__(self, template: Dict[str, Any], next_title: Optional[str] = None, system_prompt: str = MEMORY_GUIDE_SYSTEM_PROMPT):
+        self.session_number: int = template["session_number"]
+        self.title: str = template["title"]
+        self.description: str = template.get("description", "")
+        self.objective: str = template.get("objective", self.description)
+        self.questions: Tuple[str, ...] = tuple(template["questions"])
+        self.next_title = next_title
+
+        # 텍스트 인터뷰 맥락 응답용 시스템 프롬프트
+        self.system_instruction = f"""{system_prompt}
+
+현재 세션: {self.title}
+세션 목표: {self.objective}
+
+현재 사용자가 말씀하신 내용에 대해 '기억의 안내자'로서 적절한 응답을 해주세요."""
+
+        # 실시간 음성 인터뷰용 시스템 프롬프트 (세션별 부분은 미리 연 연결에 첫 메시지로 따로 보냄)
+        self.live_session_context = f"""현재 세션: {self.title}
+세션 목표: {self.objective}
+세션 질문들: {', '.join(self.questions[:3])}..."""
+        self.live_system_instruction = f"""{system_prompt}
+
+{self.live_session_context}
+
+{LIVE_VOICE_GUIDE}"""
+
+        self.opening = f"""{OPENING_PREFIX} 귀담아듣고 아름다운 자서전으로 기록해 드릴 '기억의 안내자'입니다. 제가 곁에서 길잡이가 되어드릴 테니, 그저 오랜 친구에게 이야기하듯 편안한 마음으로 함께해 주시면 됩니다. 
+
+오늘은 '{self.title}'에 대해 이야기를 나눠보고자 합니다. 준비되셨을 때 편하게 말씀해주세요."""
+        self.live_opening = live_opening_message(self.title)
+        self.closure = self.render_closure(next_title)
+
+    def render_closure(self, next_session_title: Optional[str] = None) -> str:
+        """세션 마무리 멘트 (다음 세션 제목이 있으면 예고 포함)"""
+        closure = f"오늘 '{self.title}'에 대한 어르신의 소중한 경험 덕분에 더 깊이 이해하게 되었습니다."
+
+        if next_session_title:
+            closure += f" 다음에는 '{next_session_title}'에 대한 이야기를 나눠보면 좋겠습니다."
+
+        closure += " 오늘도 소중한 이야기 들려주셔서 정말 감사합니다."
+
+        return closure
+
+def compile_templates(
+    templates: List[Dict[str, Any]],
+    system_prompt: str = MEMORY_GUIDE_SYSTEM_PROMPT
+) -> Tuple[CompiledSessionTemplate, ...]:
+    """세션 템플릿 목록을 컴파일 (마무리 멘트에는 다음 세션 제목을 미리 넣어 둠)"""
+    compiled = tuple(
+        CompiledSessionTemplate(
+            template,
+            templates[index + 1]["title"] if index + 1 < len(templates) else None,
+            system_prompt
+        )
+        for index, template in enumerate(templates)
+    )
+    numbers = [template.session_number for template in compiled]
+    if len(set(numbers)) != len(numbers):
+        raise ValueError(f"Duplicate session_number in {numbers}")
+    return compiled
+
+class TemplateRegistry:
+    """컴파일된 세션 템플릿 색인 (턴마다 프롬프트를 만들지 않고 조회만 함)
+
+    settings.session_templates_path가 있으면 버전이 붙은 JSON 파일에서 읽고,
+    파일이 바뀌면 재시작 없이 다시 컴파일한다. 잘못된 파일은 무시하고 기존 템플릿을 유지한다.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.version = BUILTIN_VERSION
+        self.reloads = 0
+        self.reload_errors = 0
+        self._templates = compile_templates(SESSION_TEMPLATES)
+        self._by_number = {template.session_number: template for template in self._templates}
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        if path:
+            self.reload()
+
+    def _load(self, path: str) -> Tuple[str, Tuple[CompiledSessionTemplate, ...]]:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        templates = compile_templates(
+            data["sessions"],
+            data.get("system_prompt", MEMORY_GUIDE_SYSTEM_PROMPT)
+        )
+        return str(data["version"]), templates
+
+    def reload(self) -> bool:
+        """템플릿 파일이 바뀌었으면 다시 읽어서 교체 (교체했으면 True)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.error(f"Session template file unavailable: {e}")
+            return False
+        if mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        try:
+            version, templates = self._load(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.reload_errors += 1
+            logger.error(f"Failed to load session templates from {self.path}: {e}")
+            return False
+
+        # 참조 교체로 반영 (진행 중인 턴은 이전 템플릿을 그대로 사용)
+        self._by_number = {template.session_number: template for template in templates}
+        self._templates = templates
+        self.version = version
+        self.reloads += 1
+        logger.info(f"Loaded session templates version {version} ({len(templates)} sessions)")
+        return True
+
+    def _maybe_reload(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.reload()
+
+    def find(self, session_number: int) -> Optional[CompiledSessionTemplate]:
+        """세션 번호로 템플릿 조회 (없으면 None)"""
+        self._maybe_reload()
+        return self._by_number.get(session_number)
+
+    def get(self, session_number: int) -> CompiledSessionTemplate:
+        """세션 번호로 템플릿 조회 (없으면 SessionTemplateNotFound)"""
+        template = self.find(session_number)
+        if template is None:
+            raise SessionTemplateNotFound(session_number)
+        return template
+
+    def title(self, session_number: int, default: Optional[str] = None) -> Optional[str]:
+        """세션 제목 (없는 번호면 default)"""
+        template = self.find(session_number)
+        return template.title if template else default
+
+    def all(self) -> Tuple[CompiledSessionTemplate, ...]:
+        self._maybe_reload()
+        return self._templates
+
+    def __iter__(self) -> Iterator[CompiledSessionTemplate]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "sessions": len(self._templates),
+            "path": self.path,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+def export_builtin_templates(path: str, version: str = "1"):
+    """내장 템플릿을 편집용 JSON 파일로 내보내기"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": version, "system_prompt": MEMORY_GUIDE_SYSTEM_PROMPT, "sessions": SESSION_TEMPLATES},
+            f,
+            ensure_ascii=False,
+            indent=2
+        )
+
+# 글로벌 인스턴스
+template_registry = TemplateRegistry(
+    path=settings.session_templates_path,
+    check_interval=settings.session_templates_check_seconds
+)
+
+if __name__ == "__main__":
+    # python -m app.services.template_registry export session_templates.json
+    if len(sys.argv) == 3 and sys.argv[1] == "export":
+        export_builtin_templates(sys.argv[2])
+        print(f"Exported {len(SESSION_TEMPLATES)} session templates to {sys.argv[2]}")
+    else:
+        print("사용법: python -m app.services.template_registry export <path>")
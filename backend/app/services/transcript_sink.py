@@ -0,0 +1,335 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..db.database import engine
+from ..models.conversation import Conversation, ConversationType
+from ..models.live_transcript import LiveTranscriptTurn
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TranscriptConflict(Exception):
+    """옮기려던 턴을 다른 워커가 먼저 옮김 (호출한 쪽이 롤백)"""
+
+class PendingTurn(NamedTuple):
+    session_key: str
+    seq: int
+    session_id: int
+    role: str
+    content: str
+    created_at: datetime
+
+def pair_turns(turns: List[Tuple[str, str]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """(역할, 내용) 순서 -> (어르신 말, 이어진 AI 응답) 쌍
+
+    Live API는 응답을 조각으로 보내므로 연달아 나온 같은 역할의 조각은 하나로 합친다.
+    """
+    merged: List[List[str]] = []
+    for role, content in turns:
+        if merged and merged[-1][0] == role:
+            merged[-1][1] += content
+        else:
+            merged.append([role, content])
+
+    pairs = []
+    user_message = None
+    for role, content in merged:
+        if role == "user":
+            if user_message is not None:
+                pairs.append((user_message, None))
+            user_message = content
+        else:
+            pairs.append((user_message, content))
+            user_message = None
+    if user_message is not None:
+        pairs.append((user_message, None))
+    return pairs
+
+class TranscriptSink:
+    """실시간 인터뷰 트랜스크립트의 write-behind 저장
+
+    턴을 메모리에 잠깐 모았다가 flush_seconds마다 또는 batch_size만큼 모이면
+    워커 스레드에서 한 트랜잭션으로 live_transcript_turns에 기록한다. 워커가 죽어도
+    잃는 건 마지막 flush 이후의 턴뿐이고, 기다리는 턴이 max_pending을 넘으면
+    (DB 장애) 트랜스크립트 큐처럼 버리지 않고 발행 쪽을 멈춰 메모리를 제한한다.
+
+    턴마다 세션 안의 순번(seq)을 붙이고 이미 기록된 순번은 건너뛰므로, 커밋 결과를 모른 채
+    재시도해도 같은 턴이 두 번 저장되지 않는다. 세션이 끝나면 기록된 턴을 대화로 옮기고 지운다.
+    워커가 죽었거나 종료 때 기록하지 못해 남은 턴은 시작할 때와 sweep_seconds마다
+    orphan_seconds 동안 새 턴이 없는 세션을 찾아 대화로 옮긴다.
+    """
+
+    def __init__(
+        self,
+        engine,
+        flush_seconds: float,
+        batch_size: int,
+        max_pending: int,
+        orphan_seconds: float = 900.0,
+        sweep_seconds: float = 300.0
+    ):
+        self.engine = engine
+        self.table = LiveTranscriptTurn.__table__
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.orphan_seconds = orphan_seconds
+        self.sweep_seconds = sweep_seconds
+        self._pending: Dict[str, Deque[PendingTurn]] = {}
+        self._pending_count = 0
+        self._sessions: Dict[str, Tuple[int, int]] = {}  # 세션 키 -> (대화 세션 ID, 마지막 순번)
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.appended = 0
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.flush_errors = 0
+        self.flush_seconds_total = 0.0
+        self.peak_pending = 0
+        self.backpressure_waits = 0
+        self.swept_sessions = 0
+        self.swept_conversations = 0
+
+    def start(self):
+        """주기적 flush 태스크와 남은 턴 정리 태스크 시작 (이벤트 루프 안에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self.sweep_seconds > 0 and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._run_sweep())
+
+    async def close(self):
+        """flush 태스크를 멈추고 남은 턴 기록 (종료 시)"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def open(self, session_key: str, session_id: int):
+        """세션의 순번 이어 붙이기 (워커가 죽은 뒤 재연결하면 이미 기록된 마지막 순번부터)"""
+        if session_key in self._sessions:
+            return
+        loop = asyncio.get_running_loop()
+        last_seq = await loop.run_in_executor(None, self._last_seq, session_key)
+        pending = self._pending.get(session_key)
+        if pending:
+            last_seq = max(last_seq, pending[-1].seq)
+        self._sessions[session_key] = (session_id, last_seq)
+
+    def _last_seq(self, session_key: str) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(func.max(self.table.c.seq)).where(self.table.c.session_key == session_key)
+            ).scalar() or 0
+
+    async def append(self, session_key: str, role: str, content: str):
+        """턴 하나 추가 (바로 반환, 기다리는 턴이 max_pending이면 기록될 때까지 대기)"""
+        if session_key not in self._sessions or not content:
+            return
+        while self._pending_count >= self.max_pending:
+            self.backpressure_waits += 1
+            self._space.clear()
+            self._wakeup.set()
+            await self._space.wait()
+
+        session_id, seq = self._sessions[session_key]
+        seq += 1
+        self._sessions[session_key] = (session_id, seq)
+        self._pending.setdefault(session_key, deque()).append(
+            PendingTurn(session_key, seq, session_id, role, content, datetime.now(timezone.utc))
+        )
+        self._pending_count += 1
+        self.appended += 1
+        if self._pending_count > self.peak_pending:
+            self.peak_pending = self._pending_count
+        if self._pending_count >= self.batch_size:
+            self._wakeup.set()
+
+    async def finish(self, session_key: str) -> bool:
+        """세션의 남은 턴 기록 (전부 기록됐으면 True, 실패한 턴은 flush 태스크가 계속 재시도)"""
+        self._sessions.pop(session_key, None)
+        if session_key in self._pending:
+            await self.flush()
+        return session_key not in self._pending
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not await self.flush():
+                # DB 장애 시 재시도 간격
+                await asyncio.sleep(self.flush_seconds)
+
+    async def flush(self) -> bool:
+        """기다리는 턴 전부 기록 (실패하면 메모리에 남겨 두고 False)"""
+        async with self._lock:
+            batch = {key: list(turns) for key, turns in self._pending.items()}
+            if not batch:
+                return True
+            loop = asyncio.get_running_loop()
+            started = time.monotonic()
+            try:
+                written, duplicates = await loop.run_in_executor(None, self._write, batch)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.warning(f"Failed to flush {sum(map(len, batch.values()))} transcript turns: {e}")
+                return False
+            self.flush_seconds_total += time.monotonic() - started
+            self.batches += 1
+            self.written += written
+            self.duplicates += duplicates
+
+            # 기록하는 동안 새로 들어온 턴은 남겨 둠
+            for key, turns in batch.items():
+                pending = self._pending[key]
+                for _ in turns:
+                    pending.popleft()
+                if not pending:
+                    del self._pending[key]
+                self._pending_count -= len(turns)
+            self._space.set()
+            return True
+
+    def _write(self, batch: Dict[str, List[PendingTurn]]) -> Tuple[int, int]:
+        written = duplicates = 0
+        with self.engine.begin() as connection:
+            for session_key, turns in batch.items():
+                # 이전 flush가 커밋된 뒤 실패로 보였으면 이미 있는 순번은 건너뜀
+                existing = set(connection.execute(
+                    select(self.table.c.seq).where(
+                        self.table.c.session_key == session_key,
+                        self.table.c.seq.in_([turn.seq for turn in turns])
+                    )
+                ).scalars())
+                rows = [turn._asdict() for turn in turns if turn.seq not in existing]
+                if rows:
+                    connection.execute(insert(self.table), rows)
+                written += len(rows)
+                duplicates += len(turns) - len(rows)
+        return written, duplicates
+
+    def materialize(
+        self,
+        db: Session,
+        session_key: str,
+        session_id: int,
+        audio_url: Optional[str] = None,
+        duration: Optional[int] = None
+    ) -> int:
+        """기록된 턴을 대화로 옮기고 옮긴 턴만 삭제 (호출한 쪽이 커밋, 같은 트랜잭션이라 한 번만 옮김)
+
+        짝이 없는 턴(받아쓰기가 없는 AI 응답 등)도 한쪽이 빈 대화로 저장해 버리지 않는다.
+        워커가 죽어 옮기지 못한 이전 연결의 턴도 여기서 함께 옮긴다. 다른 워커가 같은 턴을
+        먼저 옮겼으면 TranscriptConflict.
+        """
+        turns = db.query(LiveTranscriptTurn.seq, LiveTranscriptTurn.role, LiveTranscriptTurn.content).filter(
+            LiveTranscriptTurn.session_key == session_key
+        ).order_by(LiveTranscriptTurn.seq).all()
+        if not turns:
+            return 0
+
+        # 읽은 턴을 먼저 지워서 차지 (읽은 뒤에 기록된 턴은 남겨 두고 다음 materialize에서 옮김)
+        deleted = db.execute(delete(LiveTranscriptTurn).where(
+            LiveTranscriptTurn.session_key == session_key,
+            LiveTranscriptTurn.seq <= turns[-1].seq
+        )).rowcount
+        if deleted != len(turns):
+            raise TranscriptConflict(session_key)
+
+        saved = 0
+        for user_message, ai_response in pair_turns([(turn.role, turn.content) for turn in turns]):
+            db.add(Conversation(
+                session_id=session_id,
+                conversation_type=ConversationType.LIVE_AUDIO,
+                user_message=user_message,
+                ai_response=ai_response,
+                audio_url=audio_url,
+                duration=duration
+            ))
+            saved += 1
+        return saved
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """진행 중이 아닌데 남아 있는 세션의 턴을 대화로 옮김, 옮긴 대화 수 반환
+
+        이 워커에서 열려 있거나 기록을 기다리는 세션은 건너뛰고, 다른 워커의 세션은
+        orphan_seconds 동안 새 턴이 없을 때만 끝난 것으로 본다.
+        """
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.orphan_seconds)
+        with Session(bind=self.engine) as db:
+            orphans = db.query(
+                LiveTranscriptTurn.session_key, func.max(LiveTranscriptTurn.session_id)
+            ).group_by(LiveTranscriptTurn.session_key).having(
+                func.max(LiveTranscriptTurn.created_at) < cutoff
+            ).all()
+            saved = 0
+            for session_key, session_id in orphans:
+                if session_key in self._sessions or session_key in self._pending:
+                    continue
+                try:
+                    moved = self.materialize(db, session_key, session_id)
+                    db.commit()
+                except TranscriptConflict:
+                    db.rollback()
+                    continue
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Failed to materialize orphaned transcript {session_key}: {e}")
+                    continue
+                self.swept_sessions += 1
+                saved += moved
+        if saved:
+            self.swept_conversations += saved
+            logger.info(f"Materialized {saved} conversations from orphaned live transcripts")
+        return saved
+
+    async def _run_sweep(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.sweep)
+            except Exception as e:
+                logger.error(f"Transcript sweep failed: {e}")
+            await asyncio.sleep(self.sweep_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "pending": self._pending_count,
+            "peak_pending": self.peak_pending,
+            "max_pending": self.max_pending,
+            "appended": self.appended,
+            "written": self.written,
+            "duplicates_skipped": self.duplicates,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0.0,
+            "avg_flush_ms": round(self.flush_seconds_total / self.batches * 1000, 1) if self.batches else 0.0,
+            "flush_errors": self.flush_errors,
+            "backpressure_waits": self.backpressure_waits,
+            "swept_sessions": self.swept_sessions,
+            "swept_conversations": self.swept_conversations
+        }
+
+# 글로벌 인스턴스
+transcript_sink = TranscriptSink(
+    engine,
+    flush_seconds=settings.transcript_flush_seconds,
+    batch_size=settings.transcript_flush_batch_size,
+    max_pending=settings.transcript_max_pending,
+    orphan_seconds=settings.transcript_orphan_seconds,
+    sweep_seconds=settings.transcript_sweep_seconds
+)
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+import aiofiles
+from ..config import settings
+from .template_registry import template_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+def tts_key(text: str, voice: str, sample_rate: int) -> str:
+    """(문장, 음성, 샘플레이트)의 내용 주소 (sha256)"""
+    return hashlib.sha256(f"{voice}\0{sample_rate}\0{text}".encode("utf-8")).hexdigest()
+
+def played_utterances() -> Iterator[str]:
+    """실제로 음성으로 재생되는 고정 문장 (실시간 인터뷰 회차 인사) - 캐시 미리 채우기용"""
+    for template in template_registry:
+        yield template.live_opening
+
+class TtsCache:
+    """고정 문장 음성(PCM)의 디스크 캐시
+
+    파일 이름이 내용 주소이므로 같은 문장은 워커와 재시작에 관계없이 한 번만 합성한다.
+    크기 제한을 넘으면 가장 오래 안 쓴 파일부터 지우고, 읽기는 mmap으로 해서
+    자주 쓰는 문장은 OS 페이지 캐시에서 복사 없이 나간다 (열어 두는 mmap 수는 max_open_maps까지).
+    같은 문장을 동시에 요청하면 합성은 한 번만 한다.
+    """
+
+    def __init__(self, directory: Optional[str], max_bytes: int, max_open_maps: int = 256):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_open_maps = max_open_maps
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # 키 -> 파일 크기 (LRU 순서)
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.synthesized = 0
+        self.synth_failures = 0
+        self.synth_seconds = 0.0
+        self.evictions = 0
+        self.warmed = 0
+        if directory:
+            self._scan()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pcm")
+
+    def _scan(self):
+        """시작 시 디스크에 있는 항목 색인 (수정 시각 순으로 LRU 복원)"""
+        entries = []
+        try:
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".pcm"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        except FileNotFoundError:
+            return
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _adopt(self, key: str) -> bool:
+        """다른 워커가 만든 파일이면 색인에 추가"""
+        try:
+            size = os.path.getsize(self._path(key))
+        except OSError:
+            return False
+        self._index[key] = size
+        self.total_bytes += size
+        self._evict()
+        return key in self._index
+
+    def _map(self, key: str) -> Optional[mmap.mmap]:
+        mapped = self._maps.get(key)
+        if mapped is not None:
+            self._maps.move_to_end(key)
+            return mapped
+        try:
+            with open(self._path(key), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # 다른 워커가 지웠거나 빈 파일
+            self._forget(key)
+            return None
+        self._maps[key] = mapped
+        while len(self._maps) > self.max_open_maps:
+            # 닫지 않고 참조만 놓음 (전송 중인 곳이 있으면 끝난 뒤 정리됨)
+            self._maps.popitem(last=False)
+        return mapped
+
+    def _forget(self, key: str):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+        self._maps.pop(key, None)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            self._forget(key)
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def contains(self, text: str, voice: str, sample_rate: int) -> bool:
+        if not self.enabled:
+            return False
+        key = tts_key(text, voice, sample_rate)
+        return key in self._index or self._adopt(key)
+
+    def get(self, text: str, voice: str, sample_rate: int) -> Optional[mmap.mmap]:
+        """캐시된 음성 (없으면 None), bytes처럼 쓸 수 있는 읽기 전용 mmap"""
+        if not self.contains(text, voice, sample_rate):
+            return None
+        key = tts_key(text, voice, sample_rate)
+        self._index.move_to_end(key)
+        return self._map(key)
+
+    async def put(self, text: str, voice: str, sample_rate: int, audio: bytes):
+        if not self.enabled or not audio:
+            return
+        key = tts_key(text, voice, sample_rate)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체 (다른 워커가 쓰다 만 파일을 읽지 않도록)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        async with aiofiles.open(temp_path, "wb") as f:
+            await f.write(audio)
+        os.replace(temp_path, path)
+        self._forget(key)
+        self._index[key] = len(audio)
+        self.total_bytes += len(audio)
+        self._evict()
+
+    async def get_or_synthesize(
+        self,
+        text: str,
+        voice: str,
+        sample_rate: int,
+        synthesize: Callable[[str], Awaitable[Optional[bytes]]]
+    ) -> Optional[Any]:
+        """캐시된 음성, 없으면 합성해서 저장 (합성 실패 시 None)"""
+        if not self.enabled:
+            return await synthesize(text)
+
+        cached = self.get(text, voice, sample_rate)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        key = tts_key(text, voice, sample_rate)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            started = time.monotonic()
+            audio = await synthesize(text)
+            if audio:
+                self.synthesized += 1
+                self.synth_seconds += time.monotonic() - started
+                await self.put(text, voice, sample_rate, audio)
+            else:
+                self.synth_failures += 1
+            future.set_result(audio)
+            return audio
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 같이 기다리는 요청이 없으면 예외를 꺼내 경고가 남지 않게 함
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def warm(
+        self,
+        texts: Iterable[str],
+        voice: str,
+        sample_rate: int,
+        synthesize: Callable[[str], Awaitable[Optional[bytes]]],
+        concurrency: int = 2
+    ) -> int:
+        """아직 캐시에 없는 문장을 미리 합성 (합성이 실패하면 TTS를 쓸 수 없다고 보고 중단)"""
+        if not self.enabled:
+            return 0
+        missing = list(dict.fromkeys(text for text in texts if not self.contains(text, voice, sample_rate)))
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        failed = asyncio.Event()
+
+        async def warm_one(text: str):
+            async with semaphore:
+                if failed.is_set():
+                    return
+                if await self.get_or_synthesize(text, voice, sample_rate, synthesize):
+                    self.warmed += 1
+                else:
+                    failed.set()
+
+        await asyncio.gather(*(warm_one(text) for text in missing))
+        if failed.is_set():
+            logger.warning(f"TTS cache warm-up stopped after a synthesis failure ({self.warmed}/{len(missing)} warmed)")
+        return len(missing)
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._index),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "open_maps": len(self._maps),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 3) if requests else 0.0,
+            "synthesized": self.synthesized,
+            "synth_failures": self.synth_failures,
+            "avg_synth_ms": round(self.synth_seconds / self.synthesized * 1000, 1) if self.synthesized else 0.0,
+            "evictions": self.evictions,
+            "warmed": self.warmed
+        }
+
+# 글로벌 인스턴스
+tts_cache = TtsCache(
+    directory=settings.tts_cache_dir,
+    max_bytes=settings.tts_cache_max_mb * 1024 * 1024
+)
@@ -0,0 +1,131 @@
+import math
+import re
+from enum import Enum
+from typing import Any, Dict, NamedTuple
+from ..config import settings
+
+class TurnAction(str, Enum):
+    FOLLOW_UP = "follow_up"
+    NEXT_QUESTION = "next_question"
+    LLM = "llm"
+
+class TurnFeatures(NamedTuple):
+    length: int
+    sentences: int
+    positive_emotions: int
+    negative_emotions: int
+    needs_help: bool
+
+class TurnDecision(NamedTuple):
+    action: TurnAction
+    confidence: float
+    features: TurnFeatures
+
+# 감정 표현 어간 (부분 문자열로 검사)
+POSITIVE_EMOTION_WORDS = (
+    "기쁘", "기뻤", "행복", "즐거", "좋았", "신나", "신났", "뿌듯", "감사", "고마", "설레", "사랑", "자랑"
+)
+NEGATIVE_EMOTION_WORDS = (
+    "슬프", "슬펐", "눈물", "울었", "아프", "아팠", "힘들", "힘든", "외로", "그립", "그리웠", "무서",
+    "두려", "화가", "서러", "후회", "미안", "괴로", "돌아가셨", "고생", "원망"
+)
+# 질문을 이해하지 못했거나 되묻는 표현 (템플릿보다 맥락 응답이 필요)
+HELP_PHRASES = ("잘 모르겠", "무슨 말", "무슨 뜻", "다시 말씀", "다시 한번", "뭘 말해야", "무엇을 말해야")
+
+_SENTENCE_END = re.compile(r"[.!?…。]+|(?:[다요죠])(?=\s|$)")
+
+def extract_features(text: str) -> TurnFeatures:
+    text = text.strip()
+    return TurnFeatures(
+        length=len(text),
+        sentences=max(1, len(_SENTENCE_END.findall(text))) if text else 0,
+        positive_emotions=sum(1 for word in POSITIVE_EMOTION_WORDS if word in text),
+        negative_emotions=sum(1 for word in NEGATIVE_EMOTION_WORDS if word in text),
+        needs_help=text.endswith("?") or any(phrase in text for phrase in HELP_PHRASES)
+    )
+
+def rule_action(features: TurnFeatures, follow_up_count: int) -> TurnAction:
+    """기존 규칙 (짧은 답변이거나 꼬리 질문이 2개 미만이면 꼬리 질문, 아니면 다음 질문)"""
+    if features.length < 50 or follow_up_count < 2:
+        return TurnAction.FOLLOW_UP
+    return TurnAction.NEXT_QUESTION
+
+class TurnClassifier:
+    """답변 특징(길이, 문장 수, 감정 표현)으로 다음 턴을 정하는 로컬 판단 단계
+
+    꼬리 질문 / 다음 질문 / Gemini 맥락 응답 중 하나를 고르고, 확신도가 임계값보다
+    낮으면 기존 규칙을 따른다. Gemini 맥락 응답은 확신도가 llm_confidence_threshold 이상일
+    때만 골라서 기존 규칙보다 Gemini 호출이 늘지 않도록 한다.
+    """
+
+    def __init__(self, confidence_threshold: float, llm_confidence_threshold: float):
+        self.confidence_threshold = confidence_threshold
+        self.llm_confidence_threshold = llm_confidence_threshold
+        self.decisions = {action: 0 for action in TurnAction}
+        self.low_confidence = 0
+
+    def _scores(self, features: TurnFeatures, follow_up_count: int) -> Dict[TurnAction, float]:
+        short = features.length < 50
+        detailed = features.length >= 50 and features.sentences >= 2
+        emotions = min(features.positive_emotions + features.negative_emotions, 2)
+
+        follow_up = (
+            1.2 * short
+            + 0.5 * emotions
+            + 1.0 * (follow_up_count == 0)
+            + 0.3 * (follow_up_count == 1)
+            - 1.5 * (follow_up_count >= 2)
+        )
+        next_question = (
+            1.2 * (follow_up_count >= 1)
+            + 1.0 * (follow_up_count >= 2)
+            + 0.8 * detailed
+            - 0.8 * short
+        )
+        llm = (
+            0.3
+            + 1.5 * (features.length >= 300)
+            + 0.6 * (features.negative_emotions >= 2)
+            + 3.0 * features.needs_help
+        )
+        return {
+            TurnAction.FOLLOW_UP: follow_up,
+            TurnAction.NEXT_QUESTION: next_question,
+            TurnAction.LLM: llm
+        }
+
+    def classify(self, user_response: str, follow_up_count: int) -> TurnDecision:
+        features = extract_features(user_response)
+        scores = self._scores(features, follow_up_count)
+        # 아직 꼬리 질문을 하지 않았으면 다음 질문으로 넘어가지 않음
+        if follow_up_count < 1:
+            del scores[TurnAction.NEXT_QUESTION]
+
+        top = max(scores.values())
+        total = sum(math.exp(score - top) for score in scores.values())
+        action = max(scores, key=scores.get)
+        confidence = 1.0 / total
+
+        threshold = self.llm_confidence_threshold if action == TurnAction.LLM else self.confidence_threshold
+        if confidence < threshold:
+            self.low_confidence += 1
+            action = rule_action(features, follow_up_count)
+
+        self.decisions[action] += 1
+        return TurnDecision(action, round(confidence, 3), features)
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self.decisions.values())
+        return {
+            "decisions": {action.value: count for action, count in self.decisions.items()},
+            "low_confidence": self.low_confidence,
+            "llm_rate": round(self.decisions[TurnAction.LLM] / total, 4) if total else 0.0,
+            "confidence_threshold": self.confidence_threshold,
+            "llm_confidence_threshold": self.llm_confidence_threshold
+        }
+
+# 글로벌 인스턴스
+turn_classifier = TurnClassifier(
+    confidence_threshold=settings.turn_classifier_confidence,
+    llm_confidence_threshold=settings.turn_classifier_llm_confidence
+)
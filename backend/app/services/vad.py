@@ -0,0 +1,159 @@
+from collections import deque
+from typing import Any, Deque, Dict, NamedTuple
+import numpy as np
+from ..config import settings
+
+class VadResult(NamedTuple):
+    audio: bytes  # Live API로 보낼 오디오 (말소리 구간 + 앞뒤 여유 구간)
+    end_of_utterance: bool  # 발화가 끝났음 (말소리 뒤 무음이 충분히 이어짐)
+
+def frame_features(samples: np.ndarray, frame_samples: int):
+    """프레임별 에너지(dBFS)와 영교차율 (프레임 전체를 한 번에 계산)"""
+    frames = samples[:len(samples) - len(samples) % frame_samples].reshape(-1, frame_samples)
+    energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, zcr
+
+class VoiceActivityDetector:
+    """실시간 세션 하나의 음성 구간 검출 (프레임 에너지 + 영교차율 + 행오버)
+
+    어르신이 생각하는 동안의 긴 무음은 Live API로 보내지 않는다.
+    말소리 직전 preroll, 직후 hangover 구간은 함께 보내 말의 처음과 끝이 잘리지 않게 하고,
+    무음이 end_of_utterance 이상 이어지면 발화 종료를 한 번 알린다.
+    배경 소음 수준은 모든 프레임에서 최근 noise_window 동안의 최소 에너지로 추정하고
+    (말하는 중에도 음절 사이의 낮은 에너지로 갱신, 소음이 커져도 윈도만큼 지나면 따라감)
+    임계값을 그보다 margin만큼 높게 유지한다.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int = 20,
+        energy_threshold_db: float = -45.0,
+        zcr_threshold: float = 0.3,
+        noise_margin_db: float = 10.0,
+        hangover_ms: int = 300,
+        preroll_ms: int = 100,
+        end_of_utterance_ms: int = 800,
+        noise_window_ms: int = 10000,
+        noise_block_ms: int = 500
+    ):
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.sample_rate = sample_rate
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.noise_margin_db = noise_margin_db
+        self.hangover_frames = max(hangover_ms // frame_ms, 0)
+        self.end_of_utterance_frames = max(end_of_utterance_ms // frame_ms, 1)
+        self._preroll: Deque[bytes] = deque(maxlen=max(preroll_ms // frame_ms, 0))
+        self._remainder = b""
+        self._noise_db = energy_threshold_db - noise_margin_db
+        # 블록별 최소 에너지 (윈도 최소값을 프레임마다 전체 윈도를 보지 않고 구함)
+        self.noise_block_frames = max(noise_block_ms // frame_ms, 1)
+        blocks = max(noise_window_ms // noise_block_ms, 1)
+        # 처음 윈도 동안은 초기값보다 높아지지 않음 (말소리로 시작해도 말소리를 소음으로 보지 않도록)
+        self._noise_blocks: Deque[float] = deque([self._noise_db] * blocks, maxlen=blocks)
+        self._block_min = float("inf")
+        self._block_count = 0
+        self._hangover = 0
+        self._silence_run = 0
+        self._in_utterance = False
+        self.bytes_in = 0
+        self.bytes_sent = 0
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.utterances = 0
+
+    def _track_noise(self, energy_db: float):
+        """최근 윈도의 최소 프레임 에너지로 배경 소음 수준 갱신"""
+        self._block_min = min(self._block_min, energy_db)
+        self._block_count += 1
+        if self._block_count >= self.noise_block_frames:
+            self._noise_blocks.append(self._block_min)
+            self._block_min = float("inf")
+            self._block_count = 0
+        self._noise_db = min(min(self._noise_blocks, default=float("inf")), self._block_min)
+
+    def _is_speech(self, energy_db: float, zcr: float) -> bool:
+        threshold = max(self.energy_threshold_db, self._noise_db + self.noise_margin_db)
+        if energy_db < threshold:
+            return False
+        # 에너지가 임계값 근처인데 영교차율이 높으면 소음(바람, 마찰음 같은 잡음)으로 봄
+        return zcr < self.zcr_threshold or energy_db >= threshold + self.noise_margin_db
+
+    def process(self, pcm: bytes) -> VadResult:
+        """16비트 PCM 청크 처리 (프레임에 못 미치는 나머지는 다음 청크와 합침)"""
+        self.bytes_in += len(pcm)
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return VadResult(b"", False)
+
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        energy_db, zcr = frame_features(samples, self.frame_samples)
+
+        out = []
+        end_of_utterance = False
+        for index in range(len(energy_db)):
+            frame = data[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            self._track_noise(float(energy_db[index]))
+            if self._is_speech(energy_db[index], zcr[index]):
+                self.speech_frames += 1
+                if not self._in_utterance:
+                    self._in_utterance = True
+                    self.utterances += 1
+                    out.extend(self._preroll)
+                    self._preroll.clear()
+                self._hangover = self.hangover_frames
+                self._silence_run = 0
+                out.append(frame)
+                continue
+
+            self.silence_frames += 1
+            if self._hangover > 0:
+                self._hangover -= 1
+                out.append(frame)
+            else:
+                self._preroll.append(frame)
+            if self._in_utterance:
+                self._silence_run += 1
+                if self._silence_run >= self.end_of_utterance_frames:
+                    self._in_utterance = False
+                    end_of_utterance = True
+
+        audio = b"".join(out)
+        self.bytes_sent += len(audio)
+        return VadResult(audio, end_of_utterance)
+
+    def stats(self) -> Dict[str, Any]:
+        suppressed = self.bytes_in - self.bytes_sent
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_sent": self.bytes_sent,
+            "bytes_suppressed": suppressed,
+            "seconds_suppressed": round(suppressed / 2 / self.sample_rate, 1),
+            "speech_frames": self.speech_frames,
+            "silence_frames": self.silence_frames,
+            "utterances": self.utterances,
+            "noise_floor_db": round(float(self._noise_db), 1)
+        }
+
+def create_vad(sample_rate: int) -> VoiceActivityDetector:
+    """설정값으로 세션용 VAD 생성"""
+    return VoiceActivityDetector(
+        sample_rate=sample_rate,
+        energy_threshold_db=settings.vad_energy_threshold_db,
+        zcr_threshold=settings.vad_zcr_threshold,
+        hangover_ms=settings.vad_hangover_ms,
+        preroll_ms=settings.vad_preroll_ms,
+        end_of_utterance_ms=settings.vad_end_of_utterance_ms,
+        noise_window_ms=settings.vad_noise_window_ms
+    )
+
+def estimate_audio_cost(audio_bytes: int, sample_rate: int) -> float:
+    """Live API 오디오 입력 비용 추정 (USD, 설정의 초당 토큰 수와 토큰 단가 기준)"""
+    seconds = audio_bytes / 2 / sample_rate
+    return seconds * settings.live_audio_tokens_per_second * settings.live_audio_usd_per_million_tokens / 1_000_000
@@ -0,0 +1,1075 @@
+#!/usr/bin/env python3
+"""
+He'story 성능 벤치마크 스크립트
+"""
+
+import asyncio
+import inspect
+import sys
+import os
+import time
+import statistics
+
+# 프로젝트 루트를 파이썬 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# 벤치마크는 실제 API 키 없이 실행
+os.environ.setdefault("GOOGLE_API_KEY", "AIzaSyDummy-benchmark")
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+def _print_latency(label, samples):
+    print(f"{label}: p50 {_percentile(samples, 50):.1f}ms, "
+          f"p99 {_percentile(samples, 99):.1f}ms, max {max(samples or [0]):.1f}ms "
+          f"({len(samples)} samples)")
+
+async def _interview_probe(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """인터뷰 턴을 흉내 내는 프로브 - 이벤트 루프가 얼마나 늦게 깨어나는지 측정"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+async def bench_login_storm(logins: int = 100):
+    """100건의 로그인이 동시에 몰릴 때 인터뷰 트래픽 지연 비교"""
+    from app.services.password_hasher import password_hasher
+
+    print(f"=== 로그인 폭주 벤치마크 ({logins}건, bcrypt rounds {password_hasher.stats()['rounds']}) ===\n")
+    hashed = password_hasher.context.hash("test123")
+
+    async def inline_login():
+        # 기존 방식: 이벤트 루프 스레드에서 직접 검증
+        password_hasher.context.verify("test123", hashed)
+
+    async def offloaded_login():
+        await password_hasher.verify("test123", hashed)
+
+    for label, login in [("이벤트 루프에서 검증", inline_login), ("스레드 풀로 오프로드", offloaded_login)]:
+        samples = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_interview_probe(stop, samples))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await probe
+        print(f"[{label}] 로그인 {logins}건 처리: {elapsed:.2f}s")
+        _print_latency("  인터뷰 턴 지연", samples)
+        print()
+
+    print(f"해시 풀 지표: {password_hasher.stats()}")
+
+async def bench_flow_memory(sessions: int = 100_000):
+    """활성 세션 10만 개의 흐름 상태가 차지하는 메모리 (세션당 바이트)"""
+    import gc
+    import tracemalloc
+    from app.models.session_templates import SESSION_TEMPLATES
+    from app.services.conversation_manager import flow_state_key
+    from app.services.flow_state import FlowState
+    from app.services.flow_state_store import InMemoryFlowStateStore
+
+    print(f"=== 흐름 상태 메모리 벤치마크 ({sessions:,}개 세션) ===\n")
+
+    def legacy_state(session_number):
+        # 기존 방식: 키 8개짜리 dict + 질문 목록 복사
+        template = SESSION_TEMPLATES[session_number]
+        return {
+            "session_number": session_number,
+            "session_title": template["title"],
+            "questions": template["questions"].copy(),
+            "current_question_index": 0,
+            "conversation_count": 0,
+            "is_session_started": False,
+            "last_user_response": None,
+            "follow_up_count": 0
+        }
+
+    for label, new_state in [("dict + 질문 목록 복사", legacy_state), ("__slots__ + 공유 템플릿", FlowState.new)]:
+        gc.collect()
+        tracemalloc.start()
+        store = InMemoryFlowStateStore(max_size=sessions, ttl_seconds=3600)
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        for user_id in range(sessions):
+            session_number = user_id % len(SESSION_TEMPLATES)
+            store.put(flow_state_key(user_id, session_number), new_state(session_number), None)
+        elapsed = time.perf_counter() - started
+
+        used = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        print(f"[{label}] 총 {used / 1024 / 1024:.1f}MB, 세션당 {used / sessions:.0f} bytes, "
+              f"생성 {elapsed * 1e6 / sessions:.2f}us/세션")
+        del store
+
+async def bench_snapshot_restore(sessions: int = 50_000):
+    """활성 세션 5만 개의 흐름 상태 스냅샷 저장/복원 시간"""
+    import random
+    import tempfile
+    from app.services.conversation_manager import ConversationManager, flow_state_key
+    from app.services.flow_state_store import InMemoryFlowStateStore
+    from app.services.snapshot_service import SnapshotService
+
+    print(f"=== 스냅샷 저장/복원 벤치마크 ({sessions:,}개 세션) ===\n")
+
+    def new_manager():
+        return ConversationManager(store=InMemoryFlowStateStore(max_size=sessions, ttl_seconds=3600))
+
+    source = new_manager()
+    for user_id in range(sessions):
+        session_number = user_id % 12
+        state = source.initialize_session(user_id, session_number)
+        state.current_question_index = random.randint(0, 4)
+        state.follow_up_count = random.randint(0, 2)
+        state.conversation_count = random.randint(1, 30)
+        state.last_user_response = "어릴 적 고향 마을 앞 개울에서 동생들과 물고기를 잡던 기억이 납니다."
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = SnapshotService(os.path.join(directory, "snapshot.json.gz"), max_age_seconds=3600)
+        saved = snapshot.save(source)
+        print(f"저장: {saved['seconds'] * 1000:.0f}ms, 파일 {saved['bytes'] / 1024:.0f}KB "
+              f"(세션당 {saved['bytes'] / sessions:.1f} bytes)")
+
+        target = new_manager()
+        restored = snapshot.restore(target)
+        print(f"복원: {restored['seconds'] * 1000:.0f}ms ({restored['flow_states']:,}개 세션)")
+
+    sample = flow_state_key(sessions - 1, (sessions - 1) % 12)
+    assert target.store.get(sample)[0] == source.store.get(sample)[0]
+    print("복원된 상태 일치 확인")
+
+# DB에 저장된 대화가 없을 때 재생할 예시 답변 (회차별)
+SAMPLE_TRANSCRIPTS = [
+    (0, [
+        "네, 시작하겠습니다.",
+        "경상남도 진주에서 태어났습니다. 할아버지 때부터 그곳에서 살았어요.",
+        "할아버지는 농사를 지으셨고, 할머니는 집안일을 하셨어요. 아주 엄격하신 분들이셨죠.",
+        "글쎄요, 그때는 다들 그렇게 살았으니까 특별한 감정은 없었던 것 같아요.",
+        "제가 태어날 무렵은 전쟁이 막 끝난 때라 다들 먹고살기 힘들었습니다. 아버지는 장터에서 일을 하셨고 어머니는 삯바느질을 하셨어요.",
+        "형제는 3남 2녀였습니다.",
+        "제가 둘째였어요. 형님이 일찍 돈을 벌러 나가셔서 동생들은 제가 돌봤습니다.",
+        "이름은 할아버지가 지어주셨는데 무슨 뜻인지는 잘 모르겠어요.",
+        "그게 무슨 뜻이에요?"
+    ]),
+    (1, [
+        "어릴 적 기억이요? 개울에서 물고기 잡던 게 제일 먼저 생각나네요.",
+        "동네 형들이랑 같이 갔는데 정말 즐거웠어요. 해가 질 때까지 놀다가 어머니께 혼나기도 했죠.",
+        "초가집이었어요.",
+        "마당에 감나무가 있었는데 가을이면 감을 따서 곶감을 만들었습니다. 지금도 그 냄새가 그립네요.",
+        "네",
+        "저는 수줍음이 많은 아이였어요. 사람들 앞에 나서는 걸 무서워했습니다.",
+        "아버지께 크게 혼난 적이 있는데, 동생을 울려서였어요. 그날 밤 많이 울었습니다. 지금 생각하면 미안하고 후회가 됩니다.",
+        "동네 서당 훈장님이 큰 영향을 주셨어요. 글을 가르쳐 주시면서 사람은 정직해야 한다고 늘 말씀하셨습니다. 그 말씀이 평생 제 신념이 되었어요."
+    ]),
+    (5, [
+        "첫째가 태어났을 때 정말 행복했습니다. 병원 복도에서 울음소리를 듣고 눈물이 났어요.",
+        "기뻤죠.",
+        "아이들 키우면서 힘든 일도 많았어요. 월급이 적어서 아내가 고생을 많이 했습니다. 그래도 아이들이 웃는 걸 보면 힘이 났어요.",
+        "둘째가 많이 아팠던 때가 있었어요. 밤새 업고 병원을 찾아 헤맸는데 그때 생각하면 지금도 가슴이 아픕니다. 다행히 나았지만 그 뒤로 건강을 늘 걱정했어요. 아내와 저 둘 다 몇 달을 제대로 못 잤습니다. 그때 처음으로 부모가 된다는 게 얼마나 무거운 일인지 알았어요. 제 아버지도 저를 그렇게 키우셨겠구나 싶어서 죄송한 마음이 들었고, 돌아가신 아버지가 많이 그리웠습니다.",
+        "다시 한번 말씀해 주시겠어요?",
+        "아이들에게 바라는 건 건강하게 서로 아끼며 사는 것뿐입니다."
+    ])
+]
+
+def _load_transcripts(limit: int = 2000):
+    """저장된 대화를 세션별 (회차, [사용자 답변]) 목록으로 (없으면 예시 답변)"""
+    try:
+        from app.db.database import SessionLocal
+        from app.models.conversation import Conversation
+        from app.models.session import Session as UserSession
+        from app.services.archive_service import archive_service
+
+        db = SessionLocal()
+        try:
+            conversations = db.query(Conversation).order_by(
+                Conversation.session_id, Conversation.created_at, Conversation.id
+            ).limit(limit).all()
+            archive_service.hydrate(db, conversations)
+            session_numbers = dict(db.query(UserSession.id, UserSession.session_number))
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"DB 대화를 읽지 못해 예시 답변을 사용합니다: {type(e).__name__}")
+        return SAMPLE_TRANSCRIPTS, "예시 답변"
+
+    transcripts = {}
+    for conv in conversations:
+        if conv.user_message and conv.user_message.strip():
+            transcripts.setdefault(conv.session_id, []).append(conv.user_message)
+    if not transcripts:
+        return SAMPLE_TRANSCRIPTS, "예시 답변"
+    return [(session_numbers[session_id], answers) for session_id, answers in transcripts.items()], "DB 대화"
+
+def _replay_turns(transcripts, decide):
+    """답변을 실제 턴 순서대로 재생하며 decide(manager, user_id, 회차, 답변) -> TurnAction 집계"""
+    from app.services.conversation_manager import ConversationManager
+    from app.services.flow_state_store import InMemoryFlowStateStore
+    from app.services.turn_classifier import TurnAction
+
+    manager = ConversationManager(store=InMemoryFlowStateStore(max_size=100_000, ttl_seconds=3600))
+    actions = []
+    elapsed = 0.0
+    for user_id, (session_number, answers) in enumerate(transcripts):
+        manager.initialize_session(user_id, session_number)
+        for answer in answers:
+            started = time.perf_counter()
+            action = decide(manager, user_id, session_number, answer)
+            elapsed += time.perf_counter() - started
+            # 실제 턴과 같은 순서로 상태 반영
+            if action == TurnAction.FOLLOW_UP:
+                manager.generate_follow_up_question(user_id, session_number, answer)
+            elif action == TurnAction.NEXT_QUESTION:
+                manager.get_next_question(user_id, session_number)
+            actions.append(action)
+    return actions, elapsed
+
+async def bench_classifier_replay():
+    """저장된 인터뷰 답변을 기존 규칙과 로컬 판단 단계로 각각 재생해 Gemini 호출 비율 비교"""
+    from app.services.turn_classifier import TurnAction, TurnClassifier, extract_features, rule_action
+    from app.config import settings
+
+    transcripts, source = _load_transcripts()
+    print(f"=== 로컬 턴 판단 재생 벤치마크 ({source}, {len(transcripts)}개 세션) ===\n")
+
+    def legacy(manager, user_id, session_number, answer):
+        state = manager.current_state(user_id, session_number)
+        return rule_action(extract_features(answer), state.follow_up_count)
+
+    classifier = TurnClassifier(settings.turn_classifier_confidence, settings.turn_classifier_llm_confidence)
+
+    def classified(manager, user_id, session_number, answer):
+        state = manager.current_state(user_id, session_number)
+        return classifier.classify(answer, state.follow_up_count).action
+
+    baseline, _ = _replay_turns(transcripts, legacy)
+    actions, elapsed = _replay_turns(transcripts, classified)
+    turns = len(actions)
+
+    for label, replayed in (("기존 규칙", baseline), ("로컬 판단", actions)):
+        counts = {action.value: replayed.count(action) for action in TurnAction}
+        print(f"{label}: {counts}, Gemini 호출률 {counts[TurnAction.LLM.value] / turns:.1%}")
+    changed = sum(1 for old, new in zip(baseline, actions) if old != new)
+    print(f"\n기존 규칙과 다르게 판단한 턴: {changed}/{turns} ({changed / turns:.1%})")
+    print(f"확신도 부족으로 기존 규칙을 따른 턴: {classifier.low_confidence}")
+    print(f"로컬 판단 시간: 평균 {elapsed * 1e6 / turns:.1f}us/턴")
+
+async def _polling_consumer(audio_queue, transcript_queue, latencies, stop):
+    """기존 send_audio 루프 (큐마다 0.1초 타임아웃으로 확인 후 10ms 대기)"""
+    while not stop.is_set():
+        for queue in (audio_queue, transcript_queue):
+            try:
+                published_at, _ = await asyncio.wait_for(queue.get(), timeout=0.1)
+                latencies.append((time.monotonic() - published_at) * 1000)
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.sleep(0.01)
+
+async def _stream_consumer(stream, latencies):
+    async for event in stream:
+        latencies.append((time.monotonic() - event.timestamp) * 1000)
+
+async def bench_live_fanout(sessions: int = 500, idle_seconds: float = 3.0, active_seconds: float = 3.0):
+    """동시 실시간 세션의 유휴 CPU 사용량과 응답 오디오 전달 지연 (폴링 vs 이벤트 스트림)"""
+    import random
+    from app.services.live_stream import LiveStream
+
+    print(f"=== 실시간 응답 전달 벤치마크 ({sessions}개 세션) ===\n")
+    chunk = bytes(960)
+
+    for mode in ("polling", "stream"):
+        stop = asyncio.Event()
+        latencies = []
+        if mode == "polling":
+            queues = [(asyncio.Queue(), asyncio.Queue()) for _ in range(sessions)]
+            consumers = [asyncio.create_task(_polling_consumer(a, t, latencies, stop)) for a, t in queues]
+            async def publish(index):
+                queues[index][0].put_nowait((time.monotonic(), chunk))
+        else:
+            streams = [LiveStream() for _ in range(sessions)]
+            consumers = [asyncio.create_task(_stream_consumer(stream, latencies)) for stream in streams]
+            async def publish(index):
+                await streams[index].publish_audio(chunk)
+        await asyncio.sleep(0.2)
+
+        # 유휴 구간: 응답이 없을 때 연결당 CPU 사용량
+        cpu_started = time.process_time()
+        await asyncio.sleep(idle_seconds)
+        idle_cpu = time.process_time() - cpu_started
+
+        # 응답 구간: 세션마다 약 40ms 간격으로 오디오 청크 발행
+        async def producer(index):
+            await asyncio.sleep(random.random() * 0.04)
+            deadline = time.monotonic() + active_seconds
+            while time.monotonic() < deadline:
+                await publish(index)
+                await asyncio.sleep(0.04)
+        await asyncio.gather(*(producer(index) for index in range(sessions)))
+        await asyncio.sleep(0.3)
+
+        stop.set()
+        if mode == "stream":
+            for stream in streams:
+                stream.close()
+        await asyncio.gather(*consumers)
+
+        print(f"[{mode}] 유휴 CPU: 연결당 {idle_cpu / idle_seconds / sessions * 1e6:.1f}us/초 "
+              f"(전체 {idle_cpu / idle_seconds:.1%} 코어)")
+        _print_latency(f"[{mode}] 오디오 전달 지연", latencies)
+
+async def bench_frame_codec(frames: int = 20_000):
+    """오디오 프레임 하나의 인코딩/디코딩 CPU 시간과 전송 크기 (base64 JSON vs 바이너리 프레임)"""
+    import base64
+    import json
+    from app.services.live_protocol import FrameCodec
+    from app.config import settings
+
+    print(f"=== 실시간 오디오 프레임 코덱 벤치마크 ({frames}프레임) ===\n")
+    for label, sample_rate, chunk_ms in (("응답 24kHz 40ms", settings.receive_sample_rate, 40), ("마이크 16kHz 100ms", settings.send_sample_rate, 100)):
+        pcm = os.urandom(sample_rate * chunk_ms // 1000 * 2)
+
+        started = time.perf_counter()
+        for _ in range(frames):
+            message = json.dumps({"type": "audio_chunk", "audio_data": base64.b64encode(pcm).decode()})
+            base64.b64decode(json.loads(message)["audio_data"])
+        legacy = (time.perf_counter() - started) / frames
+
+        sender, receiver = FrameCodec(), FrameCodec()
+        started = time.perf_counter()
+        for _ in range(frames):
+            frame = sender.encode_audio(pcm)
+            receiver.decode(frame).payload.tobytes()
+        binary = (time.perf_counter() - started) / frames
+
+        print(f"{label} (PCM {len(pcm)}B)")
+        print(f"  base64 JSON: {legacy * 1e6:.2f}us/프레임, {len(message)}B 전송")
+        print(f"  바이너리 프레임: {binary * 1e6:.2f}us/프레임, {len(frame)}B 전송 "
+              f"({legacy / binary:.1f}배 빠름, {1 - len(frame) / len(message):.0%} 작음)")
+
+async def bench_audio_pipeline(seconds: int = 30, chunk_ms: int = 40):
+    """응답 오디오 다운스트림 대역폭과 인코딩 CPU (원본 PCM vs 리샘플링 PCM vs Opus)"""
+    import numpy as np
+    from app.services.audio_pipeline import (
+        AudioPipeline, DownstreamEncoder, CODEC_PCM, CODEC_OPUS, OPUS_AVAILABLE, encode_pcm16
+    )
+    from app.config import settings
+
+    input_rate = settings.receive_sample_rate
+    print(f"=== 응답 오디오 파이프라인 벤치마크 ({seconds}초 음성, {chunk_ms}ms 청크) ===\n")
+
+    # 음성 대역 합성 신호 (기본 주파수가 흔들리는 배음 + 약한 잡음)
+    t = np.arange(seconds * input_rate) / input_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / input_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 12)) * 0.2 + np.random.randn(len(t)) * 0.01
+    pcm = encode_pcm16(signal.astype(np.float32))
+    chunk_bytes = input_rate * chunk_ms // 1000 * 2
+    chunks = [pcm[offset:offset + chunk_bytes] for offset in range(0, len(pcm), chunk_bytes)]
+
+    print(f"원본 PCM {input_rate}Hz: {len(pcm) * 8 / seconds / 1000:.0f}kbps")
+    configs = [(CODEC_PCM, settings.live_output_sample_rate)]
+    if OPUS_AVAILABLE:
+        configs.append((CODEC_OPUS, settings.live_output_sample_rate))
+    else:
+        print("Opus: opuslib/libopus가 없어 측정하지 않음")
+
+    for codec, output_rate in configs:
+        pipeline = AudioPipeline(workers=1)
+        encoder = DownstreamEncoder(pipeline, codec, input_rate, output_rate, settings.live_opus_bitrate)
+        sent = 0
+        # 송신 루프처럼 도착한 청크를 4개씩 묶어서 인코딩
+        for index in range(0, len(chunks), 4):
+            sent += sum(len(packet) for packet in await encoder.encode(chunks[index:index + 4]))
+        stats = pipeline.stats()
+        print(f"{codec} {encoder.output_rate}Hz: {sent * 8 / seconds / 1000:.0f}kbps "
+              f"({len(pcm) / sent:.1f}배 감소), 인코딩 CPU {stats['cpu_seconds'] / seconds * 1000:.2f}ms/음성 1초")
+
+def _interp_resample(samples, source_rate: int, target_rate: int):
+    """이전 리샘플러 (청크마다 따로 선형 보간, 비교용)"""
+    import numpy as np
+
+    length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+async def bench_resampler(chunk_samples: int = 128, seconds: int = 60):
+    """청크 단위 리샘플링의 길이 어긋남과 에일리어싱 (청크별 선형 보간 vs 스트림 polyphase FIR)"""
+    import numpy as np
+    from app.services.audio_pipeline import Resampler
+
+    # 기본 128샘플은 브라우저 AudioWorklet이 한 번에 넘기는 크기
+    print(f"=== 리샘플러 벤치마크 ({chunk_samples}샘플 청크, {seconds}초) ===\n")
+    # 브라우저 마이크 44.1/48kHz -> Live API 16kHz, Live API 24kHz -> 클라이언트 16kHz
+    for source_rate, target_rate in ((44100, 16000), (48000, 16000), (24000, 16000)):
+        t = np.arange(seconds * source_rate) / source_rate
+        # 새 나이퀴스트보다 높은 톤 (다운샘플링 후 남으면 에일리어싱)
+        tone = (np.sin(2 * np.pi * (target_rate * 0.6) * t) * 0.5).astype(np.float32)
+        chunks = [tone[offset:offset + chunk_samples] for offset in range(0, len(tone), chunk_samples)]
+        expected = len(tone) * target_rate // source_rate
+
+        interp = np.concatenate([_interp_resample(part, source_rate, target_rate) for part in chunks])
+        resampler = Resampler(source_rate, target_rate)
+        started = time.perf_counter()
+        poly = np.concatenate([resampler.process(part) for part in chunks] + [resampler.flush()])
+        elapsed = time.perf_counter() - started
+
+        def level(samples):
+            return 20 * np.log10(np.sqrt(np.mean(samples[1000:-1000] ** 2)) / np.sqrt(0.125) + 1e-12)
+
+        print(f"{source_rate}Hz -> {target_rate}Hz")
+        print(f"  청크별 선형 보간: 길이 어긋남 {(len(interp) - expected) / expected:+.2%}, "
+              f"에일리어싱 {level(interp):.1f}dB")
+        print(f"  polyphase FIR: 길이 어긋남 {(len(poly) - expected) / expected:+.2%}, "
+              f"에일리어싱 {level(poly):.1f}dB, CPU {elapsed / seconds * 1000:.2f}ms/음성 1초")
+
+def _synthetic_interview_audio(sample_rate: int, minutes: int = 10):
+    """말소리(2~8초)와 생각하는 무음(1~10초)이 번갈아 나오는 합성 음성 + 배경 소음, (PCM, 말소리 샘플 수)"""
+    import numpy as np
+    from app.services.audio_pipeline import encode_pcm16
+
+    rng = np.random.default_rng(7)
+    parts = []
+    speech_samples = 0
+    total = 0
+    while total < minutes * 60 * sample_rate:
+        length = int(rng.uniform(2, 8) * sample_rate)
+        t = np.arange(length) / sample_rate
+        phase = 2 * np.pi * np.cumsum(120 + 40 * np.sin(2 * np.pi * 0.7 * t)) / sample_rate
+        envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 3 * t))  # 음절 단위 강약
+        parts.append(sum(np.sin(k * phase) / k for k in range(1, 10)) * 0.15 * envelope)
+        pause = int(rng.uniform(1, 10) * sample_rate)
+        parts.append(np.zeros(pause))
+        speech_samples += length
+        total += length + pause
+    signal = np.concatenate(parts) + rng.normal(0, 0.001, total)  # 약 -60dB 배경 소음
+    return encode_pcm16(signal.astype(np.float32)), speech_samples
+
+def _load_recordings(directory: str, sample_rate: int):
+    """녹음된 세션 WAV 파일들을 Live API 입력 형식(16비트 모노, sample_rate)으로"""
+    import wave
+    from app.services.audio_pipeline import convert_pcm
+
+    recordings = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        with wave.open(os.path.join(directory, name), "rb") as f:
+            if f.getsampwidth() != 2 or f.getnchannels() != 1:
+                print(f"{name}: 16비트 모노가 아니어서 건너뜀")
+                continue
+            recordings.append((name, convert_pcm(f.readframes(f.getnframes()), f.getframerate(), sample_rate)))
+    return recordings
+
+async def bench_vad_replay(directory: str = None, chunk_ms: int = 100):
+    """녹음된 세션(없으면 합성 음성)을 VAD에 통과시켜 Live API로 보내지 않은 바이트와 비용 측정"""
+    from app.services.vad import create_vad, estimate_audio_cost
+    from app.config import settings
+
+    rate = settings.send_sample_rate
+    if directory:
+        recordings = _load_recordings(directory, rate)
+        source = f"{directory}의 녹음 {len(recordings)}개"
+        speech_samples = None
+    else:
+        pcm, speech_samples = _synthetic_interview_audio(rate)
+        recordings = [("synthetic", pcm)]
+        source = "합성 인터뷰 음성 10분"
+    print(f"=== 음성 구간 검출 재생 벤치마크 ({source}) ===\n")
+
+    total_in = total_sent = 0
+    elapsed = 0.0
+    for name, pcm in recordings:
+        vad = create_vad(rate)
+        chunk_bytes = rate * chunk_ms // 1000 * 2
+        started = time.perf_counter()
+        for offset in range(0, len(pcm), chunk_bytes):
+            vad.process(pcm[offset:offset + chunk_bytes])
+        elapsed += time.perf_counter() - started
+        stats = vad.stats()
+        total_in += stats["bytes_in"]
+        total_sent += stats["bytes_sent"]
+        print(f"{name}: {stats['bytes_in'] / 2 / rate:.0f}초 중 {stats['bytes_sent'] / 2 / rate:.0f}초 전송, "
+              f"발화 {stats['utterances']}개")
+        if speech_samples:
+            print(f"  실제 말소리 {speech_samples / rate:.0f}초 (전송 구간에는 앞뒤 여유 구간 포함)")
+
+    suppressed = total_in - total_sent
+    audio_seconds = total_in / 2 / rate
+    print(f"\n보내지 않은 오디오: {suppressed / 1e6:.1f}MB ({suppressed / total_in:.0%})")
+    print(f"비용 절감 추정: ${estimate_audio_cost(suppressed, rate):.4f} "
+          f"(오디오 1시간당 ${estimate_audio_cost(suppressed, rate) * 3600 / audio_seconds:.3f}, "
+          f"{settings.live_audio_tokens_per_second}토큰/초, 100만 토큰당 ${settings.live_audio_usd_per_million_tokens})")
+    print(f"VAD 처리 시간: 오디오 1초당 {elapsed / audio_seconds * 1e6:.0f}us")
+
+async def _replay_mic_frames(handle, frame_ms: int, seconds: float):
+    """브라우저 마이크 프레임을 실제 간격(±30% 흔들림)으로 WebSocket 수신 큐에 넣고 수신 루프에서 처리
+
+    프레임 앞 8바이트에 도착 시각을 넣어 묶여서 전송된 뒤에도 프레임별 지연을 잴 수 있게 한다.
+    """
+    import random
+    import struct
+    inbox = asyncio.Queue()
+
+    async def client():
+        padding = bytes(16 * frame_ms * 2 - 8)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            inbox.put_nowait(struct.pack("d", time.monotonic()) + padding)
+            await asyncio.sleep(frame_ms / 1000 * random.uniform(0.7, 1.3))
+        inbox.put_nowait(None)
+
+    async def receive_loop():
+        while True:
+            frame = await inbox.get()
+            if frame is None:
+                return
+            await handle(frame)
+
+    await asyncio.gather(client(), receive_loop())
+
+async def bench_live_buffers(frame_ms: int = 20, seconds: float = 5.0, responses: int = 8):
+    """업스트림 청크 묶음(Live API 전송 횟수, 지연)과 응답 지터 버퍼(재생 끊김, 첫 소리 지연) 비교"""
+    import random
+    import struct
+    from app.services.audio_buffers import create_aggregator, create_jitter_buffer
+    from app.services.live_stream import AUDIO, LiveStream
+    from app.config import settings
+
+    frame_ms, seconds, responses = int(frame_ms), float(seconds), int(responses)
+    print(f"=== 실시간 오디오 버퍼 벤치마크 (마이크 프레임 {frame_ms}ms, {seconds:.0f}초) ===\n")
+
+    # 업스트림: 마이크 프레임 도착부터 Live API 전송 완료까지
+    frame_bytes = 16 * frame_ms * 2
+    for mode in ("direct", "aggregated"):
+        latencies = []
+        sends = 0
+
+        async def upstream_send(data):
+            nonlocal sends
+            sends += 1
+            await asyncio.sleep(random.uniform(0.005, 0.025))  # Live API send 왕복
+            done = time.monotonic()
+            for offset in range(0, len(data), frame_bytes):
+                latencies.append((done - struct.unpack_from("d", data, offset)[0]) * 1000)
+
+        aggregator = create_aggregator(upstream_send) if mode == "aggregated" else None
+        async def handle(frame):
+            if aggregator is None:
+                await upstream_send(frame)
+            else:
+                aggregator.push(frame)
+
+        await _replay_mic_frames(handle, frame_ms, seconds)
+        if aggregator is not None:
+            await aggregator.drain()
+            aggregator.close()
+        print(f"[{mode}] Live API 전송 {sends}회 (프레임 {len(latencies)}개, 전송당 {len(latencies) / sends:.1f}개)")
+        _print_latency(f"[{mode}] 마이크 프레임 -> 전송 완료 지연", latencies)
+
+    # 다운스트림: 불규칙한 Live API 응답 오디오를 클라이언트가 재생
+    print(f"\n응답 {responses}개 (청크 20~120ms, 생성 속도 실시간의 0.3~1.3배, 5% 확률로 150ms 지연)")
+    rate = settings.receive_sample_rate
+    script = []
+    for _ in range(responses):
+        chunks = []
+        for _ in range(random.randint(10, 25)):
+            duration = random.uniform(0.02, 0.12)
+            delay = duration * random.uniform(0.3, 1.3) + (0.15 if random.random() < 0.05 else 0.0)
+            chunks.append((delay, bytes(int(rate * duration) * 2)))
+        script.append(chunks)
+
+    for mode in ("direct", "jitter"):
+        stream = LiveStream()
+        jitter = create_jitter_buffer() if mode == "jitter" else None
+        underruns = 0
+        first_audio = []
+        played_until = 0.0
+        response_started = None
+
+        async def produce():
+            nonlocal response_started
+            for chunks in script:
+                response_started = time.monotonic()
+                for delay, pcm in chunks:
+                    await asyncio.sleep(delay)
+                    await stream.publish_audio(pcm)
+                await asyncio.sleep(settings.live_jitter_gap_ms / 1000 + 0.2)
+            stream.close()
+
+        async def consume():
+            nonlocal underruns, played_until, response_started
+            async for event in (jitter.events(stream) if jitter else stream):
+                if event.kind != AUDIO:
+                    continue
+                now = time.monotonic()
+                # 지터 버퍼 없이는 도착 즉시 이어서 재생, 있으면 프레임의 재생 시각에 재생
+                start = max(event.timestamp if jitter else now, played_until)
+                if response_started is not None:
+                    first_audio.append((start - response_started) * 1000)
+                    response_started = None
+                elif now > played_until:
+                    underruns += 1
+                played_until = start + len(event.data) / 2 / rate
+
+        await asyncio.gather(produce(), consume())
+        print(f"[{mode}] 응답 중 재생 끊김 {underruns}회")
+        _print_latency(f"[{mode}] 응답 시작 -> 첫 소리 재생", first_audio)
+
+class _StandInLiveSession:
+    """로컬 대역 Live 서버와의 연결 (줄 단위 텍스트 프로토콜, 실제 소켓 사용)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def _request(self, line: str, expect: str = None):
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        if expect:
+            while (await self.reader.readline()).strip().decode() != expect:
+                pass
+
+    async def send(self, text: str, end_of_turn: bool = False):
+        await self._request(("TURN " if end_of_turn else "TEXT ") + text.replace("\n", " "))
+
+    async def first_audio(self):
+        while (await self.reader.readline()).strip() != b"AUDIO":
+            pass
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def _standin_live_server(handshake: float, generation: float):
+    """Live API 대역 서버 (연결 설정에 handshake초, 턴 끝마다 generation초 뒤 첫 오디오)"""
+    async def handle(reader, writer):
+        try:
+            await reader.readline()  # SETUP
+            await asyncio.sleep(handshake)
+            writer.write(b"READY\n")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.startswith(b"TURN"):
+                    await asyncio.sleep(generation)
+                    writer.write(b"AUDIO\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+async def bench_live_pool(handshake_ms: int = 350, generation_ms: int = 150, interviews: int = 10):
+    """로컬 대역 Live 서버로 인터뷰 시작부터 첫 응답 오디오까지 시간 (연결 풀 없음 vs 미리 연 연결)"""
+    from app.services.live_pool import LiveConnectionPool
+    from app.services.template_registry import template_registry
+    from app.config import settings
+
+    handshake, generation, interviews = int(handshake_ms) / 1000, int(generation_ms) / 1000, int(interviews)
+    server = await _standin_live_server(handshake, generation)
+    port = server.sockets[0].getsockname()[1]
+    print(f"=== Live 연결 풀 벤치마크 (대역 서버: 핸드셰이크 {handshake_ms}ms, 첫 오디오 생성 {generation_ms}ms) ===\n")
+
+    async def connect():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        session = _StandInLiveSession(reader, writer)
+        await session._request("SETUP", "READY")
+        return session
+
+    async def start_interview(pool, template):
+        # LiveInterviewService.start_live_interview와 같은 순서
+        started = time.monotonic()
+        session = await pool.acquire() if pool else None
+        if session is not None:
+            await session.send(template.live_session_context)
+        else:
+            session = await connect()
+        await session.send(f"안녕하세요! 오늘은 '{template.title}'에 대해 이야기를 나눠보려고 합니다.", end_of_turn=True)
+        await session.first_audio()
+        elapsed = (time.monotonic() - started) * 1000
+        await session.close()
+        return elapsed
+
+    templates = template_registry.all()
+    for size in (0, settings.live_pool_size):
+        pool = None
+        if size:
+            pool = LiveConnectionPool(connect, size, idle_timeout=300, sweep_interval=1.0)
+            pool.start()
+            await asyncio.sleep(handshake + 0.1)
+        label = f"pool={size}"
+
+        # 인터뷰가 띄엄띄엄 시작될 때 (풀이 다시 채워질 시간이 있음)
+        steady = []
+        for index in range(interviews):
+            steady.append(await start_interview(pool, templates[index % len(templates)]))
+            await asyncio.sleep(handshake + 0.1)
+        _print_latency(f"[{label}] 순차 시작 -> 첫 오디오", steady)
+
+        # 여러 인터뷰가 한꺼번에 시작될 때 (풀 크기를 넘으면 바로 연결)
+        burst = await asyncio.gather(*(
+            start_interview(pool, templates[index % len(templates)]) for index in range(max(size, 1) * 2 + 1)
+        ))
+        _print_latency(f"[{label}] 동시 시작 -> 첫 오디오", burst)
+        if pool:
+            print(f"[{label}] 풀 지표: {pool.stats()}")
+            await pool.close()
+
+    server.close()
+    await server.wait_closed()
+
+async def bench_tts_cache(synth_ms: int = 600, requests: int = 100):
+    """회차 인사 음성 요청의 지연과 합성 횟수 (캐시 없음 vs 미리 채운 디스크 캐시, 대역 합성기 사용)"""
+    import random
+    import tempfile
+    from app.services.tts_cache import TtsCache, played_utterances
+    from app.config import settings
+
+    synth_ms, requests = int(synth_ms), int(requests)
+    rate = settings.receive_sample_rate
+    utterances = list(dict.fromkeys(played_utterances()))
+    print(f"=== 음성 캐시 벤치마크 (고정 문장 {len(utterances)}개, 요청 {requests}건, 합성 {synth_ms}ms) ===\n")
+
+    synth_calls = 0
+    async def synthesize(text):
+        # Gemini 음성 생성 대역: 글자당 약 0.12초 분량의 PCM
+        nonlocal synth_calls
+        synth_calls += 1
+        await asyncio.sleep(synth_ms / 1000)
+        return bytes(int(len(text) * 0.12 * rate) * 2)
+
+    # 실시간 인터뷰 시작마다 회차 인사 하나 (앞 회차일수록 자주)
+    workload = [random.choice(utterances[:len(utterances) // 2]) if random.random() < 0.7 else random.choice(utterances)
+                for _ in range(requests)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("no-cache", "cache"):
+            synth_calls = 0
+            cache = TtsCache(directory if mode == "cache" else None, max_bytes=settings.tts_cache_max_mb * 1024 * 1024)
+            if mode == "cache":
+                started = time.perf_counter()
+                await cache.warm(utterances, settings.tts_voice, rate, synthesize, concurrency=settings.tts_cache_warm_concurrency)
+                print(f"[{mode}] 시작 시 미리 합성: {time.perf_counter() - started:.1f}초 "
+                      f"(동시 {settings.tts_cache_warm_concurrency}개, {cache.total_bytes / 1e6:.1f}MB)")
+                synth_calls = 0
+
+            latencies = []
+            sizes = 0
+            for text in workload:
+                started = time.perf_counter()
+                audio = await cache.get_or_synthesize(text, settings.tts_voice, rate, synthesize)
+                sizes += len(audio)
+                latencies.append((time.perf_counter() - started) * 1000)
+            _print_latency(f"[{mode}] 문장 음성 준비 시간", latencies)
+            print(f"[{mode}] 요청 중 합성 {synth_calls}회, 전송 {sizes / 1e6:.1f}MB")
+
+        # 크기 제한: 캐시 크기를 전체의 절반으로 제한했을 때 LRU 삭제
+        small = TtsCache(directory, max_bytes=cache.total_bytes // 2)
+        print(f"\n크기 제한 {small.max_bytes / 1e6:.1f}MB로 다시 열기: 항목 {small.stats()['entries']}개 유지, "
+              f"{small.evictions}개 삭제")
+
+async def bench_recording(minutes: str = "10,60", chunk_ms: int = 20):
+    """세션 녹음의 메모리 (세션 전체를 메모리에 모으기 vs 조각 파일 기록), 마무리 시간, Range 재생"""
+    import tempfile
+    import tracemalloc
+    import numpy as np
+    from app.services.recording_service import RecordingService
+    from app.api.responses import RangeFileResponse
+    from app.config import settings
+
+    lengths = [int(value) for value in str(minutes).split(",")]
+    chunk_ms = int(chunk_ms)
+    rate = settings.send_sample_rate
+    chunk_samples = rate * chunk_ms // 1000
+    print(f"=== 녹음 벤치마크 (세션 {lengths}분, 마이크 청크 {chunk_ms}ms, {rate}Hz) ===\n")
+
+    # 마이크 청크 대역: 잡음 섞인 음성 흉내, 같은 청크를 반복해 생성 비용은 빼고 측정
+    t = np.arange(chunk_samples) / rate
+    chunk = (np.sin(2 * np.pi * 220 * t) * 3000 + np.random.normal(0, 300, chunk_samples)).astype(np.int16).tobytes()
+
+    with tempfile.TemporaryDirectory() as directory:
+        service = RecordingService(directory)
+        for length in lengths:
+            chunks = length * 60 * 1000 // chunk_ms
+
+            tracemalloc.start()
+            session_audio = bytearray()
+            for _ in range(chunks):
+                session_audio += chunk
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del session_audio
+            print(f"[{length}분] 메모리에 모으기: 최대 {peak / 1e6:.1f}MB")
+
+            recorder = service.create(1, length, rate)
+            tracemalloc.start()
+            started = time.perf_counter()
+            for _ in range(chunks):
+                await recorder.write(chunk)
+            write_seconds = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"[{length}분] 조각 파일 기록: 최대 {peak / 1e6:.2f}MB, "
+                  f"청크당 {write_seconds / chunks * 1e6:.1f}us, 조각 {len(recorder.segments)}개")
+
+            started = time.perf_counter()
+            info = await service.finish(recorder)
+            print(f"[{length}분] 마무리: {(time.perf_counter() - started) * 1000:.0f}ms, "
+                  f"{os.path.basename(info.path)} {info.size_bytes / 1e6:.1f}MB ({info.duration_seconds}초)")
+
+            # 녹음 중간으로 이동해서 재생 (aiofiles 경로, 서버가 zerocopysend를 지원하면 sendfile)
+            sent = []
+            async def send(message):
+                sent.append(len(message.get("body", b"")))
+            middle = info.size_bytes // 2
+            response = RangeFileResponse(info.path, f"bytes={middle}-{middle + rate * 2 * 10 - 1}", info.media_type)
+            tracemalloc.start()
+            started = time.perf_counter()
+            await response({"type": "http", "method": "GET"}, None, send)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"[{length}분] 중간 10초 Range 재생: 상태 {response.status_code}, {sum(sent) / 1e3:.0f}KB "
+                  f"{(time.perf_counter() - started) * 1000:.1f}ms, 최대 메모리 {peak / 1e6:.2f}MB\n")
+        print(f"녹음 지표: {service.stats()}")
+
+async def bench_transcript_sink(sessions: int = 20, seconds: float = 5, fragment_ms: int = 50):
+    """실시간 트랜스크립트 저장 (턴마다 커밋 vs write-behind 묶음 기록), 워커 중단 시 잃는 턴, 재시도 중복"""
+    import random
+    import tempfile
+    from sqlalchemy import create_engine, select, func as sql_func
+    from sqlalchemy.orm import sessionmaker
+    from app.models import user, session, conversation, live_transcript  # noqa: F401 (외래 키 대상 테이블 등록)
+    from app.models.live_transcript import LiveTranscriptTurn
+    from app.services.transcript_sink import TranscriptSink
+    from app.config import settings
+
+    sessions, seconds, fragment_ms = int(sessions), float(seconds), int(fragment_ms)
+    print(f"=== 트랜스크립트 저장 벤치마크 (세션 {sessions}개, {seconds:.0f}초, 응답 조각 {fragment_ms}ms마다, "
+          f"flush {settings.transcript_flush_seconds}초/{settings.transcript_flush_batch_size}턴) ===\n")
+
+    def make_engine(name):
+        engine = create_engine(f"sqlite:///{directory}/{name}.db", connect_args={"check_same_thread": False})
+        user.Base.metadata.create_all(bind=engine)
+        return engine
+
+    def count_rows(engine):
+        with engine.connect() as connection:
+            return connection.execute(select(sql_func.count()).select_from(LiveTranscriptTurn.__table__)).scalar()
+
+    async def run_sessions(append, duration):
+        # 세션마다 어르신 말 1개 뒤에 AI 응답 조각 여러 개가 이어지는 턴 흉내
+        async def one(index):
+            key = f"{index}_{index}"
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                await append(key, "user", "어릴 때 부산 바닷가에서 자랐어요. " * 3)
+                for _ in range(random.randint(3, 8)):
+                    await asyncio.sleep(fragment_ms / 1000 * random.uniform(0.5, 1.5))
+                    await append(key, "assistant", "그 시절 바닷가는 어떤 모습이었나요? ")
+        await asyncio.gather(*(one(index) for index in range(sessions)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("per-turn", "write-behind"):
+            engine = make_engine(mode)
+            stop = asyncio.Event()
+            probe = []
+            probe_task = asyncio.create_task(_interview_probe(stop, probe))
+            started = time.perf_counter()
+
+            if mode == "per-turn":
+                # 비교 대상: 이벤트 루프에서 턴마다 바로 INSERT + 커밋
+                seqs = {}
+                commits = 0
+                async def append(key, role, content):
+                    nonlocal commits
+                    seqs[key] = seqs.get(key, 0) + 1
+                    with engine.begin() as connection:
+                        connection.execute(LiveTranscriptTurn.__table__.insert().values(
+                            session_key=key, seq=seqs[key], session_id=1, role=role, content=content
+                        ))
+                    commits += 1
+                await run_sessions(append, seconds)
+                summary = f"커밋 {commits}회"
+            else:
+                sink = TranscriptSink(engine, settings.transcript_flush_seconds,
+                                      settings.transcript_flush_batch_size, settings.transcript_max_pending)
+                sink.start()
+                for index in range(sessions):
+                    await sink.open(f"{index}_{index}", 1)
+                await run_sessions(sink.append, seconds)
+                for index in range(sessions):
+                    await sink.finish(f"{index}_{index}")
+                await sink.close()
+                stats = sink.stats()
+                summary = (f"커밋 {stats['batches']}회 (평균 {stats['avg_batch']}턴, {stats['avg_flush_ms']}ms), "
+                           f"최대 대기 {stats['peak_pending']}턴")
+
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe_task
+            print(f"[{mode}] 턴 {count_rows(engine)}개 저장, {summary}, {elapsed:.1f}초")
+            _print_latency(f"[{mode}] 인터뷰 루프 지연", probe)
+            engine.dispose()
+
+        # 워커가 세션 중간에 죽었을 때 DB에 남은 턴 (세션 종료 때만 저장하면 0)
+        engine = make_engine("crash")
+        sink = TranscriptSink(engine, settings.transcript_flush_seconds,
+                              settings.transcript_flush_batch_size, settings.transcript_max_pending)
+        sink.start()
+        for index in range(sessions):
+            await sink.open(f"{index}_{index}", 1)
+        await run_sessions(sink.append, seconds)
+        sink._task.cancel()  # 종료 처리 없이 중단
+        print(f"\n[중단] 발행 {sink.appended}턴 중 {count_rows(engine)}턴이 DB에 남음 "
+              f"(잃은 턴 {sink.stats()['pending']}개 = 마지막 flush 이후)")
+
+        # 재연결하면 이전 순번에 이어서 기록, 커밋 결과를 모른 채 재시도해도 중복 없음
+        restarted = TranscriptSink(engine, settings.transcript_flush_seconds,
+                                   settings.transcript_flush_batch_size, settings.transcript_max_pending)
+        await restarted.open("0_0", 1)
+        await restarted.append("0_0", "user", "다시 연결했어요.")
+        batch = {key: list(turns) for key, turns in restarted._pending.items()}
+        await restarted.flush()
+        written, duplicates = restarted._write(batch)
+        print(f"[재연결] 순번 {batch['0_0'][0].seq}부터 이어서 기록, 같은 묶음 재시도: 새로 기록 {written}턴, 건너뜀 {duplicates}턴")
+
+        # 받아쓰기 없이 AI 응답만 기록된 세션 (짝이 없어도 버리지 않아야 함)
+        await restarted.open("assistant_only", 1)
+        for _ in range(3):
+            await restarted.append("assistant_only", "assistant", "그 시절 이야기를 더 들려주시겠어요? ")
+        await restarted.flush()
+
+        # 세션 종료: 기록된 턴을 대화로 옮기고 삭제
+        from app.models.conversation import Conversation
+        db = sessionmaker(bind=engine)()
+        before = count_rows(engine)
+        with engine.connect() as connection:
+            keys = [row[0] for row in connection.execute(select(LiveTranscriptTurn.session_key).distinct())]
+            recorded = connection.execute(select(sql_func.sum(sql_func.length(LiveTranscriptTurn.content)))).scalar()
+        saved = sum(restarted.materialize(db, key, 1) for key in keys)
+        db.commit()
+        moved = sum(len(conv.user_message or "") + len(conv.ai_response or "") for conv in db.query(Conversation))
+        unpaired = db.query(Conversation).filter(Conversation.user_message.is_(None)).count()
+        db.close()
+        print(f"[종료] 턴 {before}개 -> 대화 {saved}개 (어르신 말 없는 대화 {unpaired}개), "
+              f"옮긴 글자 {moved}/{recorded}, 남은 턴 {count_rows(engine)}개")
+
+async def bench_search(users: int = 200, turns: int = 100_000, queries: int = 200):
+    """대화 기억 검색 지연 (전체 사용자 색인에서 찾은 뒤 사용자 필터 vs 사용자 토큰으로 그 사용자 대화만 매칭)"""
+    import random
+    import tempfile
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    from app.models import user, session, conversation  # noqa: F401 (외래 키 대상 테이블 등록)
+    from app.services.search_service import search_service, tokenize
+
+    users, turns, queries = int(users), int(turns), int(queries)
+    print(f"=== 대화 기억 검색 벤치마크 (사용자 {users}명, 대화 {turns}개, 검색 {queries}회) ===\n")
+
+    places = ["부산", "대구", "서울", "광주", "전주", "강릉", "제주"]
+    topics = ["바닷가에서 자랐어요", "시장에서 장사를 했지요", "학교 다니던 시절이 그리워요",
+              "결혼식을 올렸어요", "첫 아이를 낳았어요", "공장에서 일했어요"]
+    random.seed(7)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/search.db")
+        user.Base.metadata.create_all(bind=engine)
+        per_user = turns // users
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO users (id, email, username, hashed_password) VALUES (:id, :email, :name, 'x')"
+            ), [{"id": i, "email": f"u{i}@example.com", "name": f"u{i}"} for i in range(1, users + 1)])
+            connection.execute(text(
+                "INSERT INTO sessions (id, user_id, session_number, title) VALUES (:id, :id, 1, '어린 시절')"
+            ), [{"id": i} for i in range(1, users + 1)])
+            connection.execute(text(
+                "INSERT INTO conversations (session_id, conversation_type, user_message, ai_response) "
+                "VALUES (:session_id, 'TEXT', :user_message, :ai_response)"
+            ), [{
+                "session_id": i,
+                "user_message": f"{random.choice(places)} {random.choice(topics)}",
+                "ai_response": f"{random.choice(places)} 이야기를 더 들려주시겠어요?"
+            } for i in range(1, users + 1) for _ in range(per_user)])
+
+            # 비교 대상: 사용자 구분 없는 색인 (검색어가 모든 사용자의 대화와 매칭된 뒤 user_id로 거름)
+            connection.execute(text("CREATE VIRTUAL TABLE shared_search USING fts5(document, tokenize='unicode61')"))
+            rows = connection.execute(text("SELECT id, user_message, ai_response FROM conversations")).all()
+            connection.execute(text("INSERT INTO shared_search (rowid, document) VALUES (:id, :document)"), [
+                {"id": row.id, "document": " ".join(tokenize(f"{row.user_message} {row.ai_response}"))}
+                for row in rows
+            ])
+
+        started = time.perf_counter()
+        search_service.create_index(engine)
+        print(f"사용자 토큰 색인 생성: {(time.perf_counter() - started):.1f}초\n")
+
+        def shared_search(db, user_id, query):
+            match = " ".join(tokenize(query))
+            source = (
+                "FROM shared_search JOIN conversations c ON c.id = shared_search.rowid "
+                "JOIN sessions s ON s.id = c.session_id WHERE shared_search MATCH :match AND s.user_id = :user_id"
+            )
+            params = {"match": match, "user_id": user_id}
+            total = db.execute(text(f"SELECT COUNT(*) {source}"), params).scalar()
+            db.execute(text(
+                f"SELECT c.id, -bm25(shared_search) AS score {source} ORDER BY score DESC LIMIT 20"
+            ), params).all()
+            return total
+
+        def per_user_search(db, user_id, query):
+            return search_service.search(db, user_id=user_id, query=query)[1]
+
+        db = sessionmaker(bind=engine)()
+        for query in ("부산", "부산 바닷가"):
+            for label, run in (("공용 색인", shared_search), ("사용자 토큰", per_user_search)):
+                samples, found = [], 0
+                for _ in range(queries):
+                    user_id = random.randint(1, users)
+                    started = time.perf_counter()
+                    found += run(db, user_id, query)
+                    samples.append((time.perf_counter() - started) * 1000)
+                _print_latency(f"[{label}] \"{query}\" (평균 {found // queries}건)", samples)
+        db.close()
+        engine.dispose()
+
+async def main():
+    """메인 벤치마크 함수"""
+    benchmarks = {
+        "login-storm": bench_login_storm,
+        "flow-memory": bench_flow_memory,
+        "snapshot-restore": bench_snapshot_restore,
+        "classifier-replay": bench_classifier_replay,
+        "live-fanout": bench_live_fanout,
+        "frame-codec": bench_frame_codec,
+        "audio-pipeline": bench_audio_pipeline,
+        "resampler": bench_resampler,
+        "vad-replay": bench_vad_replay,
+        "live-buffers": bench_live_buffers,
+        "live-pool": bench_live_pool,
+        "tts-cache": bench_tts_cache,
+        "recording": bench_recording,
+        "transcript-sink": bench_transcript_sink,
+        "search": bench_search,
+    }
+    if len(sys.argv) > 1 and sys.argv[1] in benchmarks:
+        benchmark = benchmarks[sys.argv[1]]
+        # 명령행 인자를 함수의 매개변수 타입(int/float)으로 변환
+        parameters = inspect.signature(benchmark).parameters.values()
+        args = [
+            parameter.annotation(value) if parameter.annotation in (int, float) else value
+            for parameter, value in zip(parameters, sys.argv[2:])
+        ]
+        await benchmark(*args)
+    else:
+        print(f"사용법: python benchmark.py [{'|'.join(benchmarks)}]")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,7 +11,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.services.gemini_service import gemini_service
-from app.services.conversation_manager import conversation_manager
+from app.services.conversation_manager import conversation_manager, flow_state_key, replay_flow_state
 from app.models.session_templates import SESSION_TEMPLATES
 
 async def test_interview_flow():
@@ -19,7 +19,7 @@ async def test_interview_flow():
     print("=== He'story 인터뷰 시스템 테스트 ===\n")
     
     # 테스트 세션 설정
-    test_session_id = 1
+    test_user_id = 1
     test_session_number = 0  # 프롤로그
     
     print(f"테스트 세션: {SESSION_TEMPLATES[test_session_number]['title']}\n")
@@ -27,7 +27,7 @@ async def test_interview_flow():
     # 세션 시작
     print("1. 세션 시작...")
     opening = await gemini_service.generate_interview_response(
-        session_id=test_session_id,
+        user_id=test_user_id,
         session_number=test_session_number,
         user_message="",
         is_session_start=True
@@ -49,7 +49,7 @@ async def test_interview_flow():
         
         # AI 응답 생성
         ai_response = await gemini_service.generate_interview_response(
-            session_id=test_session_id,
+            user_id=test_user_id,
             session_number=test_session_number,
             user_message=user_input,
             conversation_history=[],
@@ -59,13 +59,13 @@ async def test_interview_flow():
         print(f"AI: {ai_response}\n")
         
         # 진행 상황 확인
-        progress = conversation_manager.get_session_progress(test_session_id)
+        progress = conversation_manager.get_session_progress(test_user_id, test_session_number)
         print(f"[진행률: {progress.get('progress_percent', 0):.1f}%]\n")
         
         await asyncio.sleep(1)  # 시뮬레이션을 위한 대기
     
     print("3. 세션 완료 상태 확인...")
-    is_completed = conversation_manager.is_session_completed(test_session_id)
+    is_completed = conversation_manager.is_session_completed(test_user_id, test_session_number)
     print(f"세션 완료: {is_completed}")
     
     print("\n=== 테스트 완료 ===")
@@ -74,37 +74,82 @@ async def test_conversation_manager():
     """대화 관리자 단독 테스트"""
     print("=== 대화 관리자 테스트 ===\n")
     
-    test_session_id = 999
+    test_user_id = 999
     test_session_number = 1  # 유년 시절
     
     # 세션 초기화
     print("1. 세션 초기화...")
-    conversation_manager.initialize_session(test_session_id, test_session_number)
+    conversation_manager.initialize_session(test_user_id, test_session_number)
     
     # 세션 시작 메시지
-    opening = conversation_manager.get_session_opening(test_session_id)
+    opening = conversation_manager.get_session_opening(test_user_id, test_session_number)
     print(f"시작 메시지: {opening}\n")
     
     # 질문 진행
     print("2. 질문 진행 테스트...")
     for i in range(3):
-        question = conversation_manager.get_next_question(test_session_id)
+        question = conversation_manager.get_next_question(test_user_id, test_session_number)
         if question:
             print(f"질문 {i+1}: {question}")
             
             # 꼬리 질문 테스트
             follow_up = conversation_manager.generate_follow_up_question(
-                test_session_id, 
+                test_user_id, 
+                test_session_number,
                 "저는 어릴 때 시골에서 살았어요."
             )
             print(f"꼬리 질문: {follow_up}\n")
         
         # 진행 상황
-        progress = conversation_manager.get_session_progress(test_session_id)
+        progress = conversation_manager.get_session_progress(test_user_id, test_session_number)
         print(f"진행률: {progress.get('progress_percent', 0):.1f}%\n")
     
     print("=== 대화 관리자 테스트 완료 ===")
 
+async def test_concurrent_turns(users: int = 50, turns_per_user: int = 8):
+    """동시 턴 스트레스 테스트 - 같은 회차를 진행하는 여러 사용자가 동시에 요청"""
+    import random
+    print(f"=== 동시 턴 스트레스 테스트 ({users}명 x {turns_per_user}턴) ===\n")
+    
+    test_session_number = 2  # 학창 시절 (모든 사용자가 같은 회차)
+    responses = {user_id: [] for user_id in range(1, users + 1)}
+    
+    async def one_turn(user_id: int, message: str):
+        # API의 create_interview처럼 이전 대화 확인부터 저장까지 락 안에서 처리
+        async with conversation_manager.lock(user_id, test_session_number):
+            history = responses[user_id]
+            is_session_start = len(history) == 0
+            await asyncio.sleep(random.random() * 0.005)  # DB/네트워크 지연 흉내
+            ai_response = await gemini_service.generate_interview_response(
+                user_id=user_id,
+                session_number=test_session_number,
+                user_message=message,
+                is_session_start=is_session_start
+            )
+            history.append((message, ai_response))
+    
+    # 사용자마다 여러 턴을 한꺼번에 보내고 전체를 섞어서 동시에 실행
+    requests = [
+        one_turn(user_id, "" if turn == 0 else f"{user_id}번 어르신의 {turn}번째 이야기" + "." * random.randint(0, 80))
+        for user_id in responses
+        for turn in range(turns_per_user)
+    ]
+    random.shuffle(requests)
+    await asyncio.gather(*requests)
+    
+    failures = 0
+    for user_id, turns in responses.items():
+        openings = sum(1 for _, ai_response in turns if ai_response.startswith("안녕하세요"))
+        live = conversation_manager.store.get(flow_state_key(user_id, test_session_number))[0]
+        expected = replay_flow_state(test_session_number, turns)
+        if openings != 1 or live != expected:
+            failures += 1
+            print(f"사용자 {user_id}: 시작 인사 {openings}회, 상태 불일치 {live != expected}")
+    
+    print(f"불일치 사용자: {failures}/{users}")
+    print(f"흐름 상태 지표: {conversation_manager.stats()}")
+    print("\n=== 동시 턴 스트레스 테스트 완료 ===")
+
 def print_session_templates():
     """세션 템플릿 정보 출력"""
     print("=== 12개 세션 템플릿 ===\n")
@@ -130,8 +175,10 @@ async def main():
             await test_conversation_manager()
         elif test_type == "full":
             await test_interview_flow()
+        elif test_type == "stress":
+            await test_concurrent_turns()
         else:
-            print("사용법: python test_interview.py [templates|manager|full]")
+            print("사용법: python test_interview.py [templates|manager|full|stress]")
     else:
         print("간단한 테스트를 실행합니다...")
         print_session_templates()